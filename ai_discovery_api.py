@@ -1,6 +1,21 @@
 from fastapi import APIRouter, HTTPException, Body, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict, Literal, Tuple
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import threading
+
+import numpy as np
+
+from baseroot_backend.ann_index import IVFIndex
+from baseroot_backend.corpus_store import CorpusStore
+from baseroot_backend.literature_index import HashingEmbedder, InvertedIndex, VectorIndex, paper_text, top_k_indices
+from baseroot_backend.result_cache import ResultCache
+from baseroot_backend.scoring_pool import PoolSaturatedError, ScoringPool
 
 # For actual model loading and inference
 # from transformers import AutoTokenizer, AutoModel
@@ -16,6 +31,16 @@ class AISearchRequest(BaseModel):
     keywords: Optional[List[str]] = Field(default=None, example=["decentralized science", "blockchain research"])
     abstract: Optional[str] = Field(default=None, example="This paper explores the intersection of AI and DeSci...")
     top_k: int = Field(default=5, ge=1, le=20)
+    # "lexical" ranks with BM25 over the keyword index, "semantic" with embedding similarity.
+    # Defaults to lexical for keyword-only queries and semantic when an abstract is given.
+    retrieval_mode: Optional[Literal["lexical", "semantic"]] = Field(default=None, example="lexical")
+    # Semantic mode only: "exact" scans every embedding, "approximate" probes the IVF index.
+    search_strategy: Literal["exact", "approximate"] = Field(default="exact", example="approximate")
+    nprobe: Optional[int] = Field(default=None, ge=1, le=4096, example=8) # IVF lists to scan (approximate only)
+
+class AIStreamSearchRequest(AISearchRequest):
+    # Streaming never materializes the full result list, so much larger top_k values are allowed
+    top_k: int = Field(default=100, ge=1, le=10000)
 
 class SimilarPaper(BaseModel):
     id: str # Could be a DOI, IPFS hash, or internal ID from a corpus
@@ -38,7 +63,7 @@ class AISearchResponse(BaseModel):
 # model = None
 # sentence_model = None
 
-# Simulated corpus of research papers (in reality, this would be a database or a vector store)
+# Simulated corpus of research papers (used when no persistent CorpusStore is configured)
 fake_corpus = [
     {
         "id": "paper_001", 
@@ -82,24 +107,127 @@ fake_corpus = [
     }
 ]
 
-@router.post("/discover_literature", response_model=AISearchResponse)
-async def discover_literature_endpoint(request: AISearchRequest = Body(...)):
+# Offline embedder, vector index and BM25 keyword index over the corpus.
+# Row i of corpus_index / keyword_index corresponds to corpus[i].
+embedder = HashingEmbedder()
+corpus_index = VectorIndex(embedder.dim)
+keyword_index: Optional[InvertedIndex] = None # Built on first lexical query, then updated incrementally
+# Bumped on every corpus change; cached results from an older version are discarded.
+corpus_version = 0
+
+# Result cache in front of discover_literature (popular frontend queries repeat a lot)
+literature_cache = ResultCache(
+    max_entries=int(os.getenv("BASEROOT_AI_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("BASEROOT_AI_CACHE_TTL_SECONDS", "300")),
+)
+
+# With BASEROOT_CORPUS_DIR set, the corpus lives in a memory-mapped CorpusStore shared
+# by all workers through the page cache; otherwise fake_corpus is used in memory.
+CORPUS_DIR = os.getenv("BASEROOT_CORPUS_DIR")
+corpus_store: Optional[CorpusStore] = None
+if CORPUS_DIR:
+    corpus_store = CorpusStore.open_or_create(CORPUS_DIR, embedder.dim)
+    if len(corpus_store) == 0: # Seed an empty store with the demo papers
+        corpus_store.append(fake_corpus, embedder.embed([paper_text(p) for p in fake_corpus]))
+    corpus = corpus_store
+    corpus_index.wrap(corpus_store.embeddings)
+else:
+    corpus = fake_corpus
+    corpus_index.add(embedder.embed([paper_text(p) for p in fake_corpus]))
+
+# Scoring runs on worker threads: serializes lazy index builds and corpus writes
+_index_lock = threading.RLock()
+
+def _get_keyword_index() -> InvertedIndex:
+    global keyword_index
+    if keyword_index is None:
+        with _index_lock:
+            if keyword_index is None:
+                index = InvertedIndex()
+                index.add(paper_text(p) for p in corpus)
+                keyword_index = index
+    return keyword_index
+
+# Approximate (IVF/PQ) index over the corpus embeddings, built or loaded on first use.
+# It covers rows [0, len(ann_index)); rows appended later are scored exactly until the
+# un-indexed tail exceeds ANN_REBUILD_FRACTION of the corpus, which triggers a rebuild.
+ANN_INDEX_PATH = os.getenv("BASEROOT_ANN_INDEX_PATH")
+ANN_NLIST = int(os.getenv("BASEROOT_ANN_NLIST", "0")) or None # Default: ~sqrt(corpus size)
+ANN_PQ_M = int(os.getenv("BASEROOT_ANN_PQ_M", "0")) # 0 keeps full-precision vectors in the lists
+ANN_NPROBE = int(os.getenv("BASEROOT_ANN_NPROBE", "8"))
+ANN_REBUILD_FRACTION = 0.1
+ann_index: Optional[IVFIndex] = None
+
+def _ann_index_is_stale() -> bool:
+    size = len(corpus_index)
+    return ann_index is None or size - len(ann_index) > ANN_REBUILD_FRACTION * size
+
+def _get_ann_index() -> IVFIndex:
+    global ann_index
+    if not _ann_index_is_stale():
+        return ann_index
+    with _index_lock:
+        size = len(corpus_index)
+        if ann_index is None and ANN_INDEX_PATH and os.path.exists(ANN_INDEX_PATH):
+            loaded = IVFIndex.load(ANN_INDEX_PATH)
+            if len(loaded) <= size and loaded.dim == corpus_index.dim:
+                ann_index = loaded
+        if _ann_index_is_stale():
+            ann_index = IVFIndex.build(corpus_index.vectors, nlist=ANN_NLIST, pq_m=ANN_PQ_M, nprobe=ANN_NPROBE)
+            if ANN_INDEX_PATH:
+                ann_index.save(ANN_INDEX_PATH)
+    return ann_index
+
+def _approximate_search(query: np.ndarray, k: int, nprobe: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    index = _get_ann_index()
+    rows, scores = index.search(query, k, nprobe, refine_vectors=corpus_index.vectors)
+    indexed = len(index)
+    if indexed < len(corpus_index): # Papers added since the build: score the tail exactly
+        tail_scores = corpus_index.vectors[indexed:] @ query
+        rows = np.concatenate([rows, np.arange(indexed, len(corpus_index))])
+        scores = np.concatenate([scores, tail_scores])
+        best = top_k_indices(scores, k)
+        rows, scores = rows[best], scores[best]
+    return rows, scores
+
+def add_papers_to_corpus(papers: List[Dict]) -> None:
+    """Appends papers to the corpus and incrementally updates both indexes."""
+    global corpus_version
+    if not papers:
+        return
+    texts = [paper_text(p) for p in papers]
+    vectors = embedder.embed(texts)
+    with _index_lock:
+        # Metadata first, so concurrent searches never see an index row without its paper
+        if corpus_store is not None:
+            corpus_store.append(papers, vectors)
+            corpus_index.wrap(corpus_store.embeddings)
+        else:
+            fake_corpus.extend(papers)
+            corpus_index.add(vectors)
+        if keyword_index is not None:
+            keyword_index.add(texts)
+        corpus_version += 1
+
+def _similar_paper_fields(paper: Dict, score: float) -> Dict:
+    return {
+        "id": paper["id"],
+        "title": paper["title"],
+        "abstract_snippet": paper["abstract"][:150] + "...", # Snippet
+        "similarity_score": round(min(max(score, 0.0), 1.0), 4), # Normalized to [0, 1]
+        "source_url": f"https://example.com/papers/{paper['id']}", # Fake URL
+        "authors": paper.get("authors"),
+        "publication_date": paper.get("publication_date")
+    }
+
+def _to_similar_paper(paper: Dict, score: float) -> SimilarPaper:
+    return SimilarPaper(**_similar_paper_fields(paper, score))
+
+def _parse_query(request: AISearchRequest) -> Tuple[Dict, str, str]:
     """
-    Endpoint for AI-powered literature discovery.
-    Accepts keywords and/or an abstract to find similar research papers.
-    
-    Simplified simulation:
-    - Processes input keywords/abstract.
-    - "Calculates" similarity against a fake corpus (random scores).
-    - Returns top_k results.
-    
-    Real implementation would:
-    1. Load a pre-trained sentence embedding model (e.g., from HuggingFace Sentence Transformers).
-    2. Convert the input keywords/abstract into a dense vector embedding.
-    3. Have a corpus of research papers, also pre-processed into vector embeddings, stored in a vector database (e.g., FAISS, Pinecone, Weaviate) or a searchable index.
-    4. Perform a similarity search (e.g., cosine similarity) between the input vector and the corpus vectors.
-    5. Retrieve the top_k most similar papers.
-    6. Optionally, fetch citation data if available.
+    Validates the request and returns (query_received, combined query text, retrieval mode).
+    Keywords are normalized here (stripped, lowercased, sorted), so the scored text is exactly
+    what _cache_key hashes.
     """
     query_received = {}
     input_text_parts = []
@@ -109,7 +237,7 @@ async def discover_literature_endpoint(request: AISearchRequest = Body(...)):
 
     if request.keywords:
         query_received["keywords"] = request.keywords
-        input_text_parts.extend(request.keywords)
+        input_text_parts.extend(sorted(kw.strip().lower() for kw in request.keywords))
     
     if request.abstract:
         query_received["abstract"] = request.abstract
@@ -119,48 +247,229 @@ async def discover_literature_endpoint(request: AISearchRequest = Body(...)):
     combined_input_text = " ".join(input_text_parts)
     query_received["combined_input_for_similarity"] = combined_input_text
 
-    # Simulate similarity search
-    # In a real scenario, you would embed combined_input_text and compare with embeddings of fake_corpus items
-    import random
-    results = []
-    for paper in fake_corpus:
-        # Simulate a score based on keyword overlap or just random for now
-        score = 0
-        if request.keywords:
-            for kw in request.keywords:
-                if kw.lower() in paper["title"].lower() or kw.lower() in paper["abstract"].lower() or kw.lower() in [pk.lower() for pk in paper.get("keywords", [])]:
-                    score += random.uniform(0.3, 0.8) # Increased score for keyword match
-        if request.abstract: # Add some score if abstract is provided, very naive
-            score += random.uniform(0.1, 0.3)
-        
-        # Ensure score is capped and normalized somewhat for this simulation
-        final_score = min(max(score, 0.0), 1.0) 
-        if final_score == 0.0: # Ensure some score if no keywords matched but abstract was given
-            final_score = random.uniform(0.05, 0.2) if request.abstract else 0.0
-
-        results.append({
-            "id": paper["id"],
-            "title": paper["title"],
-            "abstract_snippet": paper["abstract"][:150] + "...", # Snippet
-            "similarity_score": round(final_score, 4),
-            "source_url": f"https://example.com/papers/{paper['id']}", # Fake URL
-            "authors": paper.get("authors"),
-            "publication_date": paper.get("publication_date")
-        })
+    retrieval_mode = request.retrieval_mode or ("semantic" if request.abstract else "lexical")
+    query_received["retrieval_mode"] = retrieval_mode
+    if retrieval_mode == "semantic":
+        query_received["search_strategy"] = request.search_strategy
+    return query_received, combined_input_text, retrieval_mode
+
+def _cache_key(request: AISearchRequest, combined_input_text: str, retrieval_mode: str) -> Tuple:
+    """Hash of the scored text from _parse_query, top_k and mode (plus ANN settings)."""
+    text_hash = hashlib.sha256(combined_input_text.encode("utf-8")).hexdigest()
+    if retrieval_mode == "semantic" and request.search_strategy == "approximate":
+        return (text_hash, request.top_k, retrieval_mode, "approximate", request.nprobe)
+    return (text_hash, request.top_k, retrieval_mode)
+
+def _score_query(request: AISearchRequest, combined_input_text: str, retrieval_mode: str) -> List[SimilarPaper]:
+    """Scores one query; exact semantic queries are better scored together via _score_queries."""
+    top_k = request.top_k
+    if retrieval_mode == "lexical":
+        rows, scores, max_possible = _get_keyword_index().search(combined_input_text, top_k)
+        if max_possible > 0:
+            scores = scores / max_possible
+    elif request.search_strategy == "approximate":
+        rows, scores = _approximate_search(embedder.embed_one(combined_input_text), top_k, request.nprobe)
+    else:
+        rows, scores = corpus_index.search(embedder.embed_one(combined_input_text), top_k)
+    return [_to_similar_paper(corpus[row], float(score)) for row, score in zip(rows, scores)]
+
+def _score_queries(items: List[Tuple[AISearchRequest, str, str]]) -> List[List[SimilarPaper]]:
+    """
+    Scores (request, combined text, retrieval mode) items, one result list per item.
+    Exact semantic queries are embedded together and scored with a single matrix-matrix
+    product plus per-row top-k; lexical and approximate queries are scored one by one.
+    Runs on the scoring pool, never on the event loop.
+    """
+    results: List[Optional[List[SimilarPaper]]] = [None] * len(items)
+    exact_semantic = []
+    for i, (request, text, mode) in enumerate(items):
+        if mode == "semantic" and request.search_strategy == "exact":
+            exact_semantic.append(i)
+        else:
+            results[i] = _score_query(request, text, mode)
+
+    if exact_semantic:
+        query_matrix = embedder.embed([items[i][1] for i in exact_semantic])
+        max_k = max(items[i][0].top_k for i in exact_semantic)
+        batch_rows, batch_scores = corpus_index.search_batch(query_matrix, max_k)
+        for i, rows, scores in zip(exact_semantic, batch_rows, batch_scores):
+            top_k = items[i][0].top_k
+            results[i] = [_to_similar_paper(corpus[row], float(score)) for row, score in zip(rows[:top_k], scores[:top_k])]
+    return results
+
+# CPU-bound scoring and embedding run on this pool so other routers stay responsive.
+# Queries arriving within BASEROOT_AI_BATCH_WINDOW_MS of each other share one scoring pass.
+scoring_pool = ScoringPool(
+    _score_queries,
+    kind=os.getenv("BASEROOT_AI_POOL_KIND", "thread"),
+    max_workers=int(os.getenv("BASEROOT_AI_POOL_WORKERS", "2")),
+    max_pending=int(os.getenv("BASEROOT_AI_POOL_MAX_PENDING", "256")),
+    timeout_seconds=float(os.getenv("BASEROOT_AI_TIMEOUT_SECONDS", "10")),
+    batch_window_ms=float(os.getenv("BASEROOT_AI_BATCH_WINDOW_MS", "2")),
+    max_batch_size=int(os.getenv("BASEROOT_AI_MAX_MICRO_BATCH", "64")),
+)
+
+async def _run_scoring(awaitable):
+    """Awaits a scoring pool job, mapping saturation and timeouts to HTTP errors."""
+    try:
+        return await awaitable
+    except PoolSaturatedError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Literature discovery timed out.")
+
+@router.post("/discover_literature", response_model=AISearchResponse)
+async def discover_literature_endpoint(request: AISearchRequest = Body(...)):
+    """
+    Endpoint for AI-powered literature discovery.
+    Accepts keywords and/or an abstract to find similar research papers.
     
-    # Sort by similarity score (descending) and take top_k
-    sorted_results = sorted(results, key=lambda x: x["similarity_score"], reverse=True)
-    top_k_results = [SimilarPaper(**res) for res in sorted_results[:request.top_k]]
+    Current implementation:
+    - Combines the input keywords/abstract into one query text.
+    - Lexical mode: ranks papers containing a query term with BM25 over the
+      inverted keyword index (scores normalized by the query's maximum BM25 score).
+    - Semantic mode: embeds the query with the offline `HashingEmbedder`, scores it
+      against every corpus embedding with a single matrix-vector product and
+      selects the top_k papers with a partial sort (cosine similarity).
+    Both modes are deterministic, so results are served from an LRU + TTL cache
+    keyed by the normalized query and invalidated whenever the corpus changes.
+    Cache misses are scored on the scoring pool (micro-batched with concurrent
+    queries); a full queue returns 503 and a slow query 504.
+    
+    Real implementation would:
+    1. Swap `HashingEmbedder` for a pre-trained sentence embedding model (e.g., from HuggingFace Sentence Transformers).
+    2. Populate the corpus from actual research data (e.g., via an API or database).
+    3. Optionally, fetch citation data if available.
+    """
+    query_received, combined_input_text, retrieval_mode = _parse_query(request)
+
+    cache_key = _cache_key(request, combined_input_text, retrieval_mode)
+    version = corpus_version
+    top_k_results = literature_cache.get(cache_key, version)
+    if top_k_results is None:
+        top_k_results = await _run_scoring(scoring_pool.submit((request, combined_input_text, retrieval_mode)))
+        literature_cache.put(cache_key, top_k_results, version)
 
     return AISearchResponse(
         query_received=query_received,
         similar_papers=top_k_results,
-        message=f"Successfully retrieved {len(top_k_results)} similar papers (simulated)."
+        message=f"Successfully retrieved {len(top_k_results)} similar papers."
     )
 
+# Upper bound on queries per batch request, to keep one request's score matrix bounded
+MAX_BATCH_QUERIES = 1000
+
+@router.post("/discover_literature_batch", response_model=List[AISearchResponse])
+async def discover_literature_batch_endpoint(requests: List[AISearchRequest] = Body(...)):
+    """
+    Batch variant of discover_literature for offline recommendation jobs.
+    Returns one AISearchResponse per query, in request order.
+    Cache misses are scored in one job on the scoring pool: exact semantic queries are
+    embedded together and scored with a single matrix-matrix product, followed by
+    per-row top-k selection; lexical and approximate queries are ranked individually.
+    """
+    if len(requests) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_BATCH_QUERIES} queries per batch.")
+
+    parsed = []
+    for i, request in enumerate(requests):
+        try:
+            parsed.append(_parse_query(request))
+        except HTTPException as exc:
+            raise HTTPException(status_code=exc.status_code, detail=f"Query {i}: {exc.detail}")
+
+    version = corpus_version
+    results: List[Optional[List[SimilarPaper]]] = []
+    misses = [] # indexes into requests
+    for i, (request, (_, text, mode)) in enumerate(zip(requests, parsed)):
+        cached = literature_cache.get(_cache_key(request, text, mode), version)
+        if cached is None:
+            misses.append(i)
+        results.append(cached)
+
+    if misses:
+        # One pool job for the whole batch: it already shares a single scoring pass
+        miss_items = [(requests[i], parsed[i][1], parsed[i][2]) for i in misses]
+        scored = await _run_scoring(scoring_pool.run(_score_queries, miss_items))
+        for i, papers in zip(misses, scored):
+            literature_cache.put(_cache_key(requests[i], parsed[i][1], parsed[i][2]), papers, version)
+            results[i] = papers
+
+    return [
+        AISearchResponse(
+            query_received=query_received,
+            similar_papers=papers,
+            message=f"Successfully retrieved {len(papers)} similar papers."
+        )
+        for (query_received, _, _), papers in zip(parsed, results)
+    ]
+
+def _top_k_candidates(request: AISearchRequest, combined_input_text: str, retrieval_mode: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Selects the top_k (row, score) candidates for a streaming query without ordering them
+    (a partial sort only); ordering happens lazily as results are emitted.
+    """
+    if retrieval_mode == "lexical":
+        rows, scores, max_possible = _get_keyword_index().score(combined_input_text)
+        if max_possible > 0:
+            scores = scores / max_possible
+    elif request.search_strategy == "approximate":
+        return _approximate_search(embedder.embed_one(combined_input_text), request.top_k, request.nprobe)
+    else:
+        scores = corpus_index.vectors @ embedder.embed_one(combined_input_text)
+        rows = np.arange(scores.shape[0])
+    n, k = scores.shape[0], min(request.top_k, scores.shape[0])
+    if k < n:
+        selected = np.argpartition(scores, n - k)[n - k :]
+        rows, scores = rows[selected], scores[selected]
+    return rows, scores
+
+# Results emitted per chunk of the NDJSON stream
+STREAM_CHUNK_SIZE = 64
+
+async def _stream_results(rows: np.ndarray, scores: np.ndarray) -> AsyncIterator[bytes]:
+    # Max-heap over the candidates: O(k) to build, then O(log k) per emitted result,
+    # so the first results go out before the remaining candidates are ordered.
+    heap = list(zip((-scores).tolist(), rows.tolist()))
+    heapq.heapify(heap)
+    while heap:
+        lines = []
+        for _ in range(min(STREAM_CHUNK_SIZE, len(heap))):
+            neg_score, row = heapq.heappop(heap)
+            # The snippet and the record itself are only built for papers actually emitted
+            lines.append(json.dumps(_similar_paper_fields(corpus[row], -neg_score)))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+        await asyncio.sleep(0) # let other requests run between chunks
+
+@router.post("/discover_literature/stream")
+async def discover_literature_stream_endpoint(request: AIStreamSearchRequest = Body(...)):
+    """
+    Streaming variant of discover_literature for large top_k (up to 10000).
+    Responds with newline-delimited JSON: one SimilarPaper object per line, in score order.
+    Candidate selection (scoring + partial sort) runs on the scoring pool; results are
+    then ordered and serialized incrementally, so time-to-first-result and memory stay
+    roughly constant as top_k grows. Streams are not cached.
+    """
+    _, combined_input_text, retrieval_mode = _parse_query(request)
+    rows, scores = await _run_scoring(scoring_pool.run(_top_k_candidates, request, combined_input_text, retrieval_mode))
+    return StreamingResponse(
+        _stream_results(rows, scores),
+        media_type="application/x-ndjson",
+        headers={"X-Retrieval-Mode": retrieval_mode},
+    )
+
+@router.get("/cache_stats")
+async def literature_cache_stats_endpoint():
+    """Hit/miss/eviction counters of the discover_literature result cache, for sizing it."""
+    return {**literature_cache.stats(), "corpus_version": corpus_version}
+
+@router.get("/pool_stats")
+async def scoring_pool_stats_endpoint():
+    """Queue depth, rejections, timeouts and micro-batch sizes of the scoring pool."""
+    return scoring_pool.stats()
+
 # TODO:
-# - Implement actual model loading and embedding generation.
-# - Integrate with a vector database or FAISS for efficient similarity search.
+# - Implement actual model loading and embedding generation (plug a model into the Embedder interface).
 # - Populate the corpus from actual research data (e.g., via an API or database).
 # - Implement citation fetching logic (complex, may require external APIs like Semantic Scholar, CrossRef).
 # - Add more sophisticated text processing and query understanding.
@@ -0,0 +1,191 @@
+"""
+Approximate nearest-neighbour (ANN) index for the AI literature discovery API.
+
+`IVFIndex` is an inverted-file index in pure NumPy:
+- a coarse k-means quantizer splits the corpus into `nlist` lists;
+- a query only scans the `nprobe` lists whose centroids score highest, so
+  `nprobe` trades recall for latency (nprobe == nlist is exhaustive);
+- optionally, vectors are stored as product-quantized (PQ) codes: each vector is
+  split into `pq_m` sub-vectors and each sub-vector is replaced by the id of its
+  nearest sub-centroid (one byte), cutting memory by 4 * dim / pq_m and scoring
+  through per-query lookup tables (asymmetric distance computation).
+
+Lists are stored in CSR layout (rows sorted by list, with list offsets) so a
+probe is a contiguous slice. Indexes are built offline with `IVFIndex.build`,
+persisted with `save` and reopened with `IVFIndex.load`. Use `recall_at_k`
+against the exact `VectorIndex` results to pick `nlist`/`nprobe`.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from baseroot_backend.literature_index import top_k_indices
+
+_ASSIGN_CHUNK = 65536
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, inner_product: bool) -> np.ndarray:
+    """Nearest centroid per row (max inner product, or min euclidean distance)."""
+    out = np.empty(vectors.shape[0], dtype=np.int64)
+    centroid_norms = None if inner_product else (centroids ** 2).sum(axis=1)
+    for start in range(0, vectors.shape[0], _ASSIGN_CHUNK):
+        scores = vectors[start : start + _ASSIGN_CHUNK] @ centroids.T
+        if inner_product:
+            out[start : start + _ASSIGN_CHUNK] = scores.argmax(axis=1)
+        else:
+            # argmin ||x - c||^2 == argmin ||c||^2 - 2 x.c
+            out[start : start + _ASSIGN_CHUNK] = (centroid_norms - 2 * scores).argmin(axis=1)
+    return out
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0,
+           inner_product: bool = False) -> np.ndarray:
+    """
+    Lloyd's k-means. With inner_product=True the centroids are kept unit-norm
+    (spherical k-means), which matches cosine scoring of normalized embeddings.
+    """
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    if not 0 < k <= n:
+        raise ValueError(f"k must be in [1, {n}], got {k}")
+    centroids = vectors[rng.choice(n, size=k, replace=False)].astype(np.float32, copy=True)
+    for _ in range(iterations):
+        assignment = _assign(vectors, centroids, inner_product)
+        counts = np.bincount(assignment, minlength=k)
+        order = np.argsort(assignment, kind="stable")
+        nonempty = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+        centroids[nonempty] = np.add.reduceat(vectors[order], starts, axis=0) / counts[nonempty, None]
+        empty = np.flatnonzero(~nonempty)
+        if empty.size: # Re-seed empty clusters with random points
+            centroids[empty] = vectors[rng.choice(n, size=empty.size, replace=False)]
+        if inner_product:
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            np.divide(centroids, norms, out=centroids, where=norms > 0)
+    return centroids
+
+
+def recall_at_k(approximate_rows: Sequence[np.ndarray], exact_rows: Sequence[np.ndarray]) -> float:
+    """
+    Mean fraction of the exact top-k found by the approximate search.
+    Both arguments hold one row-id array per query (approximate results may be shorter).
+    """
+    hits = [len(np.intersect1d(a, e)) / len(e) for a, e in zip(approximate_rows, exact_rows) if len(e)]
+    return float(np.mean(hits)) if hits else 1.0
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, row_ids: np.ndarray,
+                 vectors: Optional[np.ndarray] = None, pq_codebooks: Optional[np.ndarray] = None,
+                 pq_codes: Optional[np.ndarray] = None, nprobe: int = 8):
+        """Use `IVFIndex.build` or `IVFIndex.load` rather than calling this directly."""
+        self.centroids = centroids
+        self.list_offsets = list_offsets # list l holds positions list_offsets[l]:list_offsets[l + 1]
+        self.row_ids = row_ids # corpus row of each stored position
+        self.vectors = vectors # raw float32 vectors (flat IVF), or None with PQ
+        self.pq_codebooks = pq_codebooks # (pq_m, ksub, dim // pq_m)
+        self.pq_codes = pq_codes # (positions, pq_m) uint8
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    def __len__(self) -> int:
+        return self.row_ids.shape[0]
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None, pq_m: int = 0, nprobe: int = 8,
+              iterations: int = 10, max_training_points: int = 100_000, seed: int = 0) -> "IVFIndex":
+        """
+        Trains the coarse quantizer (and PQ codebooks if pq_m > 0) and indexes every row.
+        nlist defaults to ~sqrt(n), a common balance between probe cost and list length.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over an empty corpus")
+        nlist = min(nlist or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(seed)
+        training = vectors[rng.choice(n, size=min(n, max_training_points), replace=False)]
+        centroids = kmeans(training, nlist, iterations, seed, inner_product=True)
+
+        assignment = _assign(vectors, centroids, inner_product=True)
+        order = np.argsort(assignment, kind="stable")
+        list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=nlist)))).astype(np.int64)
+
+        if pq_m:
+            if dim % pq_m:
+                raise ValueError(f"pq_m must divide dim ({dim})")
+            sub = dim // pq_m
+            ksub = min(256, training.shape[0])
+            codebooks = np.stack([
+                kmeans(np.ascontiguousarray(training[:, j * sub : (j + 1) * sub]), ksub, iterations, seed + j)
+                for j in range(pq_m)
+            ])
+            ordered = vectors[order]
+            codes = np.stack([
+                _assign(np.ascontiguousarray(ordered[:, j * sub : (j + 1) * sub]), codebooks[j], inner_product=False)
+                for j in range(pq_m)
+            ], axis=1).astype(np.uint8)
+            return cls(centroids, list_offsets, order, pq_codebooks=codebooks, pq_codes=codes, nprobe=nprobe)
+        return cls(centroids, list_offsets, order, vectors=vectors[order], nprobe=nprobe)
+
+    def _candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        probes = top_k_indices(self.centroids @ query, min(nprobe, self.nlist))
+        return np.concatenate([np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in probes])
+
+    def _score_positions(self, query: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        if self.vectors is not None:
+            return self.vectors[positions] @ query
+        pq_m, _, sub = self.pq_codebooks.shape
+        # Lookup table: inner product of each query sub-vector with every sub-centroid
+        table = np.einsum("mkd,md->mk", self.pq_codebooks, query.reshape(pq_m, sub))
+        return table[np.arange(pq_m), self.pq_codes[positions]].sum(axis=1)
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None,
+               refine_vectors: Optional[np.ndarray] = None, refine_factor: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (corpus rows, scores) of the best k rows in the probed lists.
+        With PQ codes, passing the full-precision corpus matrix as `refine_vectors`
+        re-scores the best k * refine_factor PQ candidates exactly.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        positions = self._candidates(query, nprobe or self.nprobe)
+        if positions.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self._score_positions(query, positions)
+        if self.vectors is None and refine_vectors is not None:
+            shortlist = self.row_ids[positions[top_k_indices(scores, k * refine_factor)]]
+            exact = refine_vectors[shortlist] @ query
+            best = top_k_indices(exact, k)
+            return shortlist[best], exact[best]
+        best = top_k_indices(scores, k)
+        return self.row_ids[positions[best]], scores[best]
+
+    def save(self, path: str) -> None:
+        arrays = {"centroids": self.centroids, "list_offsets": self.list_offsets, "row_ids": self.row_ids,
+                  "nprobe": np.array(self.nprobe)}
+        if self.vectors is not None:
+            arrays["vectors"] = self.vectors
+        else:
+            arrays["pq_codebooks"] = self.pq_codebooks
+            arrays["pq_codes"] = self.pq_codes
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as data:
+            return cls(
+                data["centroids"], data["list_offsets"], data["row_ids"],
+                vectors=data["vectors"] if "vectors" in data else None,
+                pq_codebooks=data["pq_codebooks"] if "pq_codebooks" in data else None,
+                pq_codes=data["pq_codes"] if "pq_codes" in data else None,
+                nprobe=int(data["nprobe"]),
+            )
@@ -1,7 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+import json
+import os
+
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import List, Optional, Tuple
+
+from baseroot_backend.database import get_db
+from baseroot_backend.session_tokens import (
+    ChallengeStore, InvalidTokenError, SessionClaims, SignatureUnavailableError, SignatureVerifier, signer_from_env,
+)
+from baseroot_backend.sql_repositories import SqlUserRepository
+from baseroot_backend.user_repository import DBUser, InMemoryUserRepository
+from baseroot_backend.wallet_addresses import decode_wallet_addresses, is_wallet_address
 
 # This will be in a separate db.py or models.py later
 # For now, let's assume a User model and a get_db dependency are available
@@ -22,66 +35,227 @@ class UserResponse(BaseModel):
     class Config:
         orm_mode = True # or from_attributes = True for Pydantic v2
 
+class ChallengeRequest(BaseModel):
+    wallet_address: str
+
+class ChallengeResponse(BaseModel):
+    wallet_address: str
+    nonce: str
+    message: str # Exact text the wallet must sign
+    expires_at: int # Unix timestamp
+
+class LoginRequest(BaseModel):
+    wallet_address: str
+    nonce: str
+    signature: str # base58-encoded ed25519 signature of the challenge message
+
+class LoginResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: int # Unix timestamp
+    user: UserResponse
+
+class BulkConnectResponse(BaseModel):
+    received: int
+    created: int
+    existing: int
+    duplicates: int # Repeats of an earlier row in the same batch
+    invalid: int
+    user_ids: List[Optional[int]] # Per input row; null for invalid addresses
+    statuses: str # One character per input row: c=created, e=existing, d=duplicate, i=invalid
+
 router = APIRouter(
     prefix="/auth",
     tags=["authentication"],
 )
 
-# Simulated DB for now
-fake_users_db = {}
-next_user_id = 1
+# Simulated DB when DATABASE_URL is not set: O(1) wallet lookups through the repository's unique wallet index
+user_repository = InMemoryUserRepository()
+fake_users_db = user_repository.users_by_id # Read-only id -> DBUser view
+
+# Wallet sign-in: one-time challenges, cached signature checks and stateless HMAC session tokens
+challenge_store = ChallengeStore()
+signature_verifier = SignatureVerifier()
+session_signer = signer_from_env()
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+MAX_BULK_CONNECT_WALLETS = int(os.getenv("BASEROOT_BULK_CONNECT_MAX_WALLETS", "200000"))
+
+def _validate_wallet_address(wallet_address: str) -> None:
+    # Same rule as the bulk import: base58 that decodes to a 32-byte public key
+    if not is_wallet_address(wallet_address):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid wallet address format.")
+
+async def optional_session(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme),
+) -> Optional[SessionClaims]:
+    """
+    Session of the caller, or None for anonymous requests.
+    A present but invalid/expired bearer token is rejected with 401.
+    Verification is one HMAC over the token; there is no store lookup.
+    """
+    if credentials is None:
+        return None
+    try:
+        return session_signer.verify(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e), headers={"WWW-Authenticate": "Bearer"}
+        )
 
-class DBUser:
-    def __init__(self, id, wallet_address, username=None):
-        self.id = id
-        self.wallet_address = wallet_address
-        self.username = username
+async def _get_or_create_user(db: Optional[AsyncConnection], wallet_address: str) -> Tuple[DBUser, bool]:
+    if db is None:
+        return user_repository.get_or_create(wallet_address)
+    user, created = await SqlUserRepository(db).get_or_create(wallet_address)
+    await db.commit()
+    return user, created
 
 @router.post("/connect_wallet", response_model=UserResponse)
-async def connect_wallet(request: WalletConnectRequest):
+async def connect_wallet(request: WalletConnectRequest, db: Optional[AsyncConnection] = Depends(get_db)):
     """
     Connects a user's wallet. 
     If the wallet address is new, a new user record is created.
     If the wallet address already exists, logs the user in (conceptually).
     """
-    global next_user_id
     wallet_address = request.wallet_address
+    _validate_wallet_address(wallet_address)
 
-    # Basic validation for Solana wallet address (length, characters - very basic)
-    if not (32 <= len(wallet_address) <= 44 and wallet_address.isalnum()):
-        # This is a very basic check, real validation would be more robust (e.g. base58 check)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid wallet address format.")
-
-    # Check if user exists
-    existing_user = None
-    for user_id, user_data in fake_users_db.items():
-        if user_data.wallet_address == wallet_address:
-            existing_user = user_data
-            break
+    # Look up or atomically create the user (exactly one user per wallet, even under concurrent connects)
+    user, created = await _get_or_create_user(db, wallet_address)
 
-    if existing_user:
+    if not created:
         return UserResponse(
-            id=existing_user.id,
-            wallet_address=existing_user.wallet_address,
-            username=existing_user.username,
+            id=user.id,
+            wallet_address=user.wallet_address,
+            username=user.username,
             message="Wallet connected successfully. Welcome back!"
         )
     else:
-        # Create new user
-        new_user_id = next_user_id
-        new_db_user = DBUser(id=new_user_id, wallet_address=wallet_address)
-        fake_users_db[new_user_id] = new_db_user
-        next_user_id += 1
-        
         return UserResponse(
-            id=new_db_user.id,
-            wallet_address=new_db_user.wallet_address,
+            id=user.id,
+            wallet_address=user.wallet_address,
             message="New user created and wallet connected successfully."
         )
 
+def _parse_bulk_wallets(body: bytes, content_type: str) -> List[str]:
+    """JSON array of strings, or NDJSON / plain text with one address (bare or JSON string) per line."""
+    try:
+        if "ndjson" in content_type or content_type.startswith("text/plain"):
+            lines = (line.strip() for line in body.decode("utf-8").splitlines())
+            wallets = [json.loads(line) if line.startswith('"') else line for line in lines if line]
+        else:
+            wallets = json.loads(body)
+    except (UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON of wallet addresses.")
+    if not isinstance(wallets, list) or not all(isinstance(w, str) for w in wallets):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON of wallet addresses.")
+    return wallets
+
+def _dedupe_valid_wallets(wallets: List[str]) -> Tuple[List[str], dict]:
+    """Validates the batch; returns per-row status codes so far and wallet -> first valid row."""
+    valid, _ = decode_wallet_addresses(wallets)
+    statuses = ["i"] * len(wallets)
+    first_row = {} # wallet -> first valid row in this batch
+    for row in valid.nonzero()[0].tolist():
+        wallet = wallets[row]
+        if wallet in first_row:
+            statuses[row] = "d"
+        else:
+            first_row[wallet] = row
+    return statuses, first_row
+
+def _bulk_response(wallets: List[str], statuses: List[str], first_row: dict, results) -> BulkConnectResponse:
+    user_ids: List[Optional[int]] = [None] * len(wallets)
+    for (user, created), row in zip(results, first_row.values()):
+        statuses[row] = "c" if created else "e"
+        user_ids[row] = user.id
+    for row, code in enumerate(statuses):
+        if code == "d":
+            user_ids[row] = user_ids[first_row[wallets[row]]]
+    created = sum(created for _, created in results)
+    return BulkConnectResponse(
+        received=len(wallets),
+        created=created,
+        existing=len(results) - created,
+        duplicates=statuses.count("d"),
+        invalid=statuses.count("i"),
+        user_ids=user_ids,
+        statuses="".join(statuses),
+    )
+
+@router.post("/bulk_connect_wallets", response_model=BulkConnectResponse)
+async def bulk_connect_wallets(request: Request, db: Optional[AsyncConnection] = Depends(get_db)):
+    """
+    Registers many wallets in one call (e.g. migrating a partner community).
+    Accepts a JSON array of addresses, or NDJSON / text/plain with one address per line.
+    Addresses are validated in one vectorized pass with real base58 decoding (must decode
+    to a 32-byte public key), de-duplicated within the batch and against existing users,
+    and new users get one contiguous block of ids. The response is columnar: one user id
+    and one status character per input row.
+    """
+    wallets = _parse_bulk_wallets(await request.body(), request.headers.get("content-type", ""))
+    if len(wallets) > MAX_BULK_CONNECT_WALLETS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_CONNECT_WALLETS} wallet addresses per request.",
+        )
+    # Validation and id allocation are CPU-bound for large batches; keep them off the event loop
+    statuses, first_row = await run_in_threadpool(_dedupe_valid_wallets, wallets)
+    if db is None:
+        results = await run_in_threadpool(user_repository.bulk_get_or_create, list(first_row))
+    else:
+        results = await SqlUserRepository(db).bulk_get_or_create(list(first_row))
+        await db.commit()
+    return await run_in_threadpool(_bulk_response, wallets, statuses, first_row, results)
+
+@router.post("/challenge", response_model=ChallengeResponse)
+async def create_login_challenge(request: ChallengeRequest):
+    """
+    Starts wallet sign-in: returns a one-time nonce and the message the wallet must sign.
+    The signed message is then exchanged for a session token at /auth/login.
+    """
+    _validate_wallet_address(request.wallet_address)
+    challenge = challenge_store.issue(request.wallet_address)
+    return ChallengeResponse(
+        wallet_address=challenge.wallet_address,
+        nonce=challenge.nonce,
+        message=challenge.message,
+        expires_at=challenge.expires_at,
+    )
+
+@router.post("/login", response_model=LoginResponse)
+async def login_with_signature(request: LoginRequest, db: Optional[AsyncConnection] = Depends(get_db)):
+    """
+    Completes wallet sign-in. Verifies the ed25519 signature of the challenge message
+    against the wallet's public key, consumes the nonce and issues a stateless session token.
+    Send it as `Authorization: Bearer <token>` to the /nft and /dao routers.
+    """
+    challenge = challenge_store.get(request.wallet_address, request.nonce)
+    if challenge is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown or expired login challenge.")
+    try:
+        valid = signature_verifier.verify(request.wallet_address, request.nonce, challenge.message, request.signature)
+    except SignatureUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid wallet signature.")
+    if not challenge_store.consume(request.nonce):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Login challenge already used.")
+
+    user, created = await _get_or_create_user(db, request.wallet_address)
+    token, expires_at = session_signer.issue(user.wallet_address, user.id)
+    return LoginResponse(
+        access_token=token,
+        expires_at=expires_at,
+        user=UserResponse(
+            id=user.id,
+            wallet_address=user.wallet_address,
+            username=user.username,
+            message="New user created and signed in." if created else "Signed in successfully.",
+        ),
+    )
+
 # TODO:
-# - Integrate with actual PostgreSQL database using SQLAlchemy.
-# - Implement proper session management (e.g., JWT tokens if needed for subsequent requests, though wallet signature might be used).
 # - Add more robust error handling.
 # - Add endpoint to update user profile (e.g., set username).
 
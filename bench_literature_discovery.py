@@ -0,0 +1,173 @@
+"""
+Benchmark harness for literature discovery retrieval modes.
+
+For each corpus size it generates a deterministic synthetic corpus
+(`synthetic_corpus.py`) and measures, per retrieval mode:
+- index build time and memory footprint of the index structures;
+- single-query latency (p50/p95/p99) and sequential throughput;
+- recall@k against exact brute-force semantic search (semantic modes).
+
+Modes: semantic_exact (VectorIndex), semantic_exact_batch (matrix-matrix
+scoring, throughput only), semantic_ivf and semantic_ivf_pq (IVFIndex), and
+lexical_bm25 (InvertedIndex, skipped above --lexical-max-papers because its
+build is pure Python).
+
+Results are written as JSON so runs can be compared; with --baseline the
+run fails (exit code 1) when p99 latency or recall regresses beyond
+--max-regression relative to the baseline file.
+
+Example:
+    python -m baseroot_backend.bench_literature_discovery --sizes 10000 200000 \
+        --output bench_literature_results.json --baseline previous_results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from baseroot_backend.ann_index import IVFIndex, recall_at_k
+from baseroot_backend.literature_index import HashingEmbedder, InvertedIndex, VectorIndex
+from baseroot_backend.synthetic_corpus import SyntheticCorpus
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "throughput_qps": round(len(values) / (values.sum() / 1000.0), 2) if values.sum() else None,
+    }
+
+
+def _time_queries(search: Callable[[int], np.ndarray], n_queries: int):
+    latencies, results = [], []
+    for i in range(n_queries):
+        started = time.perf_counter()
+        results.append(search(i))
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def _ivf_nbytes(index: IVFIndex) -> int:
+    arrays = [index.centroids, index.list_offsets, index.row_ids, index.vectors, index.pq_codebooks, index.pq_codes]
+    return int(sum(a.nbytes for a in arrays if a is not None))
+
+
+def run_size(n_papers: int, n_queries: int, k: int, dim: int, nprobe: int, pq_m: int,
+             lexical_max_papers: int, seed: int) -> Dict:
+    corpus = SyntheticCorpus(n_papers, seed=seed)
+    embedder = HashingEmbedder(dim=dim, use_bigrams=False)
+    queries = corpus.queries(n_queries)
+    query_vectors = embedder.embed(queries)
+    result: Dict = {"n_papers": n_papers, "n_queries": n_queries, "k": k, "modes": {}}
+
+    started = time.perf_counter()
+    vector_index = VectorIndex(dim, initial_capacity=n_papers)
+    vector_index.add(corpus.hashed_embeddings(embedder))
+    build = time.perf_counter() - started
+    latencies, exact = _time_queries(lambda i: vector_index.search(query_vectors[i], k)[0], n_queries)
+    result["modes"]["semantic_exact"] = {"build_seconds": round(build, 3), "memory_bytes": vector_index.vectors.nbytes,
+                                         "recall_at_k": 1.0, **_latency_stats(latencies)}
+
+    started = time.perf_counter()
+    vector_index.search_batch(query_vectors, k)
+    batch_seconds = time.perf_counter() - started
+    result["modes"]["semantic_exact_batch"] = {"throughput_qps": round(n_queries / batch_seconds, 2)}
+
+    for mode, mode_pq_m in (("semantic_ivf", 0), ("semantic_ivf_pq", pq_m)):
+        started = time.perf_counter()
+        ivf = IVFIndex.build(vector_index.vectors, pq_m=mode_pq_m, nprobe=nprobe, seed=seed)
+        build = time.perf_counter() - started
+        refine = vector_index.vectors if mode_pq_m else None
+        latencies, approximate = _time_queries(
+            lambda i: ivf.search(query_vectors[i], k, refine_vectors=refine)[0], n_queries)
+        result["modes"][mode] = {"build_seconds": round(build, 3), "memory_bytes": _ivf_nbytes(ivf),
+                                 "nlist": ivf.nlist, "nprobe": nprobe,
+                                 "recall_at_k": round(recall_at_k(approximate, exact), 4), **_latency_stats(latencies)}
+
+    if n_papers <= lexical_max_papers:
+        tracemalloc.start()
+        started = time.perf_counter()
+        keyword_index = InvertedIndex()
+        keyword_index.add(f"{p['title']} {p['abstract']}" for p in corpus.iter_papers())
+        build = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        latencies, _ = _time_queries(lambda i: keyword_index.search(queries[i], k)[0], n_queries)
+        result["modes"]["lexical_bm25"] = {"build_seconds": round(build, 3), "memory_bytes": peak,
+                                           "recall_at_k": None, **_latency_stats(latencies)}
+    else:
+        result["modes"]["lexical_bm25"] = {"skipped": f"corpus larger than --lexical-max-papers ({lexical_max_papers})"}
+    return result
+
+
+def find_regressions(current: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Human-readable list of p99 latency / recall regressions versus a baseline run."""
+    problems = []
+    baseline_runs = {run["n_papers"]: run for run in baseline.get("runs", [])}
+    for run in current["runs"]:
+        previous = baseline_runs.get(run["n_papers"])
+        if not previous:
+            continue
+        for mode, stats in run["modes"].items():
+            before = previous["modes"].get(mode, {})
+            if stats.get("p99_ms") and before.get("p99_ms") and stats["p99_ms"] > before["p99_ms"] * (1 + max_regression):
+                problems.append(f"{run['n_papers']} papers / {mode}: p99 {before['p99_ms']} ms -> {stats['p99_ms']} ms")
+            if stats.get("recall_at_k") is not None and before.get("recall_at_k") is not None \
+                    and stats["recall_at_k"] < before["recall_at_k"] - max_regression * before["recall_at_k"]:
+                problems.append(f"{run['n_papers']} papers / {mode}: recall {before['recall_at_k']} -> {stats['recall_at_k']}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark literature discovery retrieval modes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Corpus sizes to benchmark (10k to 5M papers).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--pq-m", type=int, default=32)
+    parser.add_argument("--lexical-max-papers", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_literature_results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative p99/recall regression before failing (default 20%%).")
+    args = parser.parse_args(argv)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "platform": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "runs": [],
+    }
+    for size in args.sizes:
+        run = run_size(size, args.queries, args.k, args.dim, args.nprobe, args.pq_m, args.lexical_max_papers, args.seed)
+        report["runs"].append(run)
+        for mode, stats in run["modes"].items():
+            print(f"{size:>9} papers  {mode:<22} {json.dumps(stats)}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = find_regressions(report, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Local content-addressed blob store, a stand-in for IPFS/Arweave.
+
+Blobs are addressed by a CIDv1 string: multibase base32 ("b" prefix) of
+<version 1><codec raw 0x55><multihash sha2-256 (0x12, 32 bytes)>, i.e. the same
+CID `ipfs add --cid-version=1 --raw-leaves` gives a single-block file. JSON
+documents are serialized canonically (sorted keys, no insignificant
+whitespace, UTF-8) before hashing, so equal metadata always gets the same CID.
+
+Layout: `<root>/<next-to-last two CID chars>/<cid>` (the sharding scheme of
+IPFS flatfs). A blob is written to a temporary file and renamed into place, so
+a CID that exists on disk is complete; writing content that already exists is
+skipped. Reads return a read-only memoryview. Blobs below `MAP_THRESHOLD`
+(metadata documents) are read into memory and kept in a hot-object LRU, so a
+hit costs no system call; larger blobs are memory-mapped (no copy into the
+Python heap) and not cached, because every mapping holds a duplicated file
+descriptor until its last view is released.
+"""
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from baseroot_backend.result_cache import ResultCache
+
+_CID_V1_RAW_SHA256_PREFIX = bytes([0x01, 0x55, 0x12, 0x20])
+_CID_PATTERN = re.compile(r"^b[a-z2-7]{58}$")
+URI_SCHEME = "ipfs://"
+MAP_THRESHOLD = 1 << 20 # bytes; smaller blobs are copied into the hot LRU instead of mapped
+
+
+def canonical_json(document: Any) -> bytes:
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compute_cid(data: bytes) -> str:
+    multihash = _CID_V1_RAW_SHA256_PREFIX + hashlib.sha256(data).digest()
+    return "b" + base64.b32encode(multihash).decode("ascii").lower().rstrip("=")
+
+
+def is_cid(value: str) -> bool:
+    return bool(_CID_PATTERN.match(value))
+
+
+def cid_from_uri(uri: str) -> Optional[str]:
+    """The CID of an `ipfs://<cid>` URI, or None for any other URI."""
+    if uri and uri.startswith(URI_SCHEME) and is_cid(uri[len(URI_SCHEME):]):
+        return uri[len(URI_SCHEME):]
+    return None
+
+
+class BlobStore:
+    def __init__(self, root: str, hot_objects: int = 4096):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # Recently read small blobs; content never changes, so entries never expire
+        self._hot = ResultCache(max_entries=hot_objects, ttl_seconds=float("inf"))
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.dedup_skips = 0 # puts of content that was already stored
+        self.disk_reads = 0
+        self.mapped_reads = 0 # reads of blobs of at least MAP_THRESHOLD bytes
+
+    def _path(self, cid: str) -> str:
+        return os.path.join(self.root, cid[-3:-1], cid)
+
+    def exists(self, cid: str) -> bool:
+        return is_cid(cid) and os.path.exists(self._path(cid))
+
+    def put(self, data: bytes) -> str:
+        """Stores `data` (unless already present) and returns its CID."""
+        cid = compute_cid(data)
+        path = self._path(cid)
+        if os.path.exists(path):
+            with self._lock:
+                self.dedup_skips += 1
+            return cid
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path) # atomic; a concurrent writer of the same CID wrote identical bytes
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self.writes += 1
+        return cid
+
+    def put_json(self, document: Any) -> str:
+        return self.put(canonical_json(document))
+
+    def put_many_json(self, documents: Sequence[Any]) -> List[str]:
+        """CIDs of `documents`, in order; content repeated within the batch is written once."""
+        cids = []
+        stored = {}
+        for document in documents:
+            data = canonical_json(document)
+            cid = stored.get(data)
+            if cid is None:
+                cid = stored[data] = self.put(data)
+            else:
+                with self._lock:
+                    self.dedup_skips += 1
+            cids.append(cid)
+        return cids
+
+    def get(self, cid: str) -> Optional[memoryview]:
+        """Read-only view of the blob's bytes (memory-mapped for large blobs), or None if it is not stored."""
+        view = self._hot.get(cid)
+        if view is not None:
+            return view
+        if not is_cid(cid):
+            return None
+        try:
+            with open(self._path(cid), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= MAP_THRESHOLD:
+                    # The mapping (and its file descriptor) is released with the last view
+                    view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                else:
+                    view = memoryview(f.read())
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.disk_reads += 1
+            if size >= MAP_THRESHOLD:
+                self.mapped_reads += 1
+        if size < MAP_THRESHOLD:
+            self._hot.put(cid, view)
+        return view
+
+    def get_json(self, cid: str) -> Optional[Any]:
+        view = self.get(cid)
+        return json.loads(view.tobytes()) if view is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        hot = self._hot.stats()
+        return {
+            "writes": self.writes,
+            "dedup_skips": self.dedup_skips,
+            "disk_reads": self.disk_reads,
+            "mapped_reads": self.mapped_reads,
+            "hot_objects": hot["entries"],
+            "hot_hits": hot["hits"],
+            "hot_misses": hot["misses"],
+            "hot_evictions": hot["evictions"],
+        }
+
+
+def store_from_env() -> BlobStore:
+    """
+    The store under BASEROOT_BLOB_STORE_DIR, or one in a fresh temporary directory
+    (like the other simulated stores, that one does not survive a restart).
+    """
+    root = os.getenv("BASEROOT_BLOB_STORE_DIR") or tempfile.mkdtemp(prefix="baseroot-blobs-")
+    return BlobStore(root, hot_objects=int(os.getenv("BASEROOT_BLOB_HOT_OBJECTS", "4096")))
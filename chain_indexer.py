@@ -0,0 +1,402 @@
+"""
+Ingestion of the DAO program's on-chain events into the backend's read models.
+
+The contract (lib.rs) emits Anchor events: each one is an 8-byte discriminator
+(the first bytes of sha256("event:<Name>")) followed by the Borsh-serialized
+struct. `decode_event` / `decode_batch` turn that data into `ChainEvent`s
+(statuses mapped to the backend's names, pubkeys to base58 addresses) and
+`encode_event` produces it, for the simulated ledger and for tests. Proposal
+ids from SIMULATED_PROPOSAL_ID_BASE up are reserved for proposals submitted
+through the simulated API; an event carrying one is rejected as malformed, so
+chain and simulated proposals never share an id.
+
+Events come from a pluggable `EventSource`, which hands out batches after an
+opaque cursor: `SimulatedLedger` holds events emitted in-process and
+`JsonlEventSource` reads a file with one JSON object per line
+({"slot", "index", "signature", "data": base64 event data}), e.g. captured
+from the program logs of an RPC node.
+
+`ChainEventIndexer` reads and decodes a batch (in a worker thread), hands it to
+`apply_batch`, then saves a checkpoint: the (slot, index) position of the last
+applied event plus the source cursor. After a restart it resumes from the
+checkpoint's cursor, so history is not read again, and events at or before the
+checkpointed position are dropped. Applying is idempotent as well (votes are
+keyed by proposal and voter, status events carry absolute totals), so a batch
+that was applied but not checkpointed can safely be applied again: `run`
+retries a batch whose read or apply failed, with backoff. Malformed records
+are counted and skipped. `stats()` reports throughput, errors and the lag
+behind the source's head slot.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from baseroot_backend.wallet_addresses import b58decode, b58encode
+
+# Field layouts of the program's events, in declaration order (lib.rs)
+EVENT_LAYOUTS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "ProposalSubmitted": (("proposal_id", "u64"), ("proposer", "pubkey"), ("title", "string"), ("end_slot", "u64")),
+    "VoteCast": (("proposal_id", "u64"), ("voter", "pubkey"), ("vote_option", "vote_option"), ("vote_weight", "u64")),
+    "ProposalStatusChanged": (("proposal_id", "u64"), ("new_status", "status"),
+                              ("total_yes_votes", "u64"), ("total_no_votes", "u64")),
+    "ProposalExecuted": (("proposal_id", "u64"), ("funding_amount", "u64")),
+}
+# Borsh enum variants, in declaration order
+VOTE_OPTIONS = ("Yes", "No")
+CONTRACT_STATUSES = ("Pending", "Voting", "SucceededQuorumNotMet", "SucceededAwaitingExecution",
+                     "Defeated", "Executed", "Cancelled")
+# Contract status -> the status names used by the API and the dao_proposals table
+STATUS_NAMES = {
+    "Pending": "Pending",
+    "Voting": "Voting",
+    "SucceededQuorumNotMet": "Rejected",
+    "SucceededAwaitingExecution": "Approved",
+    "Defeated": "Rejected",
+    "Executed": "Executed",
+    "Cancelled": "Cancelled",
+}
+
+# The contract numbers proposals sequentially, far below this; ids from here on are simulated (< 2**53, safe in JSON)
+SIMULATED_PROPOSAL_ID_BASE = 1 << 52
+
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+
+
+def discriminator(name: str) -> bytes:
+    return hashlib.sha256(f"event:{name}".encode("ascii")).digest()[:8]
+
+
+_NAMES_BY_DISCRIMINATOR = {discriminator(name): name for name in EVENT_LAYOUTS}
+
+
+class RawEvent(NamedTuple):
+    slot: int
+    index: int # position of the event within its slot
+    signature: str
+    data: bytes # discriminator + Borsh payload
+
+
+class ChainEvent(NamedTuple):
+    slot: int
+    index: int
+    signature: str
+    name: str
+    fields: Dict[str, Any]
+
+
+class Checkpoint(NamedTuple):
+    slot: int
+    index: int
+    cursor: Any # source cursor to resume reading from (JSON-serializable)
+
+
+@lru_cache(maxsize=65536)
+def _address(key: bytes) -> str:
+    # Voters and proposers repeat across events, so most lookups skip the base58 encoding
+    return b58encode(key)
+
+
+def encode_event(name: str, fields: Dict[str, Any]) -> bytes:
+    parts = [discriminator(name)]
+    for field, kind in EVENT_LAYOUTS[name]:
+        value = fields[field]
+        if kind == "u64":
+            parts.append(_U64.pack(value))
+        elif kind == "pubkey":
+            parts.append(b58decode(value).rjust(32, b"\0"))
+        elif kind == "string":
+            encoded = value.encode("utf-8")
+            parts.append(_U32.pack(len(encoded)) + encoded)
+        elif kind == "vote_option":
+            parts.append(bytes([0 if value else 1]))
+        else: # status, given as a contract status name
+            parts.append(bytes([CONTRACT_STATUSES.index(value)]))
+    return b"".join(parts)
+
+
+def decode_event(data: bytes) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(event name, fields) of Anchor event data, or None for another program's event; ValueError if malformed."""
+    name = _NAMES_BY_DISCRIMINATOR.get(bytes(data[:8]))
+    if name is None:
+        return None
+    fields: Dict[str, Any] = {}
+    offset = 8
+    try:
+        for field, kind in EVENT_LAYOUTS[name]:
+            if kind == "u64":
+                fields[field] = _U64.unpack_from(data, offset)[0]
+                offset += 8
+            elif kind == "pubkey":
+                if offset + 32 > len(data):
+                    raise ValueError("truncated pubkey")
+                fields[field] = _address(bytes(data[offset:offset + 32]))
+                offset += 32
+            elif kind == "string":
+                length = _U32.unpack_from(data, offset)[0]
+                if offset + 4 + length > len(data):
+                    raise ValueError("truncated string")
+                fields[field] = bytes(data[offset + 4:offset + 4 + length]).decode("utf-8")
+                offset += 4 + length
+            elif kind == "vote_option":
+                fields[field] = VOTE_OPTIONS[data[offset]] == "Yes"
+                offset += 1
+            else:
+                fields[field] = STATUS_NAMES[CONTRACT_STATUSES[data[offset]]]
+                offset += 1
+    except (struct.error, IndexError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Malformed {name} event: {exc}")
+    if fields["proposal_id"] >= SIMULATED_PROPOSAL_ID_BASE:
+        raise ValueError(f"Malformed {name} event: proposal id {fields['proposal_id']} is in the simulated range")
+    return name, fields
+
+
+def decode_batch(raw_events: Iterable[RawEvent]) -> Tuple[List[ChainEvent], int]:
+    """Decoded events in order, and how many were skipped (other programs' or malformed)."""
+    events = []
+    skipped = 0
+    for raw in raw_events:
+        try:
+            decoded = decode_event(raw.data)
+        except ValueError:
+            decoded = None
+        if decoded is None:
+            skipped += 1
+            continue
+        events.append(ChainEvent(raw.slot, raw.index, raw.signature, decoded[0], decoded[1]))
+    return events, skipped
+
+
+class EventSource(ABC):
+    malformed = 0 # records the source could not parse and skipped
+
+    @abstractmethod
+    def read(self, cursor: Any, max_events: int) -> Tuple[List[RawEvent], Any]:
+        """Up to `max_events` events after `cursor` (None: from the start) and the cursor after them."""
+
+    @abstractmethod
+    def head_slot(self) -> int:
+        """Slot of the newest event available."""
+
+
+class SimulatedLedger(EventSource):
+    """In-process event log standing in for the chain."""
+
+    def __init__(self, slot: int = 0):
+        self.slot = slot
+        self._events: List[RawEvent] = []
+        self._next_index = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def emit(self, name: str, fields: Dict[str, Any], slot: Optional[int] = None) -> RawEvent:
+        if slot is not None and slot != self.slot:
+            if slot < self.slot:
+                raise ValueError("Slots only move forward")
+            self.slot, self._next_index = slot, 0
+        event = RawEvent(self.slot, self._next_index, f"sim-{self.slot}-{self._next_index}", encode_event(name, fields))
+        self._next_index += 1
+        self._events.append(event)
+        return event
+
+    def read(self, cursor: Any, max_events: int) -> Tuple[List[RawEvent], Any]:
+        start = cursor or 0
+        batch = self._events[start:start + max_events]
+        return batch, start + len(batch)
+
+    def head_slot(self) -> int:
+        return self._events[-1].slot if self._events else self.slot
+
+
+class JsonlEventSource(EventSource):
+    """Events from a JSON-lines file that may still be growing; the cursor is a byte offset."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._malformed_until = 0 # offset up to which malformed lines were counted (batches may be re-read)
+
+    def read(self, cursor: Any, max_events: int) -> Tuple[List[RawEvent], Any]:
+        offset = cursor or 0
+        batch = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                while len(batch) < max_events:
+                    line = f.readline()
+                    if not line.endswith(b"\n"): # EOF, or a line still being written
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        batch.append(RawEvent(int(record["slot"]), int(record["index"]), record.get("signature", ""),
+                                              base64.b64decode(record["data"], validate=True)))
+                    except (ValueError, KeyError, TypeError):
+                        # Skipped; the cursor moves past it
+                        if offset > self._malformed_until:
+                            self.malformed += 1
+                            self._malformed_until = offset
+        except FileNotFoundError:
+            pass
+        return batch, offset
+
+    def head_slot(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(size - 4096, 0))
+                lines = [line for line in f.read().split(b"\n") if line.strip()]
+        except FileNotFoundError:
+            return 0
+        for line in reversed(lines):
+            try:
+                return json.loads(line)["slot"]
+            except (ValueError, KeyError):
+                continue # partial first line of the tail block
+        return 0
+
+
+def write_jsonl(path: str, raw_events: Sequence[RawEvent]) -> None:
+    """Appends events in JsonlEventSource's format."""
+    with open(path, "a", encoding="utf-8") as f:
+        for raw in raw_events:
+            f.write(json.dumps({"slot": raw.slot, "index": raw.index, "signature": raw.signature,
+                                "data": base64.b64encode(raw.data).decode("ascii")}) + "\n")
+
+
+class MemoryCheckpointStore:
+    def __init__(self):
+        self.checkpoint: Optional[Checkpoint] = None
+
+    def load(self) -> Optional[Checkpoint]:
+        return self.checkpoint
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        self.checkpoint = checkpoint
+
+
+class FileCheckpointStore:
+    """Checkpoint kept in a small JSON file, replaced atomically on every save."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Checkpoint]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return Checkpoint(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(checkpoint._asdict(), f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+class ChainEventIndexer:
+    def __init__(self, source: EventSource, apply_batch: Callable[[List[ChainEvent]], Awaitable[None]],
+                 checkpoints=None, batch_size: int = 5000):
+        self.source = source
+        self.apply_batch = apply_batch
+        self.checkpoints = checkpoints or MemoryCheckpointStore()
+        self.batch_size = batch_size
+        self.checkpoint = self.checkpoints.load()
+        # Counters
+        self.events_applied = 0
+        self.events_skipped = 0
+        self.batches = 0
+        self.apply_seconds = 0.0
+        self.errors = 0 # failed batches (retried)
+        self.consecutive_errors = 0
+        self.last_error: Optional[str] = None
+
+    def _read_batch(self) -> Tuple[int, List[ChainEvent], int, Any, Optional[Tuple[int, int]]]:
+        raw_events, cursor = self.source.read(self.checkpoint.cursor if self.checkpoint else None, self.batch_size)
+        read = len(raw_events)
+        last_position = (raw_events[-1].slot, raw_events[-1].index) if raw_events else None
+        if self.checkpoint is not None:
+            done = (self.checkpoint.slot, self.checkpoint.index)
+            raw_events = [raw for raw in raw_events if (raw.slot, raw.index) > done]
+        events, skipped = decode_batch(raw_events)
+        return read, events, skipped, cursor, last_position
+
+    async def run_once(self) -> int:
+        """Reads, decodes, applies and checkpoints one batch; returns the number of events read."""
+        read, events, skipped, cursor, last_position = await asyncio.to_thread(self._read_batch)
+        if not read:
+            return 0
+        started = time.perf_counter()
+        if events:
+            await self.apply_batch(events)
+        self.apply_seconds += time.perf_counter() - started
+        if self.checkpoint is not None:
+            last_position = max(last_position, (self.checkpoint.slot, self.checkpoint.index))
+        self.checkpoint = Checkpoint(last_position[0], last_position[1], cursor)
+        self.checkpoints.save(self.checkpoint)
+        self.events_applied += len(events)
+        self.events_skipped += skipped
+        self.batches += 1
+        return read
+
+    async def catch_up(self) -> int:
+        """Applies batches until the source has nothing new; returns the number of events read."""
+        total = 0
+        while True:
+            count = await self.run_once()
+            if not count:
+                return total
+            total += count
+
+    async def run(self, poll_seconds: float = 1.0, max_backoff_seconds: float = 60.0) -> None:
+        """
+        Follows the source until cancelled. A batch that fails to read or apply is not
+        checkpointed, so it is retried, after a backoff that doubles up to `max_backoff_seconds`;
+        failures are counted in `stats()`.
+        """
+        while True:
+            try:
+                await self.catch_up()
+                self.consecutive_errors = 0
+                delay = poll_seconds
+            except Exception as exc:
+                self.errors += 1
+                self.consecutive_errors += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                delay = min(poll_seconds * 2 ** self.consecutive_errors, max_backoff_seconds)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        checkpoint_slot = self.checkpoint.slot if self.checkpoint else None
+        head_slot = self.source.head_slot()
+        return {
+            "checkpoint_slot": checkpoint_slot,
+            "head_slot": head_slot,
+            "lag_slots": max(head_slot - (checkpoint_slot or 0), 0),
+            "events_applied": self.events_applied,
+            "events_skipped": self.events_skipped,
+            "malformed_records": self.source.malformed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error,
+            "apply_events_per_second": round(self.events_applied / self.apply_seconds) if self.apply_seconds else 0,
+        }
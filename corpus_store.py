@@ -0,0 +1,226 @@
+"""
+Persistent, memory-mapped corpus store for the AI literature discovery API.
+
+A store is a directory holding three files:
+- `embeddings.npy`: a standard .npy float32 matrix (one row per paper). Its
+  header is padded to a fixed size so the row count can be rewritten in place
+  when rows are appended; `np.load(..., mmap_mode="r")` reads it directly.
+- `records.jsonl`: paper metadata, one JSON document per line.
+- `offsets.u64`: (start, length) uint64 pairs locating each record in
+  `records.jsonl`, so paper i is read with one slice of the mapped file.
+
+Workers open a store in milliseconds (nothing is parsed up front) and share the
+mapped pages through the OS page cache. New papers are appended without
+rewriting existing data: records and offsets are written first, then the
+embedding rows, and finally the .npy header row count, which acts as the
+commit point. Anything past the committed count (e.g. after a crash) is
+ignored and dropped by `compact`.
+
+Offline maintenance:
+    python -m baseroot_backend.corpus_store import <store_dir> <papers.json>
+    python -m baseroot_backend.corpus_store compact <store_dir>
+"""
+
+import argparse
+import json
+import mmap
+import os
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "offsets.u64"
+# Room for the .npy header so "shape" can grow to billions of rows without moving the data
+_NPY_HEADER_SIZE = 128
+
+
+def _npy_header(rows: int, dim: int) -> bytes:
+    header = {"descr": "<f4", "fortran_order": False, "shape": (rows, dim)}
+    body = repr(header).encode("latin1")
+    # magic (6) + version (2) + header length (2) + body, padded with spaces and ending in "\n"
+    padding = _NPY_HEADER_SIZE - 10 - len(body) - 1
+    return b"\x93NUMPY\x01\x00" + (_NPY_HEADER_SIZE - 10).to_bytes(2, "little") + body + b" " * padding + b"\n"
+
+
+def _read_npy_shape(path: str):
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version != (1, 0):
+            raise ValueError(f"Unsupported .npy version {version} in {path}")
+        shape, _, _ = np.lib.format.read_array_header_1_0(f)
+    return shape
+
+
+class CorpusStore:
+    def __init__(self, path: str):
+        """Opens an existing store; use `CorpusStore.create` to make a new one."""
+        self.path = path
+        rows, self.dim = _read_npy_shape(os.path.join(path, EMBEDDINGS_FILE))
+        self._count = rows
+        self._remap()
+
+    @classmethod
+    def create(cls, path: str, dim: int) -> "CorpusStore":
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, EMBEDDINGS_FILE), "wb") as f:
+            f.write(_npy_header(0, dim))
+        open(os.path.join(path, RECORDS_FILE), "wb").close()
+        open(os.path.join(path, OFFSETS_FILE), "wb").close()
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, dim: int) -> "CorpusStore":
+        if os.path.exists(os.path.join(path, EMBEDDINGS_FILE)):
+            store = cls(path)
+            if store.dim != dim:
+                raise ValueError(f"Corpus store at {path} has dim {store.dim}, expected {dim}")
+            return store
+        return cls.create(path, dim)
+
+    def _remap(self) -> None:
+        """(Re)maps the files for the committed row count. Cheap: no data is read."""
+        if self._count:
+            self._embeddings = np.memmap(os.path.join(self.path, EMBEDDINGS_FILE), dtype=np.float32, mode="r",
+                                         offset=_NPY_HEADER_SIZE, shape=(self._count, self.dim))
+            self._offsets = np.memmap(os.path.join(self.path, OFFSETS_FILE), dtype=np.uint64, mode="r",
+                                      shape=(self._count, 2))
+            with open(os.path.join(self.path, RECORDS_FILE), "rb") as f:
+                self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._embeddings = np.zeros((0, self.dim), dtype=np.float32)
+            self._offsets = np.zeros((0, 2), dtype=np.uint64)
+            self._records = b""
+
+    def refresh(self) -> bool:
+        """Picks up rows committed by other processes since this store was opened."""
+        rows, _ = _read_npy_shape(os.path.join(self.path, EMBEDDINGS_FILE))
+        if rows == self._count:
+            return False
+        self._count = rows
+        self._remap()
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Read-only (rows, dim) float32 view backed by the mapped file."""
+        return self._embeddings
+
+    def __getitem__(self, row: int) -> Dict:
+        if not -self._count <= row < self._count:
+            raise IndexError(row)
+        start, length = (int(v) for v in self._offsets[row])
+        return json.loads(self._records[start : start + length])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(self._count):
+            yield self[row]
+
+    def append(self, papers: Sequence[Dict], embeddings: np.ndarray) -> None:
+        """Appends papers and their embedding rows; existing bytes are never rewritten."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        if len(papers) != embeddings.shape[0]:
+            raise ValueError("papers and embeddings must have the same length")
+        if not papers:
+            return
+        records_path = os.path.join(self.path, RECORDS_FILE)
+        offsets_path = os.path.join(self.path, OFFSETS_FILE)
+        embeddings_path = os.path.join(self.path, EMBEDDINGS_FILE)
+
+        # Drop any uncommitted tail left by an interrupted append before writing after it
+        committed_records = int(self._offsets[-1].sum()) + 1 if self._count else 0 # +1 for the newline
+        encoded = [json.dumps(p, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n" for p in papers]
+        offsets = np.empty((len(encoded), 2), dtype=np.uint64)
+        position = committed_records
+        for i, data in enumerate(encoded):
+            offsets[i] = (position, len(data) - 1) # length excludes the newline
+            position += len(data)
+
+        with open(records_path, "r+b") as f:
+            f.truncate(committed_records)
+            f.seek(committed_records)
+            f.write(b"".join(encoded))
+        with open(offsets_path, "r+b") as f:
+            f.truncate(self._count * 16)
+            f.seek(self._count * 16)
+            f.write(offsets.tobytes())
+        with open(embeddings_path, "r+b") as f:
+            data_end = _NPY_HEADER_SIZE + self._count * self.dim * 4
+            f.truncate(data_end)
+            f.seek(data_end)
+            f.write(embeddings.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            # Commit point: the header row count
+            f.seek(0)
+            f.write(_npy_header(self._count + len(papers), self.dim))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._count += len(papers)
+        self._remap()
+
+    def compact(self) -> int:
+        """
+        Rebuilds the files offline, keeping only the last record per paper id and
+        dropping any uncommitted tail. Returns the number of rows kept.
+        Must not run while other processes are appending to the store.
+        """
+        latest: Dict[str, int] = {}
+        for row in range(self._count):
+            latest[self[row].get("id", f"__row_{row}")] = row
+        keep = sorted(latest.values())
+        tmp_path = self.path.rstrip(os.sep) + ".compacting"
+        tmp = CorpusStore.create(tmp_path, self.dim)
+        batch = 10000
+        for i in range(0, len(keep), batch):
+            rows = keep[i : i + batch]
+            tmp.append([self[r] for r in rows], self._embeddings[rows])
+        tmp.close()
+        self.close()
+        for name in (RECORDS_FILE, OFFSETS_FILE, EMBEDDINGS_FILE):
+            os.replace(os.path.join(tmp_path, name), os.path.join(self.path, name))
+        os.rmdir(tmp_path)
+        self._count = len(keep)
+        self._remap()
+        return len(keep)
+
+    def close(self) -> None:
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+        self._embeddings = self._offsets = None
+        self._records = b""
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain a Baseroot literature corpus store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Embed papers from a JSON array file and append them.")
+    import_cmd.add_argument("store_dir")
+    import_cmd.add_argument("papers_json")
+    compact_cmd = commands.add_parser("compact", help="Rebuild the store files, dropping duplicates and torn tails.")
+    compact_cmd.add_argument("store_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        from baseroot_backend.literature_index import HashingEmbedder, paper_text
+
+        embedder = HashingEmbedder()
+        store = CorpusStore.open_or_create(args.store_dir, embedder.dim)
+        with open(args.papers_json) as f:
+            papers = json.load(f)
+        store.append(papers, embedder.embed([paper_text(p) for p in papers]))
+        print(f"Imported {len(papers)} papers; store now holds {len(store)}.")
+    else:
+        store = CorpusStore(args.store_dir)
+        before = len(store)
+        kept = store.compact()
+        print(f"Compacted {args.store_dir}: {before} -> {kept} papers.")
+
+
+if __name__ == "__main__":
+    main()
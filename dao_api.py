@@ -1,6 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Body, Path
+import os
+
+from fastapi import APIRouter, HTTPException, Depends, status, Body, Header, Path, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
+
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import List, Literal, Optional
+
+from baseroot_backend.auth_api import optional_session
+from baseroot_backend import database
+from baseroot_backend.chain_indexer import (
+    SIMULATED_PROPOSAL_ID_BASE, ChainEvent, ChainEventIndexer, FileCheckpointStore, JsonlEventSource,
+)
+from baseroot_backend.database import get_db
+from baseroot_backend.proposal_index import ProposalIndex, decode_cursor, encode_cursor
+from baseroot_backend.proposal_lifecycle import VOTING_PERIOD_SLOTS, ProposalScheduler, TallyResult, tally_outcome
+from baseroot_backend.proposal_updates import ProposalUpdateBroadcaster
+from baseroot_backend.session_tokens import SessionClaims
+from baseroot_backend.sql_repositories import SqlDaoRepository
+from baseroot_backend.vote_queue import VoteIngestionQueue, VoteQueueFullError
+from baseroot_backend.vote_store import DuplicateVoteError, InMemoryVoteStore, VoteRecord, VotingClosedError
+from baseroot_backend.voting_power import snapshots_from_env
 
 # Placeholder for Solana interaction, DB models, session, etc.
 # from ..services.solana_service import call_dao_contract # Placeholder
@@ -39,6 +62,34 @@ class VoteResponse(BaseModel):
     vote_weight: int
     message: str
 
+class VoteRecordResponse(BaseModel):
+    proposal_id: int
+    voter_wallet_address: str
+    vote_option: bool
+    vote_weight: int
+    voted_at: str
+
+class HasVotedResponse(BaseModel):
+    proposal_id: int
+    voter_wallet_address: str
+    has_voted: bool
+    vote: Optional[VoteRecordResponse] = None
+
+class TallyResultResponse(BaseModel):
+    proposal_id: int
+    status: str
+    yes_votes: int
+    no_votes: int
+    end_slot: int
+    closed_at_slot: Optional[int] = None # None if another worker closed the proposal
+
+class VotingPowerResponse(BaseModel):
+    proposal_id: int
+    voter_wallet_address: str
+    snapshot_slot: int
+    vote_weight: int
+    total_supply: int
+
 class ProposalDetailResponse(BaseModel):
     on_chain_proposal_id: int
     db_proposal_id: int
@@ -57,15 +108,265 @@ class ProposalDetailResponse(BaseModel):
     executed_on_chain: bool
     created_at: str # Simulated
 
-# Simulated DB for DAO Proposals and Votes
+# Simulated DB for DAO Proposals and Votes (used when DATABASE_URL is not set; otherwise
+# dao_proposals / dao_votes are read and written through SqlDaoRepository)
 fake_dao_proposals_db = {}
-fake_dao_votes_db = [] # List of vote dicts
+# Votes keyed by (proposal, voter) with running per-proposal tallies and a per-voter history
+vote_store = InMemoryVoteStore()
+# Per-status sorted indexes over fake_dao_proposals_db, for /list_proposals
+proposal_index = ProposalIndex()
 next_dao_proposal_db_id = 1
-# Simulated on-chain proposal ID counter (would come from smart contract)
+# Simulated on-chain proposal ID counter (would come from smart contract); ids are
+# SIMULATED_PROPOSAL_ID_BASE + counter, a range chain events never use
 simulated_on_chain_proposal_id_counter = 0 
+# Open proposals by end slot; voting closes once the slot clock passes it (see proposal_lifecycle)
+proposal_scheduler = ProposalScheduler()
+# Governance-token balances frozen at each proposal's start slot; vote weights are read from these
+voting_power = snapshots_from_env()
+# Tally/status changes for /proposal_updates subscribers, coalesced per window (see proposal_updates)
+proposal_updates = ProposalUpdateBroadcaster(
+    window_seconds=float(os.getenv("BASEROOT_DAO_UPDATES_WINDOW_MS", "250")) / 1000.0,
+)
+
+def _publish_proposal(proposal: dict) -> None:
+    proposal_updates.publish(
+        proposal["on_chain_proposal_id"],
+        yes_votes_on_chain=proposal["yes_votes_on_chain"],
+        no_votes_on_chain=proposal["no_votes_on_chain"],
+        status_on_chain=proposal["status_on_chain"],
+        executed_on_chain=proposal["executed_on_chain"],
+    )
+
+def _publish_tallies(items: List[tuple], outcomes: List[object]) -> None:
+    for (vote, _), outcome in zip(items, outcomes):
+        if isinstance(outcome, tuple):
+            proposal_updates.publish(vote.proposal_id, yes_votes_on_chain=outcome[0], no_votes_on_chain=outcome[1])
+
+async def _record_votes(conn: AsyncConnection, items: List[tuple], chain_only: bool = False) -> List[object]:
+    """Records and commits a batch of (VoteRecord, voter_user_id) in SQL; one outcome per vote."""
+    repository = SqlDaoRepository(conn)
+    try:
+        outcomes = await repository.record_votes(items, chain_only=chain_only)
+        await conn.commit()
+        return outcomes
+    except IntegrityError:
+        await conn.rollback()
+    # Another writer recorded one of these votes meanwhile: apply them one by one so only that vote fails
+    outcomes = []
+    for item in items:
+        try:
+            outcomes.extend(await repository.record_votes([item], chain_only=chain_only))
+            await conn.commit()
+        except IntegrityError:
+            await conn.rollback()
+            outcomes.append(DuplicateVoteError("This wallet has already voted on this proposal."))
+    return outcomes
+
+def _cast_votes_in_memory(votes: List[VoteRecord], chain: bool = False) -> List[object]:
+    """
+    Casts votes on the simulated proposals that are open for voting; one outcome per vote.
+    Votes from chain events (`chain`) only need the proposal to exist: the contract accepted them.
+    """
+    outcomes: List[object] = [None] * len(votes)
+    open_votes, positions = [], []
+    for i, vote in enumerate(votes):
+        proposal = fake_dao_proposals_db.get(vote.proposal_id)
+        if proposal is None or (not chain and proposal["status_on_chain"] != "Voting"):
+            outcomes[i] = VotingClosedError(f"Proposal {vote.proposal_id} is not open for voting")
+        else:
+            open_votes.append(vote)
+            positions.append(i)
+    for i, outcome in zip(positions, vote_store.cast_many(open_votes)):
+        outcomes[i] = outcome
+    # Each proposal's simulated on-chain counts are updated once per batch
+    for proposal_id in {vote.proposal_id for vote in open_votes}:
+        proposal = fake_dao_proposals_db[proposal_id]
+        proposal["yes_votes_on_chain"], proposal["no_votes_on_chain"] = vote_store.tally(proposal_id)
+        _publish_proposal(proposal)
+    return outcomes
+
+async def _apply_vote_batch(items: List[tuple]) -> List[object]:
+    """Applies a batch of (VoteRecord, voter_user_id) from the vote queue; one outcome per vote."""
+    if database.database is not None:
+        async with database.database.connection() as conn:
+            outcomes = await _record_votes(conn, items)
+        _publish_tallies(items, outcomes)
+        return outcomes
+    return _cast_votes_in_memory([vote for vote, _ in items])
+
+# Votes are written behind by one writer that group-commits whatever queued up meanwhile
+# (see vote_queue); a full queue answers 503
+vote_queue = VoteIngestionQueue(
+    _apply_vote_batch,
+    max_pending=int(os.getenv("BASEROOT_VOTE_QUEUE_MAX_PENDING", "10000")),
+    max_batch_size=int(os.getenv("BASEROOT_VOTE_MAX_BATCH", "500")),
+)
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+def _vote_runs(events: List[ChainEvent]):
+    """Splits events into maximal runs of VoteCast events (applied as one batch) and single other events."""
+    i = 0
+    while i < len(events):
+        j = i + 1
+        if events[i].name == "VoteCast":
+            while j < len(events) and events[j].name == "VoteCast":
+                j += 1
+        yield events[i:j]
+        i = j
+
+def _apply_chain_events_in_memory(events: List[ChainEvent]) -> None:
+    global next_dao_proposal_db_id
+    for run in _vote_runs(events):
+        event = run[0]
+        fields = event.fields
+        if event.name == "VoteCast":
+            voted_at = _utc_now_iso()
+            # Duplicates (replayed events, or a simulated API vote by the same wallet) are rejected and skipped
+            _cast_votes_in_memory([
+                VoteRecord(e.fields["proposal_id"], e.fields["voter"], e.fields["vote_option"], e.fields["vote_weight"], voted_at)
+                for e in run
+            ], chain=True)
+            continue
+        proposal_id = fields["proposal_id"]
+        proposal = fake_dao_proposals_db.get(proposal_id)
+        if event.name == "ProposalSubmitted":
+            if proposal is not None:
+                proposal.update(proposer_wallet_address=fields["proposer"], title=fields["title"])
+                continue
+            proposal = fake_dao_proposals_db[proposal_id] = {
+                "db_proposal_id": next_dao_proposal_db_id,
+                "on_chain_proposal_id": proposal_id,
+                "proposer_wallet_address": fields["proposer"],
+                "title": fields["title"],
+                "description": "",
+                "ipfs_hash_details": None,
+                "requested_amount": 0,
+                "currency": "SOL",
+                "target_funding_address": "",
+                "yes_votes_on_chain": 0,
+                "no_votes_on_chain": 0,
+                "start_slot_on_chain": event.slot,
+                "end_slot_on_chain": fields["end_slot"],
+                "status_on_chain": "Voting",
+                "executed_on_chain": False,
+                "created_at": _utc_now_iso(),
+            }
+            next_dao_proposal_db_id += 1
+            proposal_index.add(proposal)
+            proposal_scheduler.schedule(proposal_id, fields["end_slot"])
+            _publish_proposal(proposal)
+        elif proposal is not None:
+            old_status = proposal["status_on_chain"]
+            if event.name == "ProposalStatusChanged":
+                proposal.update(status_on_chain=fields["new_status"], yes_votes_on_chain=fields["total_yes_votes"],
+                                no_votes_on_chain=fields["total_no_votes"])
+                if fields["new_status"] in ("Approved", "Rejected"):
+                    proposal_scheduler.publish([TallyResult(
+                        proposal_id, fields["new_status"], fields["total_yes_votes"], fields["total_no_votes"],
+                        proposal["end_slot_on_chain"], event.slot)])
+            else: # ProposalExecuted
+                proposal.update(status_on_chain="Executed", executed_on_chain=True)
+            if proposal["status_on_chain"] != old_status:
+                proposal_index.move(proposal, old_status)
+            _publish_proposal(proposal)
+
+async def apply_chain_events(events: List[ChainEvent]) -> None:
+    """
+    Applies a decoded batch from the chain indexer to the DAO stores (idempotent). Proposal and
+    status changes are committed before each run of votes and at the end of the batch; a vote
+    that collides with one recorded meanwhile is skipped as a duplicate, as in _apply_vote_batch.
+    """
+    if database.database is None:
+        _apply_chain_events_in_memory(events)
+        return
+    updates, status_changes = [], []
+    async with database.database.connection() as conn:
+        repository = SqlDaoRepository(conn)
+        for run in _vote_runs(events):
+            event = run[0]
+            fields = event.fields
+            if event.name == "VoteCast":
+                items = [(VoteRecord(e.fields["proposal_id"], e.fields["voter"], e.fields["vote_option"], e.fields["vote_weight"], ""), None)
+                         for e in run]
+                await conn.commit() # a duplicate vote's rollback must not undo the events before it
+                updates.append((items, await _record_votes(conn, items, chain_only=True)))
+            elif event.name == "ProposalSubmitted":
+                if await repository.upsert_chain_proposal(fields["proposal_id"], fields["proposer"], fields["title"],
+                                                          event.slot, fields["end_slot"]):
+                    proposal_scheduler.schedule(fields["proposal_id"], fields["end_slot"])
+            elif event.name == "ProposalStatusChanged":
+                await repository.set_chain_status(fields["proposal_id"], fields["new_status"],
+                                                  fields["total_yes_votes"], fields["total_no_votes"])
+                status_changes.append((fields["proposal_id"], {"status_on_chain": fields["new_status"],
+                                                               "yes_votes_on_chain": fields["total_yes_votes"],
+                                                               "no_votes_on_chain": fields["total_no_votes"]}))
+            else:
+                await repository.set_chain_status(fields["proposal_id"], "Executed", executed=True)
+                status_changes.append((fields["proposal_id"], {"status_on_chain": "Executed", "executed_on_chain": True}))
+        await conn.commit()
+    for items, outcomes in updates:
+        _publish_tallies(items, outcomes)
+    for proposal_id, update in status_changes:
+        proposal_updates.publish(proposal_id, **update)
+
+def _indexer_from_env() -> Optional[ChainEventIndexer]:
+    """An indexer following BASEROOT_CHAIN_EVENTS_FILE, if set (started with the app)."""
+    path = os.getenv("BASEROOT_CHAIN_EVENTS_FILE")
+    if not path:
+        return None
+    return ChainEventIndexer(
+        JsonlEventSource(path),
+        apply_chain_events,
+        FileCheckpointStore(os.getenv("BASEROOT_CHAIN_CHECKPOINT_FILE") or path + ".checkpoint"),
+        batch_size=int(os.getenv("BASEROOT_CHAIN_BATCH_SIZE", "5000")),
+    )
+
+chain_indexer = _indexer_from_env()
+CHAIN_POLL_SECONDS = float(os.getenv("BASEROOT_CHAIN_POLL_SECONDS", "1.0"))
+
+async def schedule_open_proposals() -> None:
+    """Seeds the scheduler with the proposals still open in the database (on startup, in SQL mode)."""
+    async with database.database.connection() as conn:
+        proposal_scheduler.schedule_many(await SqlDaoRepository(conn).voting_deadlines())
+
+async def advance_proposal_lifecycle(db: Optional[AsyncConnection]) -> List[TallyResult]:
+    """
+    Closes voting on every proposal whose end slot has passed, as the contract's
+    tally_votes_and_update_status would, and publishes the tallies. Costs O(1)
+    when nothing is due; otherwise proportional to the proposals closing.
+    """
+    current_slot = proposal_scheduler.clock.current_slot()
+    due = proposal_scheduler.pop_due(current_slot)
+    if not due:
+        return []
+    if db is not None:
+        results = await SqlDaoRepository(db).close_proposals([proposal_id for proposal_id, _ in due], current_slot)
+        await db.commit()
+    else:
+        results = []
+        for proposal_id, end_slot in due:
+            proposal = fake_dao_proposals_db.get(proposal_id)
+            if proposal is None or proposal["status_on_chain"] != "Voting":
+                continue
+            yes_votes, no_votes = vote_store.tally(proposal_id)
+            result = TallyResult(proposal_id, tally_outcome(yes_votes, no_votes), yes_votes, no_votes, end_slot, current_slot)
+            proposal.update(status_on_chain=result.status, yes_votes_on_chain=yes_votes, no_votes_on_chain=no_votes)
+            proposal_index.move(proposal, old_status="Voting")
+            results.append(result)
+    proposal_scheduler.publish(results)
+    for result in results:
+        proposal_updates.publish(result.proposal_id, status_on_chain=result.status,
+                                 yes_votes_on_chain=result.yes_votes, no_votes_on_chain=result.no_votes)
+    return results
 
 @router.post("/submit_proposal", response_model=ProposalResponse, status_code=status.HTTP_201_CREATED)
-async def submit_dao_proposal_endpoint(request: ProposalInput = Body(...)):
+async def submit_dao_proposal_endpoint(
+    request: ProposalInput = Body(...),
+    session: Optional[SessionClaims] = Depends(optional_session),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
     """
     Endpoint to submit a new DAO funding proposal.
     Simplified: Assumes user is authenticated.
@@ -80,14 +381,14 @@ async def submit_dao_proposal_endpoint(request: ProposalInput = Body(...)):
     
     # Simulate on-chain interaction
     simulated_on_chain_proposal_id_counter += 1
-    current_on_chain_id = simulated_on_chain_proposal_id_counter
-    simulated_start_slot = 1000000 + (current_on_chain_id * 1000) # Fake slot numbers
-    simulated_end_slot = simulated_start_slot + 172800 # Approx 1 day in slots at ~0.5s/slot
+    current_on_chain_id = SIMULATED_PROPOSAL_ID_BASE + simulated_on_chain_proposal_id_counter
+    simulated_start_slot = proposal_scheduler.clock.current_slot()
+    simulated_end_slot = simulated_start_slot + VOTING_PERIOD_SLOTS
 
     db_proposal = {
         "db_proposal_id": next_dao_proposal_db_id,
         "on_chain_proposal_id": current_on_chain_id,
-        "proposer_wallet_address": "SimulatedProposerWalletAddress", # From auth
+        "proposer_wallet_address": session.wallet_address if session else "SimulatedProposerWalletAddress",
         "title": request.title,
         "description": request.description,
         "ipfs_hash_details": request.ipfs_hash_details,
@@ -100,13 +401,21 @@ async def submit_dao_proposal_endpoint(request: ProposalInput = Body(...)):
         "end_slot_on_chain": simulated_end_slot,
         "status_on_chain": "Voting",
         "executed_on_chain": False,
-        "created_at": "2025-05-15T11:00:00Z"
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
     }
-    fake_dao_proposals_db[current_on_chain_id] = db_proposal
-    next_dao_proposal_db_id += 1
+    if db is not None:
+        db_proposal = await SqlDaoRepository(db).insert_proposal(db_proposal, proposer_user_id=session.user_id if session else None)
+        await db.commit()
+    else:
+        fake_dao_proposals_db[current_on_chain_id] = db_proposal
+        proposal_index.add(db_proposal)
+        next_dao_proposal_db_id += 1
+    proposal_scheduler.schedule(db_proposal["on_chain_proposal_id"], simulated_end_slot)
+    await run_in_threadpool(voting_power.snapshot, simulated_start_slot) # freeze voting power as the proposal opens
+    _publish_proposal(db_proposal)
 
     return ProposalResponse(
-        on_chain_proposal_id=current_on_chain_id,
+        on_chain_proposal_id=db_proposal["on_chain_proposal_id"],
         db_proposal_id=db_proposal["db_proposal_id"],
         title=request.title,
         status_on_chain="Voting",
@@ -116,7 +425,9 @@ async def submit_dao_proposal_endpoint(request: ProposalInput = Body(...)):
 @router.post("/vote_on_proposal/{on_chain_proposal_id}", response_model=VoteResponse)
 async def vote_on_dao_proposal_endpoint(
     on_chain_proposal_id: int = Path(..., ge=1),
-    vote_input: VoteInput = Body(...)
+    vote_input: VoteInput = Body(...),
+    session: Optional[SessionClaims] = Depends(optional_session),
+    db: Optional[AsyncConnection] = Depends(get_db),
 ):
     """
     Endpoint to vote on an active DAO proposal.
@@ -124,11 +435,12 @@ async def vote_on_dao_proposal_endpoint(
     Real implementation would:
     1. Authenticate user.
     2. Check if the proposal ID is valid and currently active for voting (on-chain state).
-    3. Check user's voting power (e.g., governance token balance).
+    3. Check user's voting power: the governance-token balance in the snapshot taken at the proposal's start slot.
     4. Interact with DAO smart contract to cast the vote on-chain.
     5. On success, update local vote records if necessary (or rely on on-chain event listeners).
     """
-    proposal = fake_dao_proposals_db.get(on_chain_proposal_id)
+    await advance_proposal_lifecycle(db)
+    proposal = await _get_proposal(db, on_chain_proposal_id)
     if not proposal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposal not found.")
     
@@ -136,52 +448,209 @@ async def vote_on_dao_proposal_endpoint(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Proposal is not active for voting. Current status: {proposal['status_on_chain']}")
 
     # Simulate on-chain vote casting & getting vote weight
-    simulated_voter_wallet = "SimulatedVoterWalletAddress" # From auth
-    simulated_vote_weight = 100 # Example: user has 100 governance tokens
+    voter_wallet = session.wallet_address if session else "SimulatedVoterWalletAddress" # From auth when a session token is sent
+    start_slot = proposal["start_slot_on_chain"]
+    snapshot = voting_power.cached(start_slot) or await run_in_threadpool(voting_power.snapshot, start_slot)
+    vote_weight = voting_power.weight_in(snapshot, voter_wallet)
+    if not vote_weight:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No governance tokens held at the proposal's start slot.")
 
-    # Update simulated on-chain counts (in a real app, this would be read from chain or via events)
-    if vote_input.vote_option:
-        proposal["yes_votes_on_chain"] += simulated_vote_weight
-    else:
-        proposal["no_votes_on_chain"] += simulated_vote_weight
-    
-    # Store vote in our DB (optional, could be just for local history/UI speed)
-    vote_record = {
-        "proposal_id": on_chain_proposal_id,
-        "voter_wallet_address": simulated_voter_wallet,
-        "vote_option": vote_input.vote_option,
-        "vote_weight": simulated_vote_weight,
-        "voted_at": "2025-05-15T12:00:00Z"
-    }
-    fake_dao_votes_db.append(vote_record)
+    # Queue the vote for the writer, which stores it and updates the simulated on-chain counts
+    # (in a real app, these would be read from chain or via events); answered once it is durable
+    vote_record = VoteRecord(
+        proposal_id=on_chain_proposal_id,
+        voter_wallet_address=voter_wallet,
+        vote_option=vote_input.vote_option,
+        vote_weight=vote_weight,
+        voted_at=datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z"),
+    )
+    try:
+        await vote_queue.submit((vote_record, session.user_id if session else None))
+    except DuplicateVoteError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This wallet has already voted on this proposal.")
+    except VotingClosedError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Proposal is not active for voting.")
+    except VoteQueueFullError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers={"Retry-After": "1"})
 
     return VoteResponse(
         proposal_id=on_chain_proposal_id,
-        voter_wallet_address=simulated_voter_wallet,
+        voter_wallet_address=voter_wallet,
         vote_option=vote_input.vote_option,
-        vote_weight=simulated_vote_weight,
+        vote_weight=vote_weight,
         message="Vote cast successfully (simulated)."
     )
 
+async def _get_proposal(db: Optional[AsyncConnection], on_chain_proposal_id: int) -> Optional[dict]:
+    if db is not None:
+        return await SqlDaoRepository(db).get_proposal(on_chain_proposal_id)
+    return fake_dao_proposals_db.get(on_chain_proposal_id)
+
 @router.get("/get_proposal_details/{on_chain_proposal_id}", response_model=ProposalDetailResponse)
-async def get_dao_proposal_details_endpoint(on_chain_proposal_id: int = Path(..., ge=1)):
-    proposal = fake_dao_proposals_db.get(on_chain_proposal_id)
+async def get_dao_proposal_details_endpoint(
+    on_chain_proposal_id: int = Path(..., ge=1),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    await advance_proposal_lifecycle(db)
+    proposal = await _get_proposal(db, on_chain_proposal_id)
     if not proposal:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposal not found.")
     return ProposalDetailResponse(**proposal)
 
+@router.get("/tally_result/{on_chain_proposal_id}", response_model=TallyResultResponse)
+async def tally_result_endpoint(
+    on_chain_proposal_id: int = Path(..., ge=1),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """The final tally of a proposal whose voting has closed; 409 while it is still open."""
+    await advance_proposal_lifecycle(db)
+    result = proposal_scheduler.result(on_chain_proposal_id)
+    if result is not None:
+        return TallyResultResponse(**result._asdict())
+    proposal = await _get_proposal(db, on_chain_proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposal not found.")
+    if proposal["status_on_chain"] in ("Pending", "Voting"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Voting is still open until slot {proposal['end_slot_on_chain']}.",
+        )
+    return TallyResultResponse(
+        proposal_id=on_chain_proposal_id,
+        status=proposal["status_on_chain"],
+        yes_votes=proposal["yes_votes_on_chain"],
+        no_votes=proposal["no_votes_on_chain"],
+        end_slot=proposal["end_slot_on_chain"],
+    )
+
+@router.get("/proposal_updates")
+async def proposal_updates_endpoint(
+    proposal_id: Optional[List[int]] = Query(default=None),
+    last_event_id: Optional[int] = Header(default=None),
+):
+    """
+    Server-sent events with live tally and status changes, instead of polling
+    get_proposal_details / list_proposals. Each `proposal_updates` event holds a JSON
+    list of {proposal_id, changed fields} with absolute values, coalesced so that at
+    most one event is sent per BASEROOT_DAO_UPDATES_WINDOW_MS. Repeat `proposal_id`
+    to watch specific proposals (default: all). Reconnecting clients send
+    Last-Event-ID and receive what they missed; if that is no longer available, a
+    `resync` event asks them to reload. Comment lines keep idle connections open.
+    """
+    return StreamingResponse(
+        proposal_updates.stream(proposal_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/proposal_updates_stats")
+async def proposal_updates_stats_endpoint():
+    """Subscriber count and publish / coalesce / frame counters of the live update stream."""
+    return proposal_updates.stats()
+
+@router.get("/indexer_stats")
+async def indexer_stats_endpoint():
+    """Checkpoint, throughput and lag (head slot minus checkpoint slot) of the on-chain event indexer."""
+    if chain_indexer is None:
+        return {"enabled": False}
+    return {"enabled": True, **chain_indexer.stats()}
+
+@router.get("/vote_queue_stats")
+async def vote_queue_stats_endpoint():
+    """Admission, rejection and group-commit batch counters of the vote ingestion queue."""
+    return vote_queue.stats()
+
+@router.get("/voting_power/{on_chain_proposal_id}", response_model=VotingPowerResponse)
+async def voting_power_endpoint(
+    on_chain_proposal_id: int = Path(..., ge=1),
+    voter_wallet_address: str = Query(..., min_length=1),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """The weight the wallet's vote on the proposal would carry (its balance at the proposal's start slot)."""
+    proposal = await _get_proposal(db, on_chain_proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proposal not found.")
+    start_slot = proposal["start_slot_on_chain"]
+    snapshot = voting_power.cached(start_slot) or await run_in_threadpool(voting_power.snapshot, start_slot)
+    return VotingPowerResponse(
+        proposal_id=on_chain_proposal_id,
+        voter_wallet_address=voter_wallet_address,
+        snapshot_slot=start_slot,
+        vote_weight=voting_power.weight_in(snapshot, voter_wallet_address),
+        total_supply=snapshot.total_supply,
+    )
+
+@router.get("/has_voted/{on_chain_proposal_id}", response_model=HasVotedResponse)
+async def has_voted_endpoint(
+    on_chain_proposal_id: int = Path(..., ge=1),
+    voter_wallet_address: str = Query(..., min_length=1),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """Whether the wallet voted on the proposal (and how); a point lookup on the (proposal, voter) key."""
+    if db is not None:
+        vote = await SqlDaoRepository(db).get_vote(on_chain_proposal_id, voter_wallet_address)
+    else:
+        vote = vote_store.get_vote(on_chain_proposal_id, voter_wallet_address)
+    return HasVotedResponse(
+        proposal_id=on_chain_proposal_id,
+        voter_wallet_address=voter_wallet_address,
+        has_voted=vote is not None,
+        vote=VoteRecordResponse(**vote._asdict()) if vote else None,
+    )
+
+@router.get("/votes_by_voter/{voter_wallet_address}", response_model=List[VoteRecordResponse])
+async def votes_by_voter_endpoint(
+    voter_wallet_address: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """A wallet's voting history, oldest first, served from the per-voter index."""
+    if db is not None:
+        votes = await SqlDaoRepository(db).voter_history(voter_wallet_address, skip=skip, limit=limit)
+    else:
+        votes = vote_store.voter_history(voter_wallet_address, skip=skip, limit=limit)
+    return [VoteRecordResponse(**vote._asdict()) for vote in votes]
+
 @router.get("/list_proposals", response_model=List[ProposalDetailResponse])
-async def list_dao_proposals_endpoint(skip: int = 0, limit: int = 10, status_filter: Optional[str] = None):
-    proposals_list = list(fake_dao_proposals_db.values())
-    if status_filter:
-        proposals_list = [p for p in proposals_list if p["status_on_chain"].lower() == status_filter.lower()]
-    
-    return [ProposalDetailResponse(**p) for p in proposals_list[skip : skip + limit]]
+async def list_dao_proposals_endpoint(
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, ge=1, le=100),
+    status_filter: Optional[str] = None,
+    sort: Literal["oldest", "newest", "closing_soonest", "largest_amount"] = "oldest",
+    cursor: Optional[str] = None,
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """
+    Lists proposals, optionally of one status, oldest first unless `sort` says otherwise
+    (newest, closing_soonest by end slot, largest_amount requested).
+    Pages come from per-status sorted indexes, in time proportional to `limit` however many
+    proposals exist. When more results exist, the `X-Next-Cursor` response header holds an
+    opaque cursor; pass it back as `cursor` (with the same sort and status_filter) for the next page.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            cursor_sort, cursor_status, after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+        if cursor_sort != sort or cursor_status != status_filter:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match the sort and status_filter of this query.")
+
+    await advance_proposal_lifecycle(db)
+    if db is not None:
+        proposals, next_key = await SqlDaoRepository(db).list_page(sort=sort, status_filter=status_filter, after=after, skip=skip, limit=limit)
+    else:
+        proposal_ids, next_key = proposal_index.page(sort=sort, status_filter=status_filter, after=after, skip=skip, limit=limit)
+        proposals = [fake_dao_proposals_db[proposal_id] for proposal_id in proposal_ids]
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(sort, status_filter, next_key)
+    return [ProposalDetailResponse(**p) for p in proposals]
 
 # TODO:
 # - Implement actual Solana smart contract interactions.
-# - Integrate with PostgreSQL database.
-# - Add endpoints for tallying votes and executing proposals (these would also interact with smart contracts).
+# - Add an endpoint for executing approved proposals (this would also interact with smart contracts).
 # - Implement robust authentication, authorization, and error handling.
 # - Add logic for tracking fund distribution.
 
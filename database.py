@@ -0,0 +1,265 @@
+"""
+Async SQL persistence for the Baseroot backend (see database_schema.md).
+
+- Tables are SQLAlchemy Core definitions of database_schema.md, with an index
+  for every lookup the routers make. Authors and keywords live in side tables
+  so "NFTs by author/keyword" is an index range scan on any database.
+- `Database` owns one pooled async engine per process. Configuration:
+  DATABASE_URL (e.g. postgresql+asyncpg://... in production,
+  sqlite+aiosqlite:///./baseroot.db locally), BASEROOT_DB_POOL_SIZE,
+  BASEROOT_DB_MAX_OVERFLOW, BASEROOT_DB_POOL_TIMEOUT_SECONDS and
+  BASEROOT_DB_STATEMENT_CACHE_SIZE.
+- Statements are module-level Core constructs, so SQLAlchemy's compiled-statement
+  cache serves every request after the first; on PostgreSQL, asyncpg also keeps
+  a per-connection prepared statement cache of the same size.
+- `get_db` is the per-request FastAPI dependency: one pooled connection per
+  request ("commit as you go"). Handlers call `await db.commit()` before they
+  return, so a response is only sent for durable writes; anything uncommitted is
+  rolled back when the connection goes back to the pool. The time spent
+  waiting for a pooled connection is recorded in `PoolMetrics` (exposed through
+  `Database.stats()`).
+
+Without DATABASE_URL the routers keep their in-memory simulated stores.
+"""
+
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+metadata = sa.MetaData()
+
+users = sa.Table(
+    "users", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("wallet_address", sa.String(44), nullable=False, unique=True),
+    sa.Column("username", sa.String(255), unique=True),
+    sa.Column("email", sa.String(255), unique=True),
+    sa.Column("profile_info", sa.Text),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+)
+
+research_nfts = sa.Table(
+    "research_nfts", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("mint_address", sa.String(44), nullable=False, unique=True),
+    sa.Column("on_chain_metadata_uri", sa.String(255)),
+    sa.Column("on_chain_symbol", sa.String(10)),
+    sa.Column("title", sa.Text, nullable=False),
+    sa.Column("abstract", sa.Text),
+    sa.Column("authors", sa.JSON, nullable=False), # TEXT[] in the schema; JSON works on SQLite and PostgreSQL
+    sa.Column("keywords", sa.JSON),
+    sa.Column("publication_date", sa.Date),
+    sa.Column("content_hash", sa.String(255), nullable=False),
+    sa.Column("content_storage_provider", sa.String(50)),
+    sa.Column("research_type", sa.String(100)),
+    sa.Column("uploader_user_id", sa.Integer, sa.ForeignKey("users.id")),
+    sa.Column("uploader_wallet_address", sa.String(44)),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+    sa.Index("ix_research_nfts_created_at_id", "created_at", "id"),
+    sa.Index("ix_research_nfts_publication_date_id", "publication_date", "id"),
+    sa.Index("ix_research_nfts_research_type_created_at", sa.func.lower(sa.column("research_type")), "created_at", "id"),
+    sa.Index("ix_research_nfts_uploader_user_id", "uploader_user_id"),
+)
+
+# Case-folded author / keyword lookup tables; the (value, nft_id) primary key is the lookup index
+research_nft_authors = sa.Table(
+    "research_nft_authors", metadata,
+    sa.Column("author_key", sa.Text, primary_key=True),
+    sa.Column("nft_id", sa.Integer, sa.ForeignKey("research_nfts.id", ondelete="CASCADE"), primary_key=True),
+)
+
+research_nft_keywords = sa.Table(
+    "research_nft_keywords", metadata,
+    sa.Column("keyword_key", sa.Text, primary_key=True),
+    sa.Column("nft_id", sa.Integer, sa.ForeignKey("research_nfts.id", ondelete="CASCADE"), primary_key=True),
+)
+
+dao_proposals = sa.Table(
+    "dao_proposals", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("on_chain_proposal_id", sa.String(255), nullable=False, unique=True),
+    sa.Column("proposer_user_id", sa.Integer, sa.ForeignKey("users.id")),
+    sa.Column("proposer_wallet_address", sa.String(44), nullable=False),
+    sa.Column("title", sa.Text, nullable=False),
+    sa.Column("description", sa.Text, nullable=False),
+    sa.Column("requested_amount_sol", sa.BigInteger),
+    sa.Column("currency", sa.String(10)),
+    sa.Column("target_funding_address", sa.String(44), nullable=False),
+    sa.Column("ipfs_details_hash", sa.String(255)),
+    sa.Column("status", sa.String(50), nullable=False, server_default="Pending"),
+    sa.Column("start_slot", sa.BigInteger),
+    sa.Column("end_slot", sa.BigInteger),
+    sa.Column("vote_start_timestamp", sa.DateTime(timezone=True)),
+    sa.Column("vote_end_timestamp", sa.DateTime(timezone=True)),
+    sa.Column("yes_votes", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("no_votes", sa.BigInteger, nullable=False, server_default="0"),
+    sa.Column("executed", sa.Boolean, nullable=False, server_default=sa.false()),
+    sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+    # Keyset pagination of the per-status listings (see SqlDaoRepository.list_page)
+    sa.Index("ix_dao_proposals_status_id", "status", "id"),
+    sa.Index("ix_dao_proposals_status_end_slot", "status", "end_slot", "id"),
+    sa.Index("ix_dao_proposals_status_requested_amount", "status", "requested_amount_sol", "id"),
+    sa.Index("ix_dao_proposals_end_slot", "end_slot"),
+    sa.Index("ix_dao_proposals_proposer_user_id", "proposer_user_id"),
+)
+
+dao_votes = sa.Table(
+    "dao_votes", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("proposal_id", sa.Integer, sa.ForeignKey("dao_proposals.id"), nullable=False),
+    sa.Column("voter_user_id", sa.Integer, sa.ForeignKey("users.id")),
+    sa.Column("on_chain_voter_address", sa.String(44), nullable=False),
+    sa.Column("vote_type", sa.Boolean, nullable=False),
+    sa.Column("voting_power", sa.BigInteger),
+    sa.Column("transaction_signature", sa.String(88)),
+    sa.Column("voted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+    sa.UniqueConstraint("proposal_id", "voter_user_id", name="uq_dao_votes_proposal_voter_user"),
+    sa.UniqueConstraint("proposal_id", "on_chain_voter_address", name="uq_dao_votes_proposal_voter_address"),
+    sa.Index("ix_dao_votes_on_chain_voter_address", "on_chain_voter_address", "voted_at"),
+)
+
+governance_tokens = sa.Table(
+    "governance_tokens", metadata,
+    sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), primary_key=True),
+    sa.Column("balance", sa.BigInteger, nullable=False),
+    sa.Column("last_updated", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.current_timestamp()),
+)
+
+
+class PoolMetrics:
+    """Running statistics of how long requests waited for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def record(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "mean_wait_ms": round(1000 * self.total_wait_seconds / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+        }
+
+
+class Database:
+    def __init__(self, url: str, pool_size: int = 10, max_overflow: int = 20, pool_timeout: float = 30.0,
+                 statement_cache_size: int = 500, echo: bool = False):
+        self.url = url
+        self.metrics = PoolMetrics()
+        options = {"echo": echo, "query_cache_size": statement_cache_size, "pool_pre_ping": True}
+        url_object = sa.engine.make_url(url)
+        if url_object.get_backend_name() == "sqlite":
+            if url_object.database in (None, "", ":memory:"):
+                # One shared connection, otherwise every checkout would see a fresh empty database
+                options.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+            else:
+                options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+        else:
+            options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+            if url_object.get_driver_name() == "asyncpg":
+                options["connect_args"] = {"prepared_statement_cache_size": statement_cache_size}
+        self.engine: AsyncEngine = create_async_engine(url, **options)
+        if url_object.get_backend_name() == "sqlite":
+            sa.event.listen(self.engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+    @classmethod
+    def from_env(cls) -> Optional["Database"]:
+        url = os.getenv("DATABASE_URL")
+        if not url:
+            return None
+        return cls(
+            url,
+            pool_size=int(os.getenv("BASEROOT_DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("BASEROOT_DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("BASEROOT_DB_POOL_TIMEOUT_SECONDS", "30")),
+            statement_cache_size=int(os.getenv("BASEROOT_DB_STATEMENT_CACHE_SIZE", "500")),
+        )
+
+    async def create_all(self) -> None:
+        """Creates missing tables and indexes (use migrations for schema changes in production)."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """A pooled connection; uncommitted work is rolled back when it is returned."""
+        started = time.perf_counter()
+        try:
+            conn = await self.engine.connect()
+        except sa.exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncConnection]:
+        """A pooled connection inside one transaction; commits on success, rolls back on error."""
+        async with self.connection() as conn:
+            async with conn.begin():
+                yield conn
+
+    def stats(self) -> Dict[str, object]:
+        pool = self.engine.pool
+        stats: Dict[str, object] = {"pool": pool.status(), "wait": self.metrics.stats()}
+        if hasattr(pool, "checkedout"):
+            stats.update(checked_out=pool.checkedout(), pool_size=pool.size(), overflow=pool.overflow())
+        return stats
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# Process-wide database, None when DATABASE_URL is not set (in-memory simulated mode)
+database: Optional[Database] = Database.from_env()
+
+
+def configure(url: Optional[str], **options) -> Optional[Database]:
+    """Replaces the process-wide database (None switches back to in-memory mode); mainly for tests and scripts."""
+    global database
+    database = Database(url, **options) if url else None
+    return database
+
+
+async def get_db() -> AsyncIterator[Optional[AsyncConnection]]:
+    """
+    Per-request FastAPI dependency: a pooled connection (the handler commits),
+    or None when no database is configured.
+    """
+    if database is None:
+        yield None
+        return
+    async with database.connection() as conn:
+        yield conn
@@ -0,0 +1,43 @@
+"""
+Strong ETags and conditional GET (If-None-Match / 304) for pre-encoded JSON responses.
+
+Handlers that keep response bodies as encoded bytes return them through
+`json_response`: the body goes out as is (no model validation or re-encoding),
+and a request whose If-None-Match lists the current ETag gets an empty 304.
+An ETag is derived from the bytes it describes (or from the ETags of the
+fragments a body is concatenated from), so it changes whenever the body does.
+"""
+
+import hashlib
+from typing import Dict, Iterable, Optional
+
+from fastapi import Response, status
+
+
+def strong_etag(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def combined_etag(etags: Iterable[str], *extra: bytes) -> str:
+    """ETag of a body assembled from fragments with the given ETags (plus anything else it depends on)."""
+    return strong_etag("".join(etags).encode("ascii"), *extra)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, "*" matches anything."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+def json_response(body: bytes, etag: str, if_none_match: Optional[str] = None,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = {**(headers or {}), "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
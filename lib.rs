@@ -274,14 +274,11 @@ pub struct VoterRecord {
 }
 
 impl VoterRecord {
-    // A simple check. In a real scenario, you might query if a PDA for this voter+proposal exists.
-    // This current structure implies one VoterRecord account per vote.
-    pub fn has_voted(&self, _proposal_id_to_check: u64) -> bool {
-        // If this account exists and self.voter is set, it means this voter has voted on self.proposal_id
-        // This check is more about whether this specific VoterRecord account has been initialized for *a* vote.
-        // A better check would be to try_accounts for a PDA seeded with voter key and proposal_id.
-        // For now, if this account is being used, it means a vote is being cast or has been cast.
-        self.voter != Pubkey::default() // If voter is not default, it means it's initialized
+    // The VoterRecord PDA is seeded with (proposal_id, voter) and created with `init`, so a second vote
+    // by the same voter on the same proposal already fails when the account is created. This check also
+    // rejects a record that has been filled in for this proposal.
+    pub fn has_voted(&self, proposal_id_to_check: u64) -> bool {
+        self.voter != Pubkey::default() && self.proposal_id == proposal_id_to_check
     }
 }
 
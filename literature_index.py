@@ -0,0 +1,283 @@
+"""
+In-memory indexes for the AI literature discovery API.
+
+The corpus embeddings live in a single contiguous float32 matrix so a query is
+scored with one matrix-vector product, and the top_k rows are picked with a
+partial sort (np.argpartition) instead of sorting every score.
+
+Embedders are pluggable: anything implementing `Embedder.embed` can be used.
+`HashingEmbedder` is a deterministic, offline stand-in (feature hashing of
+unigrams and bigrams) so the service runs without downloading a model.
+A sentence-transformers model can be dropped in later by wrapping
+`SentenceTransformer.encode` in an `Embedder` subclass.
+
+`InvertedIndex` is the lexical counterpart: a tokenized term -> postings
+index ranked with BM25, built once and updated incrementally as papers are
+added, so a keyword query only touches papers that contain a query term.
+"""
+
+import hashlib
+import re
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# Very common English words that carry no ranking signal in keyword/abstract queries
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was we were with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases `text` and splits it into alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def paper_text(paper: Dict) -> str:
+    """Text that represents a corpus paper for embedding and keyword indexing."""
+    return " ".join([paper["title"], paper["abstract"], " ".join(paper.get("keywords") or [])])
+
+
+class Embedder(ABC):
+    """Interface for turning a batch of texts into L2-normalized float32 vectors."""
+
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Returns an array of shape (len(texts), self.dim), dtype float32."""
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_feature(feature: str, dim: int) -> Tuple[int, float]:
+    # blake2b instead of hash() so buckets are stable across processes and restarts
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, (1.0 if (value >> 63) & 1 else -1.0)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic offline embedder based on the signed hashing trick.
+    Unigrams and adjacent-token bigrams are hashed into `dim` buckets; the
+    resulting vector is L2-normalized so dot products are cosine similarities.
+    """
+
+    def __init__(self, dim: int = 256, use_bigrams: bool = True):
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+
+    def hash_feature(self, feature: str) -> Tuple[int, float]:
+        """(bucket, sign) a token or bigram contributes to."""
+        return _hash_feature(feature, self.dim)
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        if self.use_bigrams:
+            tokens = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                bucket, sign = _hash_feature(feature, self.dim)
+                out[row, bucket] += sign
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest `scores`, highest first, using a partial sort."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(scores, n - k)[n - k :]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row top-k of a 2-D score matrix: (indices, scores), each (rows, k), best first."""
+    n = scores.shape[1]
+    if k < n:
+        candidates = np.argpartition(scores, n - k, axis=1)[:, n - k :]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Exact (brute-force) inner-product index over a contiguous float32 matrix.
+    Rows are addressed by their insertion position; callers keep the mapping
+    from row to paper.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.zeros((max(initial_capacity, 1), dim), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the populated rows (no copy)."""
+        return self._vectors[: self._size]
+
+    def wrap(self, matrix: np.ndarray) -> None:
+        """
+        Serves searches directly from an existing (rows, dim) float32 matrix, e.g. a
+        read-only memmap, without copying it. A later `add` copies into memory.
+        """
+        if matrix.dtype != np.float32 or matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected a (rows, {self.dim}) float32 matrix")
+        self._vectors = matrix
+        self._size = matrix.shape[0]
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        needed = self._size + vectors.shape[0]
+        if needed > self._vectors.shape[0]:
+            # Amortized doubling keeps the matrix contiguous without a copy per insert
+            capacity = max(needed, self._vectors.shape[0] * 2, 1024)
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        self._vectors[self._size : needed] = vectors
+        self._size = needed
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (row indices, scores) of the k best rows for one query vector."""
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        rows = top_k_indices(scores, k)
+        return rows, scores[rows]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scores a (q, dim) batch of queries with one matrix-matrix product.
+        Returns (rows, scores), both of shape (q, min(k, len(self))), best first per row.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        k = min(k, self._size)
+        if k <= 0:
+            return (np.empty((queries.shape[0], 0), dtype=np.int64),
+                    np.empty((queries.shape[0], 0), dtype=np.float32))
+        scores = queries @ self.vectors.T
+        return top_k_rows(scores, k)
+
+
+class InvertedIndex:
+    """
+    Term -> postings index with BM25 ranking.
+    Each posting list holds (row, term frequency) pairs in insertion order;
+    rows are assigned sequentially by `add`, mirroring `VectorIndex`.
+    `add` may run while other threads score: each document is indexed under
+    `_lock`, and `score` copies the postings it needs under the same lock.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._doc_lengths = np.zeros(1024, dtype=np.float32)
+        self._size = 0
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def analyze(text: str) -> List[str]:
+        return [t for t in tokenize(text) if t not in STOPWORDS]
+
+    def add(self, texts: Iterable[str]) -> None:
+        """Indexes each text as the next row."""
+        for text in texts:
+            terms = self.analyze(text)
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            with self._lock:
+                row = self._size
+                for term, tf in counts.items():
+                    rows, tfs = self._postings.setdefault(term, ([], []))
+                    rows.append(row)
+                    tfs.append(tf)
+                if row >= self._doc_lengths.shape[0]:
+                    grown = np.zeros(self._doc_lengths.shape[0] * 2, dtype=np.float32)
+                    grown[:row] = self._doc_lengths[:row]
+                    self._doc_lengths = grown
+                self._doc_lengths[row] = len(terms)
+                self._total_length += len(terms)
+                self._size += 1
+
+    def document_frequency(self, term: str) -> int:
+        postings = self._postings.get(term)
+        return len(postings[0]) if postings else 0
+
+    @staticmethod
+    def _idf(df: int, size: int) -> float:
+        return float(np.log(1.0 + (size - df + 0.5) / (df + 0.5)))
+
+    def score(self, query: str) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        BM25-scores every row containing at least one query term.
+        Returns (rows, scores, max_possible_score); rows are ascending and only
+        cover matching papers. max_possible_score is the BM25 upper bound for
+        this query (every term saturated), useful for normalizing to [0, 1].
+        """
+        terms = list(dict.fromkeys(self.analyze(query)))
+        postings = []
+        with self._lock:
+            # Snapshot of the query's postings and the document lengths they refer to
+            size, total_length = self._size, self._total_length
+            for term in terms:
+                if term in self._postings:
+                    rows_list, tfs_list = self._postings[term]
+                    rows = np.asarray(rows_list, dtype=np.int64)
+                    postings.append((rows, np.asarray(tfs_list, dtype=np.float32), self._doc_lengths[rows]))
+        if not postings or size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), 0.0
+        avg_length = total_length / size or 1.0
+        all_rows, all_scores = [], []
+        max_possible = 0.0
+        for rows, tf, doc_lengths in postings:
+            idf = self._idf(rows.shape[0], size)
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths / avg_length)
+            all_rows.append(rows)
+            all_scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+            max_possible += idf * (self.k1 + 1.0)
+        rows = np.concatenate(all_rows)
+        contributions = np.concatenate(all_scores)
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=contributions).astype(np.float32)
+        return unique_rows, scores, max_possible
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Top-k rows for `query` as (rows, scores, max_possible_score), best first."""
+        rows, scores, max_possible = self.score(query)
+        order = top_k_indices(scores, k)
+        return rows[order], scores[order], max_possible
@@ -1,10 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+
+from baseroot_backend import dao_api, database, nft_api
 from baseroot_backend.auth_api import router as auth_router
 from baseroot_backend.nft_api import router as nft_router
 from baseroot_backend.dao_api import router as dao_router
 from baseroot_backend.ai_discovery_api import router as ai_router
 
-app = FastAPI(title="Baseroot DeSci Platform API - Simulated")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # With DATABASE_URL set, create any missing tables/indexes on startup, schedule the open
+    # proposals for closing, rebuild the NFT search index, and release the pool on shutdown
+    if database.database is not None:
+        await database.database.create_all()
+        await dao_api.schedule_open_proposals()
+        await nft_api.load_search_index()
+    # Follow the contract's events (BASEROOT_CHAIN_EVENTS_FILE) from the last checkpoint
+    indexer_task = None
+    if dao_api.chain_indexer is not None:
+        indexer_task = asyncio.create_task(dao_api.chain_indexer.run(dao_api.CHAIN_POLL_SECONDS))
+    yield
+    if indexer_task is not None:
+        indexer_task.cancel()
+    await dao_api.vote_queue.drain()
+    if database.database is not None:
+        await database.database.dispose()
+
+app = FastAPI(title="Baseroot DeSci Platform API - Simulated", lifespan=lifespan)
 
 # Include routers
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["Authentication"])
@@ -16,6 +40,10 @@ app.include_router(ai_router, prefix="/api/v1/ai", tags=["AI Discovery"])
 async def read_root():
     return {"message": "Welcome to the Baseroot DeSci Platform API (Simulated Mode). Visit /docs for API documentation."}
 
-# In a real setup, you would also have database initialization, etc.
-# For this demo, all data is simulated within the API route handlers themselves.
+@app.get("/db_stats", tags=["Root"])
+async def db_stats():
+    """Connection pool status and pool wait-time metrics (in-memory mode when no database is configured)."""
+    if database.database is None:
+        return {"mode": "in-memory"}
+    return {"mode": "sql", **database.database.stats()}
 
@@ -1,6 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Body
+import asyncio
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Depends, status, Body, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncConnection
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+from baseroot_backend import database
+from baseroot_backend.auth_api import optional_session
+from baseroot_backend.blob_store import URI_SCHEME, cid_from_uri, is_cid, store_from_env
+from baseroot_backend.database import get_db
+from baseroot_backend.http_cache import combined_etag, json_response, strong_etag
+from baseroot_backend.nft_index import MAX_FILTERED_SKIP, NftListIndex, decode_cursor, encode_cursor
+from baseroot_backend.nft_search import FACET_FIELDS, NftSearchIndex
+from baseroot_backend.result_cache import ResultCache
+from baseroot_backend.session_tokens import SessionClaims
+from baseroot_backend.sql_repositories import SqlNftRepository
 
 # Placeholder for Solana interaction library, DB models, and session
 # from ..services.solana_service import verify_signature, call_mint_nft_contract # Placeholder
@@ -36,6 +56,18 @@ class NftResponse(BaseModel):
     title: str
     message: str
 
+class BulkMintItemResult(BaseModel):
+    index: int # Position in the request
+    mint_address: Optional[str] = None
+    metadata_uri: Optional[str] = None
+    error: Optional[str] = None # Set when this item was not minted
+
+class BulkMintResponse(BaseModel):
+    received: int
+    minted: int
+    failed: int
+    results: List[BulkMintItemResult]
+
 class NftDetailResponse(BaseModel):
     mint_address: str
     uploader_wallet_address: str
@@ -49,13 +81,143 @@ class NftDetailResponse(BaseModel):
     keywords: Optional[List[str]] = None
     research_type: Optional[str] = None
     created_at: str # Should be datetime, but string for simplicity here
+    off_chain_metadata: Optional[dict] = None # The metadata JSON behind metadata_uri, when requested
 
-# Simulated DB for NFTs
+class NftSearchHit(BaseModel):
+    score: float
+    nft: NftDetailResponse
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class NftSearchResponse(BaseModel):
+    query: str
+    total: int # All matches, not just this page
+    hits: List[NftSearchHit]
+    facets: Dict[str, List[FacetCount]] # keyword / author / research_type counts over all matches
+    truncated_prefixes: List[str] = [] # prefix* terms that matched more indexed terms than were searched
+
+# Simulated DB for NFTs. With DATABASE_URL set, research_nfts is the system of record and
+# fake_nft_db only caches this worker's rows (NFT records are immutable once minted).
 fake_nft_db = {}
 next_nft_id = 1
+# Sorted secondary indexes (created_at, publication_date; by author / keyword / research_type) for list_nfts
+nft_list_index = NftListIndex()
+# Positional full-text index (title, abstract, authors, keywords) with facets, for search_nfts.
+# With a database it also covers NFTs minted by other workers or before a restart: see sync_search_index
+nft_search_index = NftSearchIndex(max_prefix_expansions=int(os.getenv("BASEROOT_SEARCH_MAX_PREFIX_EXPANSIONS", "64")))
+search_synced_id = 0 # highest research_nfts.id read into nft_search_index
+SEARCH_SYNC_BATCH = 5000
+# Content-addressed store for the off-chain metadata JSON (local stand-in for IPFS/Arweave)
+metadata_blob_store = store_from_env()
+# Pre-encoded NftDetailResponse JSON and its ETag per mint address. Filled at mint time and
+# replaced whenever a record is (re)remembered; NFT records are immutable once minted, so entries never expire.
+nft_json_cache = ResultCache(max_entries=int(os.getenv("BASEROOT_NFT_JSON_CACHE_ENTRIES", "100000")), ttl_seconds=float("inf"))
+
+def _encode_nft(entry: dict) -> Tuple[bytes, str]:
+    body = json.dumps(_detail_fields(entry), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, strong_etag(body)
+
+def _encoded_nft(entry: dict) -> Tuple[bytes, str]:
+    cached = nft_json_cache.get(entry["mint_address"])
+    if cached is None:
+        cached = _encode_nft(entry)
+        nft_json_cache.put(entry["mint_address"], cached)
+    return cached
+
+async def _remember_nft(entry: dict) -> None:
+    fake_nft_db[entry["mint_address"]] = entry
+    nft_list_index.add(entry)
+    nft_json_cache.put(entry["mint_address"], _encode_nft(entry))
+    # A search running in the threadpool holds the search index lock; wait for it off the event loop
+    await run_in_threadpool(nft_search_index.add, entry)
+
+async def sync_search_index(db: AsyncConnection) -> int:
+    """
+    Indexes the research_nfts rows added since the last sync, by any worker (a primary-key
+    range scan; already indexed NFTs are skipped). Returns the number of rows read.
+    """
+    global search_synced_id
+    read = 0
+    while True:
+        entries = await SqlNftRepository(db).after_id(search_synced_id, SEARCH_SYNC_BATCH)
+        if not entries:
+            return read
+        read += len(entries)
+        search_synced_id = max(search_synced_id, entries[-1]["id"])
+        await run_in_threadpool(nft_search_index.add_many, entries)
+        if len(entries) < SEARCH_SYNC_BATCH:
+            return read
+
+async def load_search_index() -> int:
+    """Rebuilds the search index from research_nfts (on startup, in SQL mode)."""
+    async with database.database.connection() as conn:
+        return await sync_search_index(conn)
+
+def _utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+def _uploader(session: Optional[SessionClaims], db: Optional[AsyncConnection]):
+    # Uploader comes from the session token when present; anonymous calls keep the simulated uploader
+    if session:
+        return session.user_id, session.wallet_address
+    return (1 if db is None else None), "SimulatedUploaderWalletAddress"
+
+def _metadata_document(metadata: NftMetadataInput) -> dict:
+    """Off-chain metadata JSON (Metaplex layout plus baseroot_* fields, see nft_metadata_design.md)."""
+    attributes = [{"trait_type": "Publication Date", "value": metadata.publication_date}]
+    if metadata.research_type:
+        attributes.append({"trait_type": "Research Type", "value": metadata.research_type})
+    return {
+        "name": metadata.title,
+        "symbol": "BSRTR",
+        "description": metadata.abstract_text,
+        "seller_fee_basis_points": 0,
+        "attributes": attributes,
+        "properties": {
+            "authors": metadata.authors,
+            "keywords": metadata.keywords or [],
+            "files": [{"uri": metadata.content_storage_hash, "provider": metadata.content_storage_provider}],
+            "category": "research_output",
+            "creators": [],
+        },
+        "baseroot_title": metadata.title,
+        "baseroot_abstract": metadata.abstract_text,
+        "baseroot_content_hash": metadata.content_storage_hash,
+        "baseroot_date": metadata.publication_date,
+        "baseroot_authors_list": metadata.authors,
+        "baseroot_research_type": metadata.research_type,
+    }
+
+def _build_nft_entry(metadata: NftMetadataInput, nft_id: int, mint_suffix: str, metadata_uri: str,
+                     uploader_user_id: Optional[int], uploader_wallet: str, created_at: str) -> dict:
+    # Simulate calling the on-chain contract
+    # In a real scenario, this would involve solana-py or similar to interact with the deployed contract
+    return {
+        "id": nft_id,
+        "mint_address": f"FakeMintAddr{mint_suffix}{metadata.title[:5].replace(' ','')}",
+        "uploader_user_id": uploader_user_id,
+        "uploader_wallet_address": uploader_wallet,
+        "title": metadata.title,
+        "abstract_text": metadata.abstract_text,
+        "authors": metadata.authors,
+        "publication_date": metadata.publication_date,
+        "content_storage_hash": metadata.content_storage_hash,
+        "content_storage_provider": metadata.content_storage_provider,
+        "metadata_uri": metadata_uri,
+        "keywords": metadata.keywords,
+        "research_type": metadata.research_type,
+        "on_chain_symbol": "BSRTR",
+        "created_at": created_at,
+    }
 
 @router.post("/mint_research_nft", response_model=NftResponse, status_code=status.HTTP_201_CREATED)
-async def mint_research_nft_endpoint(request: MintRequest = Body(...)):
+async def mint_research_nft_endpoint(
+    request: MintRequest = Body(...),
+    session: Optional[SessionClaims] = Depends(optional_session),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
     """
     Endpoint to mint a new research NFT.
     This is a simplified version. A real implementation would:
@@ -70,36 +232,28 @@ async def mint_research_nft_endpoint(request: MintRequest = Body(...)):
     8. Store the NFT details (mint address, metadata URI, uploader, etc.) in the PostgreSQL database.
     """
     global next_nft_id
-    # uploader_wallet = request.uploader_wallet_address # From auth context
-    # For simulation, we generate a fake mint address and use input directly
-
-    # Simulate metadata JSON creation and upload (in reality, this would involve IPFS/Arweave)
-    simulated_metadata_uri = f"ipfs://{request.metadata.content_storage_hash}_metadata_json"
-
-    # Simulate calling the on-chain contract
-    # In a real scenario, this would involve solana-py or similar to interact with the deployed contract
-    # For now, we generate a fake mint address
-    simulated_mint_address = f"FakeMintAddr{next_nft_id:03d}{request.metadata.title[:5].replace(' ','')}"
+    try:
+        date.fromisoformat(request.metadata.publication_date) # before anything is stored, as in bulk mint
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="publication_date must be an ISO 8601 date.")
+    uploader_user_id, uploader_wallet = _uploader(session, db)
+    nft_id = next_nft_id
+    if db is None:
+        next_nft_id += 1 # Reserve the id before the first await
+    # For now, we generate a fake mint address (random with a database, so workers never collide)
+    mint_suffix = f"{nft_id:03d}" if db is None else uuid.uuid4().hex[:12]
+    # Store the metadata JSON under its CID (identical metadata is stored once); file I/O stays off the event loop
+    metadata_uri = URI_SCHEME + await run_in_threadpool(metadata_blob_store.put_json, _metadata_document(request.metadata))
+    db_nft_entry = _build_nft_entry(request.metadata, nft_id, mint_suffix, metadata_uri,
+                                    uploader_user_id, uploader_wallet, _utc_timestamp())
+    simulated_mint_address = db_nft_entry["mint_address"]
+    simulated_metadata_uri = db_nft_entry["metadata_uri"]
 
     # Simulate saving to DB
-    db_nft_entry = {
-        "id": next_nft_id,
-        "mint_address": simulated_mint_address,
-        "uploader_user_id": 1, # Assuming user with ID 1 is the uploader for simulation
-        "title": request.metadata.title,
-        "abstract_text": request.metadata.abstract_text,
-        "authors": request.metadata.authors,
-        "publication_date": request.metadata.publication_date,
-        "content_storage_hash": request.metadata.content_storage_hash,
-        "content_storage_provider": request.metadata.content_storage_provider,
-        "metadata_uri": simulated_metadata_uri,
-        "keywords": request.metadata.keywords,
-        "research_type": request.metadata.research_type,
-        "on_chain_symbol": "BSRTR",
-        "created_at": "2025-05-15T10:00:00Z" # Simulated timestamp
-    }
-    fake_nft_db[simulated_mint_address] = db_nft_entry
-    next_nft_id += 1
+    if db is not None:
+        db_nft_entry["id"] = await SqlNftRepository(db).insert(db_nft_entry)
+        await db.commit()
+    await _remember_nft(db_nft_entry)
 
     return NftResponse(
         mint_address=simulated_mint_address,
@@ -108,65 +262,292 @@ async def mint_research_nft_endpoint(request: MintRequest = Body(...)):
         message="Research NFT minted successfully (simulated)."
     )
 
+# Upper bound on items per bulk mint request; metadata documents are built in chunks of BULK_MINT_CHUNK_SIZE
+MAX_BULK_MINT_ITEMS = int(os.getenv("BASEROOT_BULK_MINT_MAX_ITEMS", "10000"))
+BULK_MINT_CHUNK_SIZE = 500
+
+async def _mint_batch(items: List[NftMetadataInput], session: Optional[SessionClaims], db: Optional[AsyncConnection],
+                      results: List[Optional[dict]]) -> AsyncIterator[int]:
+    """
+    Mints a batch as one unit and fills `results` (one BulkMintItemResult dict per item, in request order).
+    Items with an invalid publication_date fail individually; the rest get a block of ids,
+    have their metadata documents built and stored chunk by chunk (yielding the number built so far),
+    and are then persisted with one executemany and a single commit and indexed together.
+    """
+    global next_nft_id
+    valid = []
+    for index, metadata in enumerate(items):
+        try:
+            date.fromisoformat(metadata.publication_date)
+            valid.append(index)
+        except ValueError:
+            results[index] = {"index": index, "error": "publication_date must be an ISO 8601 date."}
+    first_id = next_nft_id
+    if db is None:
+        next_nft_id += len(valid) # Reserve the whole id block before the first await
+    uploader_user_id, uploader_wallet = _uploader(session, db)
+    created_at = _utc_timestamp()
+
+    entries = []
+    for start in range(0, len(valid), BULK_MINT_CHUNK_SIZE):
+        chunk = valid[start : start + BULK_MINT_CHUNK_SIZE]
+        cids = await run_in_threadpool(metadata_blob_store.put_many_json, [_metadata_document(items[i]) for i in chunk])
+        for nft_id, index, cid in zip(range(first_id + start, first_id + start + len(chunk)), chunk, cids):
+            mint_suffix = f"{nft_id:03d}" if db is None else uuid.uuid4().hex[:12]
+            entries.append(_build_nft_entry(items[index], nft_id, mint_suffix, URI_SCHEME + cid,
+                                            uploader_user_id, uploader_wallet, created_at))
+        yield len(entries)
+        await asyncio.sleep(0) # let other requests run between chunks
+
+    if db is not None and entries:
+        nft_ids = await SqlNftRepository(db).insert_many(entries)
+        await db.commit()
+        for entry, nft_id in zip(entries, nft_ids):
+            entry["id"] = nft_id
+    for entry in entries:
+        fake_nft_db[entry["mint_address"]] = entry
+        nft_json_cache.put(entry["mint_address"], _encode_nft(entry))
+    nft_list_index.add_many(entries)
+    await run_in_threadpool(nft_search_index.add_many, entries)
+    for index, entry in zip(valid, entries):
+        results[index] = {"index": index, "mint_address": entry["mint_address"], "metadata_uri": entry["metadata_uri"]}
+
+def _check_bulk_mint_size(items: List[NftMetadataInput]) -> None:
+    if len(items) > MAX_BULK_MINT_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_MINT_ITEMS} NFTs per bulk mint request.",
+        )
+
+@router.post("/bulk_mint_research_nfts", response_model=BulkMintResponse)
+async def bulk_mint_research_nfts_endpoint(
+    items: List[NftMetadataInput] = Body(...),
+    session: Optional[SessionClaims] = Depends(optional_session),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """
+    Mints many research NFTs in one call (e.g. an institution uploading an archive).
+    Takes a JSON array of NftMetadataInput and returns one result per item, in request order;
+    an item that fails validation carries an `error` and does not stop the others.
+    All minted items are persisted in one transaction.
+    """
+    _check_bulk_mint_size(items)
+    results: List[Optional[dict]] = [None] * len(items)
+    async for _ in _mint_batch(items, session, db, results):
+        pass
+    minted = sum("error" not in result for result in results)
+    return BulkMintResponse(received=len(items), minted=minted, failed=len(items) - minted, results=results)
+
+async def _stream_bulk_mint(items: List[NftMetadataInput], session: Optional[SessionClaims]) -> AsyncIterator[bytes]:
+    results: List[Optional[dict]] = [None] * len(items)
+
+    async def events(db: Optional[AsyncConnection]) -> AsyncIterator[bytes]:
+        async for built in _mint_batch(items, session, db, results):
+            yield (json.dumps({"event": "progress", "built": built, "total": len(items)}) + "\n").encode("utf-8")
+
+    # The stream outlives the request's dependencies, so it checks out its own pooled connection
+    if database.database is None:
+        async for line in events(None):
+            yield line
+    else:
+        async with database.database.connection() as db:
+            async for line in events(db):
+                yield line
+    for start in range(0, len(results), BULK_MINT_CHUNK_SIZE):
+        lines = [json.dumps({"event": "result", **result})
+                 for result in results[start : start + BULK_MINT_CHUNK_SIZE]]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+    minted = sum("error" not in result for result in results)
+    yield (json.dumps({"event": "done", "received": len(items), "minted": minted, "failed": len(items) - minted}) + "\n").encode("utf-8")
+
+@router.post("/bulk_mint_research_nfts/stream")
+async def bulk_mint_research_nfts_stream_endpoint(
+    items: List[NftMetadataInput] = Body(...),
+    session: Optional[SessionClaims] = Depends(optional_session),
+):
+    """
+    Streaming variant of bulk_mint_research_nfts for very large batches.
+    Responds with newline-delimited JSON: `{"event": "progress", "built", "total"}` lines while the
+    metadata documents are built, then one `{"event": "result", ...}` line per item (BulkMintItemResult
+    fields) once the batch is committed, then a final `{"event": "done", "received", "minted", "failed"}`.
+    """
+    _check_bulk_mint_size(items)
+    return StreamingResponse(_stream_bulk_mint(items, session), media_type="application/x-ndjson")
+
+def _detail_fields(nft_data: dict) -> dict:
+    """NftDetailResponse fields, in model order (also the key order of the cached JSON)."""
+    return {
+        "mint_address": nft_data["mint_address"],
+        "uploader_wallet_address": nft_data["uploader_wallet_address"],
+        "title": nft_data["title"],
+        "abstract_text": nft_data["abstract_text"],
+        "authors": nft_data["authors"],
+        "publication_date": nft_data["publication_date"],
+        "content_storage_hash": nft_data["content_storage_hash"],
+        "content_storage_provider": nft_data["content_storage_provider"],
+        "metadata_uri": nft_data["metadata_uri"],
+        "keywords": nft_data["keywords"],
+        "research_type": nft_data["research_type"],
+        "created_at": nft_data["created_at"],
+        "off_chain_metadata": None,
+    }
+
+def _to_detail_response(nft_data: dict) -> NftDetailResponse:
+    return NftDetailResponse(**_detail_fields(nft_data))
+
 @router.get("/get_nft_metadata/{mint_address}", response_model=NftDetailResponse)
-async def get_nft_metadata_endpoint(mint_address: str):
+async def get_nft_metadata_endpoint(
+    mint_address: str,
+    resolve_metadata: bool = False,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
     """
     Fetches the metadata for a given NFT mint address from the database.
-    In a real scenario, it might also fetch live data from on-chain if needed,
-    or resolve the metadata_uri to get the full JSON from IPFS/Arweave.
+    In a real scenario, it might also fetch live data from on-chain if needed.
+    The response is served from the pre-encoded JSON cache with a strong ETag;
+    a matching If-None-Match gets a 304 without a body.
+    With `resolve_metadata=true`, the metadata_uri is resolved from the local blob store
+    (usually a hot-LRU hit) and returned as `off_chain_metadata`.
     """
+    if not resolve_metadata:
+        cached = nft_json_cache.get(mint_address)
+        if cached is not None:
+            return json_response(*cached, if_none_match)
+
     nft_data = fake_nft_db.get(mint_address)
+    if not nft_data and db is not None:
+        nft_data = await SqlNftRepository(db).get_by_mint(mint_address)
     if not nft_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="NFT not found.")
-    
-    # Simulate fetching uploader wallet from a user table
-    # uploader_wallet = fake_users_db.get(nft_data["uploader_user_id"]).wallet_address if fake_users_db.get(nft_data["uploader_user_id"]) else "UnknownUploader"
-    uploader_wallet = "SimulatedUploaderWalletAddress"
-
-    return NftDetailResponse(
-        mint_address=nft_data["mint_address"],
-        uploader_wallet_address=uploader_wallet, # Placeholder
-        title=nft_data["title"],
-        abstract_text=nft_data["abstract_text"],
-        authors=nft_data["authors"],
-        publication_date=nft_data["publication_date"],
-        content_storage_hash=nft_data["content_storage_hash"],
-        content_storage_provider=nft_data["content_storage_provider"],
-        metadata_uri=nft_data["metadata_uri"],
-        keywords=nft_data["keywords"],
-        research_type=nft_data["research_type"],
-        created_at=nft_data["created_at"]
+
+    if not resolve_metadata:
+        return json_response(*_encoded_nft(nft_data), if_none_match)
+    response = _to_detail_response(nft_data)
+    cid = cid_from_uri(nft_data["metadata_uri"])
+    response.off_chain_metadata = metadata_blob_store.get_json(cid) if cid else None
+    return response
+
+@router.get("/metadata/{cid}")
+async def get_metadata_blob_endpoint(cid: str):
+    """
+    Serves a stored metadata JSON by CID, like an IPFS gateway: the response body is the
+    cached (or, for large blobs, memory-mapped) blob itself. Content never changes, so it is
+    cacheable forever.
+    """
+    if not is_cid(cid):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid CID.")
+    view = metadata_blob_store.get(cid)
+    if view is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metadata not found.")
+    return Response(
+        content=view,
+        media_type="application/json",
+        headers={"ETag": f'"{cid}"', "Cache-Control": "public, max-age=31536000, immutable"},
     )
 
+@router.get("/blob_stats")
+async def metadata_blob_stats_endpoint():
+    """Writes, dedup skips, disk reads and hot-object LRU counters of the metadata blob store."""
+    return metadata_blob_store.stats()
+
 @router.get("/list_nfts", response_model=List[NftDetailResponse])
-async def list_nfts_endpoint(skip: int = 0, limit: int = 10):
-    """
-    Lists research NFTs, with pagination.
-    """
-    all_nfts = []
-    for nft_data in list(fake_nft_db.values())[skip : skip + limit]:
-        uploader_wallet = "SimulatedUploaderWalletAddress" # Placeholder
-        all_nfts.append(NftDetailResponse(
-            mint_address=nft_data["mint_address"],
-            uploader_wallet_address=uploader_wallet,
-            title=nft_data["title"],
-            abstract_text=nft_data["abstract_text"],
-            authors=nft_data["authors"],
-            publication_date=nft_data["publication_date"],
-            content_storage_hash=nft_data["content_storage_hash"],
-            content_storage_provider=nft_data["content_storage_provider"],
-            metadata_uri=nft_data["metadata_uri"],
-            keywords=nft_data["keywords"],
-            research_type=nft_data["research_type"],
-            created_at=nft_data["created_at"]
-        ))
-    return all_nfts
+async def list_nfts_endpoint(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "-created_at", "publication_date", "-publication_date"] = "created_at",
+    author: Optional[str] = None,
+    keyword: Optional[str] = None,
+    research_type: Optional[str] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """
+    Lists research NFTs, with pagination, filtering and sorting.
+    Pages are served from sorted secondary indexes in time proportional to `limit`, at any depth.
+    Prefer cursor pagination: when more results exist, the `X-Next-Cursor` response header holds
+    an opaque cursor; pass it back as `cursor` (with the same sort and filters) for the next page.
+    `skip` is still accepted for offset pagination, but with more than one filter it steps over
+    every skipped match, so it is capped at 1000 (400 beyond that; use the cursor).
+    With a database, the same keyset query runs in SQL on the matching composite index.
+    The body is the concatenation of the NFTs' pre-encoded JSON, with a strong ETag
+    (a matching If-None-Match gets a 304 without a body).
+    """
+    filters = {name: value for name, value in (("author", author), ("keyword", keyword), ("research_type", research_type))
+               if value is not None}
+    after = None
+    if cursor is not None:
+        try:
+            cursor_sort, cursor_filters, after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+        if cursor_sort != sort or cursor_filters != filters:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match the sort and filters of this query.")
+    elif skip > MAX_FILTERED_SKIP and len(filters) > 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"skip is limited to {MAX_FILTERED_SKIP} with more than one filter; use the cursor.",
+        )
+
+    if db is not None:
+        entries, next_key = await SqlNftRepository(db).list_page(sort=sort, filters=filters, after=after, skip=skip, limit=limit)
+        fragments = [_encoded_nft(entry) for entry in entries]
+    else:
+        mint_addresses, next_key = nft_list_index.page(sort=sort, filters=filters, after=after, skip=skip, limit=limit)
+        fragments = [nft_json_cache.get(mint_address) or _encoded_nft(fake_nft_db[mint_address])
+                     for mint_address in mint_addresses]
+    headers = {}
+    if next_key is not None:
+        headers["X-Next-Cursor"] = encode_cursor(sort, filters, next_key)
+    body = b"[" + b",".join(fragment for fragment, _ in fragments) + b"]"
+    etag = combined_etag((etag for _, etag in fragments), headers.get("X-Next-Cursor", "").encode("ascii"))
+    return json_response(body, etag, if_none_match, headers)
+
+@router.get("/search_nfts", response_model=NftSearchResponse)
+async def search_nfts_endpoint(
+    q: str = Query(..., min_length=1, max_length=500),
+    skip: int = Query(default=0, ge=0, le=10000),
+    limit: int = Query(default=10, ge=1, le=100),
+    author: Optional[str] = None,
+    keyword: Optional[str] = None,
+    research_type: Optional[str] = None,
+    facet_limit: int = Query(default=10, ge=0, le=100),
+    db: Optional[AsyncConnection] = Depends(get_db),
+):
+    """
+    Full-text search over title, abstract, authors and keywords of minted NFTs.
+    `q` accepts terms, "quoted phrases" and prefix* terms; every clause must match.
+    Results are BM25-ranked and paginated with skip/limit; `facets` counts the keyword,
+    author and research_type values of all matches, and the author / keyword /
+    research_type parameters narrow the search to one facet value each.
+    A prefix* term searches at most BASEROOT_SEARCH_MAX_PREFIX_EXPANSIONS indexed terms (in
+    term order); prefixes that matched more are listed in `truncated_prefixes`.
+    With a database, NFTs minted since the last search (by any worker) are indexed first
+    and hit details are read from research_nfts.
+    """
+    filters = {name: value for name, value in (("author", author), ("keyword", keyword), ("research_type", research_type))
+               if value is not None}
+    if db is not None:
+        await sync_search_index(db)
+    # The search runs off the event loop
+    result = await run_in_threadpool(nft_search_index.search, q, filters=filters, skip=skip, limit=limit, facet_limit=facet_limit)
+    if db is not None:
+        entries = await SqlNftRepository(db).get_many_by_mint([mint_address for mint_address, _ in result.hits])
+    else:
+        entries = fake_nft_db
+    return NftSearchResponse(
+        query=q,
+        total=result.total,
+        hits=[NftSearchHit(score=round(score, 4), nft=_to_detail_response(entries[mint_address]))
+              for mint_address, score in result.hits if mint_address in entries],
+        facets={field: [FacetCount(value=value, count=count) for value, count in result.facets[field]]
+                for field in FACET_FIELDS},
+        truncated_prefixes=list(result.truncated_prefixes),
+    )
 
 # TODO:
-# - Integrate with actual PostgreSQL database using SQLAlchemy.
 # - Implement actual Solana smart contract interactions for minting.
-# - Implement IPFS/Arweave integration for metadata and content storage.
-# - Add proper authentication and authorization for minting.
+# - Replace the local blob store with IPFS/Arweave pinning for metadata and content storage.
 # - Add more robust error handling and input validation.
-# - Add filtering and sorting options for list_nfts.
 
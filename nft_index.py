@@ -0,0 +1,137 @@
+"""
+Sorted secondary indexes and keyset (cursor) pagination for NFT listings.
+
+`NftListIndex` keeps, for every filter group, one sorted list of keys per sort
+field. The groups are: all NFTs, each author, each keyword and each
+research_type (values are case-folded). A key is (sort value, id, mint_address);
+the id makes keys unique, so a key is a stable keyset position. A page is one
+bisect to the position after the cursor plus a slice, O(log n + limit) at any
+depth, and nothing is copied.
+
+With more than one filter, the smallest group drives the scan and every other
+filter is a bisect membership check, so the cost grows with how selective the
+driving filter is rather than with the table size. There a positional `skip`
+has to step over every skipped match, so it is capped at MAX_FILTERED_SKIP
+(ValueError beyond it); deeper pages need the cursor.
+
+Cursors are opaque base64url strings that carry the sort, the filters and the
+last key served; `decode_cursor` raises ValueError if a cursor is malformed.
+"""
+
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+SORT_FIELDS = ("created_at", "publication_date")
+SORT_ORDERS = ("created_at", "-created_at", "publication_date", "-publication_date")
+FILTER_FIELDS = ("author", "keyword", "research_type")
+
+_ALL = ("", "") # group holding every NFT
+MAX_FILTERED_SKIP = 1000 # deepest `skip` accepted with more than one filter
+
+
+def encode_cursor(sort: str, filters: Dict[str, str], key: tuple) -> str:
+    raw = json.dumps([sort, filters, list(key)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Dict[str, str], tuple]:
+    try:
+        sort, filters, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort not in SORT_ORDERS or not isinstance(filters, dict) or len(key) != 3:
+            raise ValueError("Invalid cursor")
+        return sort, filters, (key[0], int(key[1]), str(key[2]))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def _contains(keys: List[tuple], key: tuple) -> bool:
+    i = bisect_left(keys, key)
+    return i < len(keys) and keys[i] == key
+
+
+class NftListIndex:
+    def __init__(self):
+        self._groups: Dict[Tuple[str, str], Dict[str, List[tuple]]] = {} # (field, value) -> sort field -> keys
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _group_values(entry: dict) -> List[Tuple[str, str]]:
+        groups = {("author", a.casefold()) for a in entry["authors"]}
+        groups |= {("keyword", k.casefold()) for k in entry.get("keywords") or []}
+        if entry.get("research_type"):
+            groups.add(("research_type", entry["research_type"].casefold()))
+        return [_ALL] + sorted(groups)
+
+    @staticmethod
+    def _key(entry: dict, field: str) -> tuple:
+        return (entry[field], entry["id"], entry["mint_address"])
+
+    def add(self, entry: dict) -> None:
+        self.add_many([entry])
+
+    def add_many(self, entries: List[dict]) -> None:
+        """Indexes a batch under one lock acquisition (e.g. a bulk mint)."""
+        with self._lock:
+            for entry in entries:
+                for group in self._group_values(entry):
+                    lists = self._groups.setdefault(group, {field: [] for field in SORT_FIELDS})
+                    for field, keys in lists.items():
+                        insort(keys, self._key(entry, field)) # appends in O(1) when keys arrive in order
+
+    def remove(self, entry: dict) -> None:
+        with self._lock:
+            for group in self._group_values(entry):
+                lists = self._groups.get(group)
+                if lists is None:
+                    continue
+                for field, keys in lists.items():
+                    key = self._key(entry, field)
+                    i = bisect_left(keys, key)
+                    if i < len(keys) and keys[i] == key:
+                        del keys[i]
+                if group != _ALL and not lists[SORT_FIELDS[0]]:
+                    del self._groups[group]
+
+    def page(self, sort: str = "created_at", filters: Optional[Dict[str, str]] = None,
+             after: Optional[tuple] = None, skip: int = 0, limit: int = 10) -> Tuple[List[str], Optional[tuple]]:
+        """
+        Mint addresses of one page and the key to continue after (None on the last page).
+        `after` (from a cursor) takes precedence over `skip`, which may not exceed
+        MAX_FILTERED_SKIP when more than one filter is given.
+        """
+        if after is None and skip > MAX_FILTERED_SKIP and len(filters or {}) > 1:
+            raise ValueError(f"skip is limited to {MAX_FILTERED_SKIP} with more than one filter; use the cursor")
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        groups = [(f, v.casefold()) for f, v in (filters or {}).items()] or [_ALL]
+        with self._lock:
+            candidates = [self._groups.get(g, {}).get(field, []) for g in groups]
+            keys = min(candidates, key=len)
+            others = [c for c in candidates if c is not keys]
+            if after is not None:
+                start = bisect_left(keys, after) - 1 if descending else bisect_right(keys, after)
+                to_skip = 0
+            else:
+                start = len(keys) - 1 if descending else 0
+                to_skip = skip
+                if not others: # Positional skip is a plain offset when no other filter has to be checked
+                    start = start - skip if descending else start + skip
+                    to_skip = 0
+            step = -1 if descending else 1
+            page: List[tuple] = []
+            i = start
+            while 0 <= i < len(keys) and len(page) <= limit:
+                key = keys[i]
+                i += step
+                if others and not all(_contains(other, key) for other in others):
+                    continue
+                if to_skip:
+                    to_skip -= 1
+                    continue
+                page.append(key)
+        has_more = len(page) > limit
+        page = page[:limit]
+        return [key[2] for key in page], (page[-1] if has_more and page else None)
@@ -0,0 +1,328 @@
+"""
+Full-text search over minted research NFTs.
+
+`NftSearchIndex` is a positional inverted index over title, abstract_text,
+authors and keywords, updated incrementally as NFTs are minted. Rows are
+assigned in mint order, so every posting list is sorted by row; posting lists
+are typed arrays (`array`) that grow in place and are read by numpy without
+copying.
+
+Query syntax: bare terms, "quoted phrases" and prefix* terms, and every clause
+must match. Matches are ranked with BM25 over field-weighted term frequencies
+(a title, author or keyword occurrence counts more than one in the abstract).
+The clause with the fewest postings drives the query: the other clauses and
+the facet filters are binary-searched for its rows only, and the page is a
+partial sort of the matches. Phrases are verified for all candidates at once
+by intersecting (candidate, position - offset) keys of their terms. Query cost
+therefore follows the size of the rarest clause and the number of matches, not
+the number of NFTs indexed. A prefix term expands to at most
+`max_prefix_expansions` indexed terms (in term order); prefixes that had more
+are reported in `SearchResult.truncated_prefixes`.
+
+Facet counts (keyword, author, research_type) cover every match and take one
+bincount per field; facet filters use the facet value's own posting list.
+"""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from baseroot_backend.literature_index import STOPWORDS, tokenize, top_k_indices
+
+FACET_FIELDS = ("keyword", "author", "research_type")
+# (entry field, weight); each value of a field is indexed as its own span
+_FIELD_WEIGHTS = (("title", 3.0), ("authors", 2.0), ("keywords", 2.0), ("abstract_text", 1.0))
+_SPAN_GAP = 1000 # positions between spans, so a phrase never matches across fields or values
+# Default bound on the indexed terms a prefix term expands to (in term order)
+MAX_PREFIX_EXPANSIONS = 64
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class SearchResult(NamedTuple):
+    total: int
+    hits: List[Tuple[str, float]] # (mint_address, score), best first
+    facets: Dict[str, List[Tuple[str, int]]] # field -> (value, count), most frequent first
+    truncated_prefixes: Tuple[str, ...] = () # prefix terms with more expansions than were searched
+
+
+class _Postings:
+    __slots__ = ("rows", "tfs", "position_starts", "positions")
+
+    def __init__(self):
+        self.rows = array("q")
+        self.tfs = array("f") # field-weighted term frequency
+        self.position_starts = array("q", [0]) # positions of posting i: positions[starts[i]:starts[i + 1]]
+        self.positions = array("q")
+
+
+class _Clause:
+    """One query clause: a term, a phrase ((term, offset) pairs) or a prefix expansion (any of its terms)."""
+
+    def __init__(self, kind: str, terms: List[str], offsets: Optional[List[int]] = None):
+        self.kind = kind
+        self.terms = terms
+        self.offsets = offsets
+
+
+def parse_query(query: str) -> List[_Clause]:
+    clauses = []
+    for phrase, word in _QUERY_RE.findall(query):
+        if word and word.endswith("*") and len(tokenize(word)) == 1:
+            clauses.append(_Clause("prefix", tokenize(word)))
+            continue
+        tokens = tokenize(phrase or word)
+        kept = [(t, i) for i, t in enumerate(tokens) if t not in STOPWORDS]
+        if len(kept) == 1:
+            clauses.append(_Clause("term", [kept[0][0]]))
+        elif kept:
+            clauses.append(_Clause("phrase", [t for t, _ in kept], [i - kept[0][1] for _, i in kept]))
+    return clauses
+
+
+def _members(rows: np.ndarray, candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(mask, index): which sorted `candidates` occur in sorted `rows`, and where."""
+    index = np.searchsorted(rows, candidates)
+    clipped = np.minimum(index, max(rows.shape[0] - 1, 0))
+    mask = (index < rows.shape[0]) & (rows[clipped] == candidates) if rows.shape[0] else np.zeros(candidates.shape, bool)
+    return mask, clipped
+
+
+def _flatten_ranges(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(owner, index): every index of the ranges [starts[i], ends[i]) and the i it belongs to, without a Python loop."""
+    counts = ends - starts
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(starts.shape[0]), counts)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    return owner, np.arange(total) + offsets
+
+
+class NftSearchIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_prefix_expansions: int = MAX_PREFIX_EXPANSIONS):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_expansions = max_prefix_expansions
+        self._mints: List[str] = [] # row -> mint address
+        self._rows_by_mint: Dict[str, int] = {}
+        self._postings: Dict[str, _Postings] = {}
+        self._terms: List[str] = [] # sorted vocabulary, for prefix expansion
+        self._doc_lengths = array("f")
+        self._total_length = 0.0
+        self._facet_ids: Dict[str, Dict[str, int]] = {f: {} for f in FACET_FIELDS} # case-folded value -> id
+        self._facet_names: Dict[str, List[str]] = {f: [] for f in FACET_FIELDS} # id -> first spelling seen
+        self._facet_rows: Dict[str, List[array]] = {f: [] for f in FACET_FIELDS} # id -> rows
+        self._row_facet_starts = {f: array("q", [0]) for f in FACET_FIELDS} # CSR of per-row facet ids
+        self._row_facet_ids = {f: array("q") for f in FACET_FIELDS}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._mints)
+
+    def __contains__(self, mint_address: str) -> bool:
+        return mint_address in self._rows_by_mint
+
+    @staticmethod
+    def _facet_values(entry: dict) -> Dict[str, List[str]]:
+        return {
+            "keyword": entry.get("keywords") or [],
+            "author": entry["authors"],
+            "research_type": [entry["research_type"]] if entry.get("research_type") else [],
+        }
+
+    def add(self, entry: dict) -> None:
+        self.add_many([entry])
+
+    def add_many(self, entries: List[dict]) -> None:
+        """Indexes the entries; NFTs that are already indexed are skipped."""
+        with self._lock:
+            for entry in entries:
+                if entry["mint_address"] not in self._rows_by_mint:
+                    self._add(entry)
+
+    def _add(self, entry: dict) -> None:
+        row = len(self._mints)
+        self._mints.append(entry["mint_address"])
+        self._rows_by_mint[entry["mint_address"]] = row
+        positions: Dict[str, List[int]] = {}
+        weighted_tf: Dict[str, float] = {}
+        length = 0.0
+        base = 0
+        for field, weight in _FIELD_WEIGHTS:
+            value = entry.get(field)
+            for text in value if isinstance(value, list) else [value] if value else []:
+                tokens = tokenize(text)
+                for i, term in enumerate(tokens):
+                    if term in STOPWORDS:
+                        continue
+                    positions.setdefault(term, []).append(base + i)
+                    weighted_tf[term] = weighted_tf.get(term, 0.0) + weight
+                    length += weight
+                base += len(tokens) + _SPAN_GAP
+        for term, term_positions in positions.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+                insort(self._terms, term)
+            postings.rows.append(row)
+            postings.tfs.append(weighted_tf[term])
+            postings.positions.extend(term_positions)
+            postings.position_starts.append(len(postings.positions))
+        self._doc_lengths.append(length)
+        self._total_length += length
+
+        for field, values in self._facet_values(entry).items():
+            ids = self._facet_ids[field]
+            row_ids = set()
+            for value in values:
+                key = value.casefold()
+                facet_id = ids.get(key)
+                if facet_id is None:
+                    facet_id = ids[key] = len(self._facet_names[field])
+                    self._facet_names[field].append(value)
+                    self._facet_rows[field].append(array("q"))
+                if facet_id not in row_ids:
+                    row_ids.add(facet_id)
+                    self._facet_rows[field][facet_id].append(row)
+                    self._row_facet_ids[field].append(facet_id)
+            self._row_facet_starts[field].append(len(self._row_facet_ids[field]))
+
+    def _rows(self, term: str) -> np.ndarray:
+        return np.frombuffer(self._postings[term].rows, dtype=np.int64)
+
+    def _expand_prefix(self, prefix: str) -> Tuple[List[str], bool]:
+        """Indexed terms starting with `prefix` (at most max_prefix_expansions) and whether there were more."""
+        start = bisect_left(self._terms, prefix)
+        expansions = []
+        for term in self._terms[start : start + self.max_prefix_expansions + 1]:
+            if not term.startswith(prefix):
+                break
+            expansions.append(term)
+        return expansions[:self.max_prefix_expansions], len(expansions) > self.max_prefix_expansions
+
+    def _phrase_matches(self, clause: _Clause, candidates: np.ndarray) -> np.ndarray:
+        """
+        Mask of candidate rows (all containing every phrase term) where the terms occur in sequence:
+        each term's positions, shifted back by its offset in the phrase, become (candidate, start)
+        keys, and a candidate matches if a key is common to every term.
+        """
+        per_term = []
+        for term, offset in zip(clause.terms, clause.offsets):
+            postings = self._postings[term]
+            _, index = _members(self._rows(term), candidates)
+            position_starts = np.frombuffer(postings.position_starts, dtype=np.int64)
+            owner, flat = _flatten_ranges(position_starts[index], position_starts[index + 1])
+            phrase_starts = np.frombuffer(postings.positions, dtype=np.int64)[flat] - offset
+            keep = phrase_starts >= 0 # a phrase cannot start before the first position
+            per_term.append((owner[keep], phrase_starts[keep]))
+        stride = 1 + max((int(starts.max()) for _, starts in per_term if starts.shape[0]), default=0)
+        common = None
+        for owner, starts in per_term:
+            keys = owner * stride + starts # sorted: candidates ascending, positions ascending within a row
+            common = keys if common is None else common[_members(keys, common)[0]]
+        matches = np.zeros(candidates.shape[0], dtype=bool)
+        matches[common // stride] = True
+        return matches
+
+    def _bm25(self, term: str, rows: np.ndarray, avg_length: float) -> np.ndarray:
+        """BM25 contribution of `term` for each of the sorted `rows` (0 where it does not occur)."""
+        postings = self._postings[term]
+        term_rows = self._rows(term)
+        df = term_rows.shape[0]
+        # Binary-search whichever side is smaller: the term's postings or the rows being scored
+        if df < rows.shape[0]:
+            found, where = _members(rows, term_rows)
+            where = where[found]
+            tf = np.frombuffer(postings.tfs, dtype=np.float32)[found]
+        else:
+            found, index = _members(term_rows, rows)
+            where = np.flatnonzero(found)
+            tf = np.frombuffer(postings.tfs, dtype=np.float32)[index[found]]
+        idf = float(np.log(1.0 + (len(self._mints) - df + 0.5) / (df + 0.5)))
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.float32)[rows[where]]
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+        scores = np.zeros(rows.shape[0], dtype=np.float64)
+        scores[where] = idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
+
+    def search(self, query: str, filters: Optional[Dict[str, str]] = None, skip: int = 0, limit: int = 10,
+               facet_limit: int = 10) -> SearchResult:
+        """
+        Ranked page (skip/limit) of NFTs matching every clause of `query` and every facet
+        filter (field -> value, case-insensitive), plus facet counts over all matches.
+        """
+        clauses = parse_query(query)
+        with self._lock:
+            # Numpy views of the posting arrays must be gone before `add` can grow them again
+            return self._search(clauses, filters, skip, limit, facet_limit)
+
+    def _search(self, clauses: List[_Clause], filters: Optional[Dict[str, str]], skip: int, limit: int,
+                facet_limit: int) -> SearchResult:
+        # Every clause becomes (estimated size, candidate rows factory, membership test)
+        tests: List[Tuple[int, Callable[[], np.ndarray], Callable[[np.ndarray], np.ndarray]]] = []
+        truncated: List[str] = []
+        empty = lambda: SearchResult(0, [], {f: [] for f in FACET_FIELDS}, tuple(truncated))
+        for clause in clauses:
+            if clause.kind == "prefix":
+                prefix = clause.terms[0]
+                clause.terms, more = self._expand_prefix(prefix)
+                if more:
+                    truncated.append(prefix)
+            if not clause.terms or any(t not in self._postings for t in clause.terms):
+                return empty()
+            term_rows = [self._rows(t) for t in clause.terms]
+            if clause.kind == "prefix":
+                size = sum(r.shape[0] for r in term_rows)
+                rows_of = (lambda rs=term_rows: np.unique(np.concatenate(rs)))
+                test = (lambda c, rs=term_rows: np.logical_or.reduce([_members(r, c)[0] for r in rs]))
+            else:
+                rarest = min(term_rows, key=lambda r: r.shape[0])
+                size = rarest.shape[0]
+                test = (lambda c, rs=term_rows: np.logical_and.reduce([_members(r, c)[0] for r in rs]))
+                # When this clause drives the query its other terms must still be checked
+                rows_of = (lambda r=rarest, t=test: r[t(r)])
+            tests.append((size, rows_of, test))
+        for field, value in (filters or {}).items():
+            facet_id = self._facet_ids[field].get(value.casefold())
+            if facet_id is None:
+                return empty()
+            facet_rows = np.frombuffer(self._facet_rows[field][facet_id], dtype=np.int64)
+            tests.append((facet_rows.shape[0], (lambda r=facet_rows: r), (lambda c, r=facet_rows: _members(r, c)[0])))
+        if not clauses:
+            return empty()
+
+        tests.sort(key=lambda t: t[0])
+        candidates = tests[0][1]()
+        for _, _, test in tests[1:]:
+            if candidates.shape[0] == 0:
+                break
+            candidates = candidates[test(candidates)]
+        for clause in clauses:
+            if clause.kind == "phrase" and candidates.shape[0]:
+                candidates = candidates[self._phrase_matches(clause, candidates)]
+        candidates = np.array(candidates) # own the rows (not a view of a posting list)
+
+        avg_length = self._total_length / len(self._mints) or 1.0
+        scores = np.zeros(candidates.shape[0], dtype=np.float64)
+        for clause in clauses:
+            for term in clause.terms:
+                scores += self._bm25(term, candidates, avg_length)
+        order = top_k_indices(scores, skip + limit)[skip:]
+        hits = [(self._mints[row], float(score)) for row, score in zip(candidates[order].tolist(), scores[order].tolist())]
+        facets = {field: self._facet_counts(field, candidates, facet_limit) for field in FACET_FIELDS}
+        return SearchResult(int(candidates.shape[0]), hits, facets, tuple(truncated))
+
+    def _facet_counts(self, field: str, rows: np.ndarray, facet_limit: int) -> List[Tuple[str, int]]:
+        names = self._facet_names[field]
+        if rows.shape[0] == 0 or not names:
+            return []
+        starts_all = np.frombuffer(self._row_facet_starts[field], dtype=np.int64)
+        _, flat = _flatten_ranges(starts_all[rows], starts_all[rows + 1]) # every matched row's facet ids
+        if flat.shape[0] == 0:
+            return []
+        ids = np.frombuffer(self._row_facet_ids[field], dtype=np.int64)[flat]
+        counts = np.bincount(ids, minlength=len(names))
+        top = top_k_indices(counts.astype(np.float64), facet_limit)
+        return [(names[i], int(counts[i])) for i in top.tolist() if counts[i] > 0]
@@ -0,0 +1,108 @@
+"""
+Status-partitioned sorted indexes and keyset (cursor) pagination for DAO proposal listings.
+
+`ProposalIndex` keeps one group of proposals per status (plus a group holding
+every proposal) and, per group, one sorted list of keys per sort field. A key
+is (sort value, db_proposal_id, on_chain_proposal_id); the id makes keys
+unique, so a key is a stable keyset position. A status transition moves the
+proposal's keys from the old status group to the new one (a bisect and a list
+delete/insert per sort field). A page is one bisect plus a slice, so listing
+the proposals in Voting costs O(log n + limit) however many proposals were
+ever submitted.
+
+Cursors are opaque base64url strings that carry the sort, the status filter
+and the last key served; `decode_cursor` raises ValueError if a cursor is
+malformed.
+"""
+
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+# sort name -> (entry field, descending)
+SORTS = {
+    "oldest": ("db_proposal_id", False),
+    "newest": ("db_proposal_id", True),
+    "closing_soonest": ("end_slot_on_chain", False),
+    "largest_amount": ("requested_amount", True),
+}
+SORT_FIELDS = ("db_proposal_id", "end_slot_on_chain", "requested_amount")
+
+_ALL = "" # group holding every proposal
+
+
+def encode_cursor(sort: str, status_filter: Optional[str], key: tuple) -> str:
+    raw = json.dumps([sort, status_filter, list(key)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Optional[str], tuple]:
+    try:
+        sort, status_filter, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort not in SORTS or not (status_filter is None or isinstance(status_filter, str)) or len(key) != 3:
+            raise ValueError("Invalid cursor")
+        return sort, status_filter, (int(key[0]), int(key[1]), int(key[2]))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+class ProposalIndex:
+    def __init__(self):
+        self._groups: Dict[str, Dict[str, List[tuple]]] = {} # status (case-folded) -> sort field -> keys
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(entry: dict, field: str) -> tuple:
+        return (entry[field] or 0, entry["db_proposal_id"], entry["on_chain_proposal_id"])
+
+    def _insert(self, group: str, entry: dict) -> None:
+        lists = self._groups.setdefault(group, {field: [] for field in SORT_FIELDS})
+        for field, keys in lists.items():
+            insort(keys, self._key(entry, field)) # appends in O(1) when keys arrive in order
+
+    def _delete(self, group: str, entry: dict) -> None:
+        lists = self._groups.get(group)
+        if lists is None:
+            return
+        for field, keys in lists.items():
+            key = self._key(entry, field)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self._insert(_ALL, entry)
+            self._insert(entry["status_on_chain"].casefold(), entry)
+
+    def move(self, entry: dict, old_status: str) -> None:
+        """Re-files a proposal whose status changed from `old_status` to entry["status_on_chain"]."""
+        with self._lock:
+            self._delete(old_status.casefold(), entry)
+            self._insert(entry["status_on_chain"].casefold(), entry)
+
+    def count(self, status_filter: Optional[str] = None) -> int:
+        lists = self._groups.get(status_filter.casefold() if status_filter else _ALL)
+        return len(lists[SORT_FIELDS[0]]) if lists else 0
+
+    def page(self, sort: str = "oldest", status_filter: Optional[str] = None,
+             after: Optional[tuple] = None, skip: int = 0, limit: int = 10) -> Tuple[List[int], Optional[tuple]]:
+        """
+        On-chain ids of one page and the key to continue after (None on the last page).
+        `after` (from a cursor) takes precedence over `skip`.
+        """
+        field, descending = SORTS[sort]
+        with self._lock:
+            keys = self._groups.get(status_filter.casefold() if status_filter else _ALL, {}).get(field, [])
+            if descending:
+                end = bisect_left(keys, after) if after is not None else len(keys) - skip
+                start = max(end - limit - 1, 0)
+                page = keys[start:max(end, 0)][::-1]
+            else:
+                start = bisect_right(keys, after) if after is not None else skip
+                page = keys[start:start + limit + 1]
+        has_more = len(page) > limit
+        page = page[:limit]
+        return [key[2] for key in page], (page[-1] if has_more and page else None)
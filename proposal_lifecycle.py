@@ -0,0 +1,130 @@
+"""
+Slot-driven lifecycle for DAO proposals: closes voting once a proposal's end slot has passed.
+
+`ProposalScheduler` keeps the open proposals in a min-heap ordered by
+end_slot_on_chain. `pop_due()` reads the slot clock and pops only the proposals
+whose voting period has ended (current slot > end slot, the same check as the
+contract's `tally_votes_and_update_status`), so a sweep costs
+O(expiring * log open) and peeking when nothing is due is O(1), however many
+proposals are open. The caller tallies what was popped with `tally_outcome`
+and hands the results back to `publish`, which keeps them for the read
+endpoints.
+
+The slot clock is pluggable: `LocalSlotClock` derives the slot from elapsed
+wall time (a stand-in for the cluster's slot until the RPC client exists) and
+`SimulatedSlotClock` only moves when told to, for tests.
+"""
+
+import heapq
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+SLOT_SECONDS = 0.4 # Solana's target slot time
+GENESIS_SLOT = 1000000 # Slot the local clock reports at startup (the old simulated submit slots started here)
+VOTING_PERIOD_SLOTS = int(os.getenv("BASEROOT_DAO_VOTING_PERIOD_SLOTS", "172800")) # ~19 hours at 0.4s/slot
+MIN_QUORUM_VOTES = int(os.getenv("BASEROOT_DAO_MIN_QUORUM_VOTES", "100"))
+MIN_THRESHOLD_PERCENTAGE = int(os.getenv("BASEROOT_DAO_MIN_THRESHOLD_PERCENTAGE", "51"))
+
+
+class SlotClock(ABC):
+    @abstractmethod
+    def current_slot(self) -> int:
+        """The slot the cluster is at now."""
+
+
+class LocalSlotClock(SlotClock):
+    def __init__(self, genesis_slot: int = GENESIS_SLOT, slot_seconds: float = SLOT_SECONDS):
+        self.genesis_slot = genesis_slot
+        self.slot_seconds = slot_seconds
+        self._started = time.monotonic()
+
+    def current_slot(self) -> int:
+        return self.genesis_slot + int((time.monotonic() - self._started) / self.slot_seconds)
+
+
+class SimulatedSlotClock(SlotClock):
+    def __init__(self, slot: int = GENESIS_SLOT):
+        self.slot = slot
+
+    def current_slot(self) -> int:
+        return self.slot
+
+    def advance(self, slots: int = 1) -> int:
+        self.slot += slots
+        return self.slot
+
+
+class TallyResult(NamedTuple):
+    proposal_id: int
+    status: str
+    yes_votes: int
+    no_votes: int
+    end_slot: int
+    closed_at_slot: int
+
+
+def tally_outcome(yes_votes: int, no_votes: int, min_quorum_votes: int = MIN_QUORUM_VOTES,
+                  min_threshold_percentage: int = MIN_THRESHOLD_PERCENTAGE) -> str:
+    """
+    "Approved" or "Rejected", by the contract's rule: the proposal needs at least
+    min_quorum_votes in total and a yes share (integer percent) of at least
+    min_threshold_percentage. Missing the quorum rejects it.
+    """
+    total_votes = yes_votes + no_votes
+    if total_votes < min_quorum_votes:
+        return "Rejected"
+    yes_percentage = yes_votes * 100 // total_votes if total_votes else 0
+    return "Approved" if yes_percentage >= min_threshold_percentage else "Rejected"
+
+
+class ProposalScheduler:
+    def __init__(self, clock: Optional[SlotClock] = None):
+        self.clock = clock or LocalSlotClock()
+        self._heap: List[Tuple[int, int]] = [] # (end_slot, proposal_id)
+        self._scheduled = set()
+        self._results: Dict[int, TallyResult] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, proposal_id: int, end_slot: int) -> None:
+        with self._lock:
+            if proposal_id not in self._scheduled:
+                self._scheduled.add(proposal_id)
+                heapq.heappush(self._heap, (end_slot, proposal_id))
+
+    def schedule_many(self, deadlines: Iterable[Tuple[int, int]]) -> None:
+        """Schedules (proposal_id, end_slot) pairs with one heapify."""
+        with self._lock:
+            for proposal_id, end_slot in deadlines:
+                if proposal_id not in self._scheduled:
+                    self._scheduled.add(proposal_id)
+                    self._heap.append((end_slot, proposal_id))
+            heapq.heapify(self._heap)
+
+    def next_deadline(self) -> Optional[int]:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, current_slot: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Removes and returns the (proposal_id, end_slot) pairs whose voting ended before `current_slot`."""
+        if current_slot is None:
+            current_slot = self.clock.current_slot()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < current_slot:
+                end_slot, proposal_id = heapq.heappop(self._heap)
+                self._scheduled.discard(proposal_id)
+                due.append((proposal_id, end_slot))
+        return due
+
+    def publish(self, results: Iterable[TallyResult]) -> None:
+        with self._lock:
+            for result in results:
+                self._results[result.proposal_id] = result
+
+    def result(self, proposal_id: int) -> Optional[TallyResult]:
+        return self._results.get(proposal_id)
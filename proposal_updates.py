@@ -0,0 +1,141 @@
+"""
+Live proposal tally and status updates for server-sent event (SSE) subscribers.
+
+Writers (the vote queue's writer, the lifecycle scheduler, the chain indexer)
+call `publish` with a proposal's new tally or status. Updates are coalesced:
+within one window (`window_seconds`) only the latest state of each proposal
+is kept, however many votes arrived. At the end of the window `flush` encodes
+each changed proposal's update to JSON once, appends the result to a bounded
+history as one numbered frame, and wakes every subscriber by resolving one
+shared future, so a flush costs the same for one watcher or thousands.
+
+Each subscriber's `stream` reads the frames after the last one it sent (the
+SSE `id`, which browsers send back as Last-Event-ID when they reconnect),
+merges them, keeps the proposals it watches and yields at most one message
+per window. A subscriber that fell further behind than the history gets a
+`resync` event telling it to reload the proposals.
+
+Updates carry absolute values (tallies, status), not increments, so merging
+or skipping intermediate frames never loses information. The broadcaster is
+per worker process; with several workers each one streams the changes it
+applied itself.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Optional, Tuple
+
+
+def sse_event(event: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode("ascii") + b"data: " + data + b"\n\n"
+
+
+class ProposalUpdateBroadcaster:
+    def __init__(self, window_seconds: float = 0.25, history: int = 256, heartbeat_seconds: float = 15.0):
+        self.window_seconds = window_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.seq = 0 # id of the newest frame
+        self._dirty: Dict[int, Dict[str, Any]] = {}
+        # (seq, proposal_id -> encoded update, encoded list of all of them)
+        self._frames: Deque[Tuple[int, Dict[int, bytes], bytes]] = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._wakeup: Optional[asyncio.Future] = None
+        self.subscribers = 0
+        # Counters
+        self.published = 0
+        self.coalesced = 0 # updates merged into a pending update of the same proposal
+        self.frames = 0
+
+    def publish(self, proposal_id: int, **update: Any) -> None:
+        """Records the proposal's new state; sent to subscribers at the end of the current window."""
+        self.published += 1
+        pending = self._dirty.get(proposal_id)
+        if pending is None:
+            self._dirty[proposal_id] = {"proposal_id": proposal_id, **update}
+        else:
+            self.coalesced += 1
+            pending.update(update)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return # no loop here; sent with the next window scheduled on one
+        if self._timer is None or self._loop is not loop:
+            self._loop = loop
+            self._timer = loop.call_later(self.window_seconds, self.flush)
+
+    def flush(self) -> None:
+        self._timer = None
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        fragments = {proposal_id: json.dumps(update, separators=(",", ":")).encode("utf-8")
+                     for proposal_id, update in dirty.items()}
+        self.seq += 1
+        self.frames += 1
+        self._frames.append((self.seq, fragments, b"[" + b",".join(fragments.values()) + b"]"))
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+        self._wakeup = None
+
+    def _waiter(self) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None or self._wakeup.get_loop() is not loop:
+            self._wakeup = loop.create_future()
+        return self._wakeup
+
+    def _pending_frames(self, after: int):
+        frames = []
+        for frame in reversed(self._frames):
+            if frame[0] <= after:
+                break
+            frames.append(frame)
+        frames.reverse()
+        return frames
+
+    async def stream(self, proposal_ids: Optional[Iterable[int]] = None,
+                     last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """SSE messages with the updates after `last_event_id` (default: from now on), until cancelled."""
+        watched = set(proposal_ids) if proposal_ids else None
+        after = self.seq if last_event_id is None or last_event_id > self.seq else last_event_id
+        self.subscribers += 1
+        try:
+            while True:
+                if self._frames and after < self._frames[0][0] - 1:
+                    # Missed frames that are no longer kept
+                    after = self.seq
+                    yield sse_event("resync", b"{}", after)
+                    continue
+                frames = self._pending_frames(after)
+                if frames:
+                    after = frames[-1][0]
+                    if watched is None and len(frames) == 1:
+                        data = frames[0][2] # shared by every unfiltered subscriber
+                    else:
+                        merged: Dict[int, bytes] = {}
+                        for _, fragments, _ in frames:
+                            merged.update(fragments if watched is None else
+                                          {pid: fragment for pid, fragment in fragments.items() if pid in watched})
+                        if not merged:
+                            continue
+                        data = b"[" + b",".join(merged.values()) + b"]"
+                    yield sse_event("proposal_updates", data, after)
+                    continue
+                try:
+                    await asyncio.wait_for(asyncio.shield(self._waiter()), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "window_seconds": self.window_seconds,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "frames": self.frames,
+            "last_event_id": self.seq,
+        }
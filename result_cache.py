@@ -0,0 +1,103 @@
+"""
+Bounded LRU + TTL cache for query results.
+
+Entries are tagged with the data version they were computed against; when the
+caller reports a newer version, every cached entry is dropped at once, so
+results never outlive the corpus (or table) they were derived from. Versions
+only move forward: a lookup or store carrying an older version (e.g. a slow
+query scored before the corpus changed) is a miss or dropped, and never
+evicts the newer entries.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict() # key -> (expires_at, value)
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0 # dropped to respect max_entries (LRU)
+        self.expirations = 0 # dropped because the TTL elapsed
+        self.invalidations = 0 # dropped because the data version changed
+        self.stale_puts = 0 # not stored because they carried an older version
+
+    def _sync_version(self, version: Hashable) -> bool:
+        """Moves to `version` if it is newer; False if it is older than the current one."""
+        if version == self._version:
+            return True
+        if version is not None and self._version is not None and version < self._version:
+            return False
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._version = version
+        return True
+
+    def get(self, key: Hashable, version: Hashable = None) -> Optional[Any]:
+        """Returns the cached value, or None on a miss (absent, expired or stale version)."""
+        with self._lock:
+            entry = self._entries.get(key) if self._sync_version(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, version: Hashable = None) -> None:
+        with self._lock:
+            if not self._sync_version(version):
+                self.stale_puts += 1
+                return
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drops one entry (e.g. after the underlying record changed); returns whether it was cached."""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
@@ -0,0 +1,158 @@
+"""
+Worker pool for CPU-bound scoring, so request handlers never block the event loop.
+
+`ScoringPool` wraps a thread or process executor and adds:
+- bounded admission: at most `max_pending` items may be queued or running;
+  further submissions fail fast with `PoolSaturatedError` (maps to HTTP 503);
+- per-request timeouts (`asyncio.TimeoutError`, maps to HTTP 504); a timed-out
+  item keeps its slot until the executor finishes it, since the job cannot be
+  interrupted;
+- micro-batching: items submitted within `batch_window_ms` of each other (up to
+  `max_batch_size`) are handed to `batch_fn` together, so under load many
+  queries share one scoring pass.
+
+`batch_fn(items) -> results` receives a list of items and must return one
+result per item, in order. For a process pool it has to be a picklable
+module-level function, and each worker process sees module state as of its
+own import (e.g. a memory-mapped corpus store), not later in-memory changes.
+NumPy releases the GIL inside matrix products, so threads are usually enough.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool already holds `max_pending` items."""
+
+
+class _PendingBatch:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.items: List[Any] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ScoringPool:
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], kind: str = "thread", max_workers: int = 2,
+                 max_pending: int = 256, timeout_seconds: float = 10.0, batch_window_ms: float = 2.0,
+                 max_batch_size: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError("kind must be 'thread' or 'process'")
+        self.batch_fn = batch_fn
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._executor_lock = threading.Lock()
+        self._batch: Optional[_PendingBatch] = None
+        self.pending = 0
+        # Counters
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.batches = 0
+        self.batched_items = 0
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        """Created lazily so importing the API module does not spawn workers."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._executor = concurrent.futures.ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix="scoring")
+        return self._executor
+
+    def _admit(self, count: int) -> None:
+        if self.pending + count > self.max_pending:
+            self.rejected += count
+            raise PoolSaturatedError(f"Scoring queue is full ({self.max_pending} pending).")
+        self.pending += count
+        self.submitted += count
+
+    async def _await_with_timeout(self, future: asyncio.Future, count: int):
+        # shield: timing out must neither cancel the job nor release its slot (see _release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timed_out += count
+            raise
+
+    def _release(self, job: asyncio.Future, count: int) -> None:
+        """Done-callback of an executor job: frees its admission slots once it stopped running."""
+        self.pending -= count
+        if not job.cancelled():
+            job.exception() # retrieved, so a timed-out caller's failure is not logged as unhandled
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Runs one job (no micro-batching) with the same admission and timeout rules."""
+        self._admit(1)
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.executor, fn, *args)
+        job.add_done_callback(lambda done: self._release(done, 1))
+        return await self._await_with_timeout(job, 1)
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item for micro-batched scoring and waits for its result."""
+        self._admit(1)
+        loop = asyncio.get_running_loop()
+        batch = self._batch
+        if batch is None or batch.loop is not loop:
+            batch = self._batch = _PendingBatch(loop)
+            batch.timer = loop.call_later(self.batch_window, self._flush, batch)
+        future = loop.create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._flush(batch)
+        return await self._await_with_timeout(future, 1)
+
+    def _flush(self, batch: _PendingBatch) -> None:
+        if self._batch is batch:
+            self._batch = None
+        self.batches += 1
+        self.batched_items += len(batch.items)
+        job = batch.loop.run_in_executor(self.executor, self.batch_fn, batch.items)
+
+        def _resolve(done: asyncio.Future) -> None:
+            self._release(done, len(batch.items))
+            error = done.exception()
+            results = None if error else done.result()
+            for i, future in enumerate(batch.futures):
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
+
+        job.add_done_callback(_resolve)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
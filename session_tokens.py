@@ -0,0 +1,211 @@
+"""
+Wallet sign-in and stateless session tokens.
+
+Login flow:
+1. `ChallengeStore.issue(wallet)` hands out a one-time nonce and the exact
+   message the wallet has to sign (`challenge_message`).
+2. The client signs the message with its wallet key; `SignatureVerifier.verify`
+   checks the ed25519 signature against the wallet address (the base58-encoded
+   public key). Results are cached per (wallet, nonce, signature), so retries
+   never pay for a second signature check.
+3. `SessionTokenSigner.issue` returns a compact token,
+   "<base64url payload>.<base64url HMAC-SHA256>", with the wallet, user id and
+   expiry. Verifying one is a single HMAC and needs no store lookup, so
+   authenticated requests pay microseconds instead of an ed25519 verification.
+
+ed25519 verification uses PyNaCl (`pip install pynacl`) when available and
+falls back to the `cryptography` package; with neither installed, login fails
+with `SignatureUnavailableError`. The signing secret comes from
+BASEROOT_SESSION_SECRET; without it a random per-process secret is used, so
+tokens do not survive restarts and are not shared between workers.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from baseroot_backend.result_cache import ResultCache
+from baseroot_backend.wallet_addresses import b58decode
+
+try:
+    from nacl.exceptions import BadSignatureError as _NaclBadSignature
+    from nacl.signing import VerifyKey as _NaclVerifyKey
+except ImportError: # pragma: no cover - depends on installed packages
+    _NaclVerifyKey = None
+
+try:
+    from cryptography.exceptions import InvalidSignature as _CryptographyInvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey as _CryptographyPublicKey
+except ImportError: # pragma: no cover - depends on installed packages
+    _CryptographyPublicKey = None
+
+
+class InvalidTokenError(Exception):
+    """Raised for malformed, tampered or expired session tokens."""
+
+
+class SignatureUnavailableError(RuntimeError):
+    """Raised when no ed25519 implementation is installed."""
+
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def challenge_message(wallet_address: str, nonce: str, expires_at: int) -> str:
+    """The exact text a wallet signs to log in."""
+    return (f"Sign in to Baseroot\n"
+            f"Wallet: {wallet_address}\n"
+            f"Nonce: {nonce}\n"
+            f"Expires: {expires_at}")
+
+
+def _ed25519_verify(public_key: bytes, message: bytes, signature: bytes) -> bool:
+    if _NaclVerifyKey is not None:
+        try:
+            _NaclVerifyKey(public_key).verify(message, signature)
+            return True
+        except (_NaclBadSignature, ValueError):
+            return False
+    if _CryptographyPublicKey is not None:
+        try:
+            _CryptographyPublicKey.from_public_bytes(public_key).verify(signature, message)
+            return True
+        except (_CryptographyInvalidSignature, ValueError):
+            return False
+    raise SignatureUnavailableError("Install pynacl or cryptography to verify wallet signatures")
+
+
+class SignatureVerifier:
+    """ed25519 wallet-signature checks with an LRU of results keyed by (wallet, nonce, signature)."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 600.0,
+                 verify_fn: Callable[[bytes, bytes, bytes], bool] = _ed25519_verify):
+        self.cache = ResultCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.verify_fn = verify_fn
+
+    def verify(self, wallet_address: str, nonce: str, message: str, signature_b58: str) -> bool:
+        key = (wallet_address, nonce, signature_b58)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            public_key = b58decode(wallet_address)
+            signature = b58decode(signature_b58)
+        except ValueError:
+            valid = False
+        else:
+            valid = (len(public_key) == 32 and len(signature) == 64
+                     and self.verify_fn(public_key, message.encode("utf-8"), signature))
+        self.cache.put(key, valid)
+        return valid
+
+
+class Challenge(NamedTuple):
+    wallet_address: str
+    nonce: str
+    expires_at: int
+    message: str
+
+
+class ChallengeStore:
+    """Outstanding login nonces; each can be consumed once, before it expires."""
+
+    def __init__(self, ttl_seconds: int = 300, max_outstanding: int = 100_000,
+                 clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        self.max_outstanding = max_outstanding
+        self._clock = clock
+        self._challenges: Dict[str, Challenge] = {} # nonce -> challenge
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._challenges)
+
+    def _purge_expired(self, now: float) -> None:
+        for nonce in [n for n, c in self._challenges.items() if c.expires_at <= now]:
+            del self._challenges[nonce]
+
+    def issue(self, wallet_address: str) -> Challenge:
+        nonce = secrets.token_urlsafe(16)
+        expires_at = int(self._clock()) + self.ttl_seconds
+        challenge = Challenge(wallet_address, nonce, expires_at, challenge_message(wallet_address, nonce, expires_at))
+        with self._lock:
+            if len(self._challenges) >= self.max_outstanding:
+                self._purge_expired(self._clock())
+            if len(self._challenges) >= self.max_outstanding:
+                self._challenges.pop(next(iter(self._challenges))) # drop the oldest
+            self._challenges[nonce] = challenge
+        return challenge
+
+    def get(self, wallet_address: str, nonce: str) -> Optional[Challenge]:
+        """The live challenge for this wallet and nonce, or None."""
+        challenge = self._challenges.get(nonce)
+        if challenge is None or challenge.wallet_address != wallet_address or challenge.expires_at <= self._clock():
+            return None
+        return challenge
+
+    def consume(self, nonce: str) -> bool:
+        """Marks the nonce used; False if it was already consumed (replay)."""
+        with self._lock:
+            return self._challenges.pop(nonce, None) is not None
+
+
+class SessionClaims(NamedTuple):
+    wallet_address: str
+    user_id: int
+    expires_at: int
+
+
+class SessionTokenSigner:
+    def __init__(self, secret: bytes, ttl_seconds: int = 3600, clock: Callable[[], float] = time.time):
+        if len(secret) < 16:
+            raise ValueError("Session secret must be at least 16 bytes")
+        self._secret = secret
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._secret, payload, hashlib.sha256).digest()
+
+    def issue(self, wallet_address: str, user_id: int) -> Tuple[str, int]:
+        """Returns (token, expires_at)."""
+        expires_at = int(self._clock()) + self.ttl_seconds
+        payload = json.dumps({"w": wallet_address, "u": user_id, "exp": expires_at}, separators=(",", ":")).encode()
+        return f"{_b64url_encode(payload)}.{_b64url_encode(self._sign(payload))}", expires_at
+
+    def verify(self, token: str) -> SessionClaims:
+        try:
+            payload_part, signature_part = token.split(".")
+            payload = _b64url_decode(payload_part)
+            signature = _b64url_decode(signature_part)
+        except ValueError:
+            raise InvalidTokenError("Malformed session token")
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise InvalidTokenError("Invalid session token signature")
+        try:
+            claims = json.loads(payload)
+            session = SessionClaims(str(claims["w"]), int(claims["u"]), int(claims["exp"]))
+        except (ValueError, KeyError, TypeError):
+            raise InvalidTokenError("Malformed session token")
+        if session.expires_at <= self._clock():
+            raise InvalidTokenError("Session token expired")
+        return session
+
+
+def signer_from_env() -> SessionTokenSigner:
+    secret = os.getenv("BASEROOT_SESSION_SECRET")
+    return SessionTokenSigner(
+        secret.encode() if secret else secrets.token_bytes(32),
+        ttl_seconds=int(os.getenv("BASEROOT_SESSION_TTL_SECONDS", "3600")),
+    )
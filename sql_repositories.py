@@ -0,0 +1,488 @@
+"""
+Async SQL repositories used by the routers when DATABASE_URL is set.
+
+Each repository wraps the request's `AsyncConnection` (from `database.get_db`)
+and returns rows in the same dict shapes as the in-memory simulated stores,
+so handlers share their response-building code between both modes. Writes
+are not committed here; the handler commits once per request.
+
+Statements are built from module-level Core tables with bound parameters, so
+the compiled form is cached by SQLAlchemy (and prepared by asyncpg on
+PostgreSQL) after the first use.
+"""
+
+import uuid
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from baseroot_backend.chain_indexer import SIMULATED_PROPOSAL_ID_BASE
+from baseroot_backend.database import (
+    dao_proposals, dao_votes, research_nft_authors, research_nft_keywords, research_nfts, users,
+)
+from baseroot_backend.proposal_index import SORTS
+from baseroot_backend.proposal_lifecycle import TallyResult, tally_outcome
+from baseroot_backend.user_repository import DBUser
+from baseroot_backend.vote_store import DuplicateVoteError, VoteRecord, VotingClosedError
+
+_IN_CHUNK = 5000 # Stay below SQLite's bound-parameter limit
+PROPOSAL_STATUSES = ("Pending", "Voting", "Approved", "Rejected", "Executed", "Cancelled")
+
+
+def _insert(conn: AsyncConnection, table: sa.Table):
+    """Dialect-specific INSERT, for ON CONFLICT support."""
+    return (postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert)(table)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def to_iso(value: datetime) -> str:
+    if value.tzinfo is None: # SQLite returns naive datetimes; everything is stored in UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def from_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class SqlUserRepository:
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+
+    @staticmethod
+    def _user(row) -> DBUser:
+        return DBUser(id=row.id, wallet_address=row.wallet_address, username=row.username)
+
+    async def get_by_wallet(self, wallet_address: str) -> Optional[DBUser]:
+        row = (await self.conn.execute(
+            sa.select(users.c.id, users.c.wallet_address, users.c.username).where(users.c.wallet_address == wallet_address)
+        )).first()
+        return self._user(row) if row else None
+
+    async def get_or_create(self, wallet_address: str) -> Tuple[DBUser, bool]:
+        # INSERT .. ON CONFLICT DO NOTHING makes concurrent connects (even across workers) create one row
+        inserted = (await self.conn.execute(
+            _insert(self.conn, users).values(wallet_address=wallet_address)
+            .on_conflict_do_nothing(index_elements=[users.c.wallet_address])
+            .returning(users.c.id)
+        )).first()
+        if inserted is not None:
+            return DBUser(id=inserted.id, wallet_address=wallet_address), True
+        return await self.get_by_wallet(wallet_address), False
+
+    async def _ids_by_wallet(self, wallet_addresses: Sequence[str]) -> Dict[str, Tuple[int, Optional[str]]]:
+        found = {}
+        for start in range(0, len(wallet_addresses), _IN_CHUNK):
+            rows = await self.conn.execute(
+                sa.select(users.c.id, users.c.wallet_address, users.c.username)
+                .where(users.c.wallet_address.in_(wallet_addresses[start : start + _IN_CHUNK]))
+            )
+            found.update((row.wallet_address, (row.id, row.username)) for row in rows)
+        return found
+
+    async def bulk_get_or_create(self, wallet_addresses: Sequence[str]) -> List[Tuple[DBUser, bool]]:
+        """Same contract as UserRepository.bulk_get_or_create; new rows are inserted with one executemany."""
+        existing = await self._ids_by_wallet(wallet_addresses)
+        new_wallets = [w for w in wallet_addresses if w not in existing]
+        if new_wallets:
+            await self.conn.execute(
+                _insert(self.conn, users).on_conflict_do_nothing(index_elements=[users.c.wallet_address]),
+                [{"wallet_address": w} for w in new_wallets],
+            )
+        created = await self._ids_by_wallet(new_wallets) if new_wallets else {}
+        results = []
+        for wallet_address in wallet_addresses:
+            was_created = wallet_address in created
+            user_id, username = created[wallet_address] if was_created else existing[wallet_address]
+            results.append((DBUser(id=user_id, wallet_address=wallet_address, username=username), was_created))
+        return results
+
+
+class SqlNftRepository:
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+
+    @staticmethod
+    def _entry(row) -> dict:
+        return {
+            "id": row.id,
+            "mint_address": row.mint_address,
+            "uploader_user_id": row.uploader_user_id,
+            "uploader_wallet_address": row.uploader_wallet_address,
+            "title": row.title,
+            "abstract_text": row.abstract,
+            "authors": list(row.authors),
+            "publication_date": row.publication_date.isoformat(),
+            "content_storage_hash": row.content_hash,
+            "content_storage_provider": row.content_storage_provider,
+            "metadata_uri": row.on_chain_metadata_uri,
+            "keywords": list(row.keywords) if row.keywords is not None else None,
+            "research_type": row.research_type,
+            "on_chain_symbol": row.on_chain_symbol,
+            "created_at": to_iso(row.created_at),
+        }
+
+    @staticmethod
+    def _row(entry: dict) -> dict:
+        return {
+            "mint_address": entry["mint_address"],
+            "on_chain_metadata_uri": entry["metadata_uri"],
+            "on_chain_symbol": entry["on_chain_symbol"],
+            "title": entry["title"],
+            "abstract": entry["abstract_text"],
+            "authors": entry["authors"],
+            "keywords": entry["keywords"],
+            "publication_date": date.fromisoformat(entry["publication_date"]),
+            "content_hash": entry["content_storage_hash"],
+            "content_storage_provider": entry["content_storage_provider"],
+            "research_type": entry["research_type"],
+            "uploader_user_id": entry["uploader_user_id"],
+            "uploader_wallet_address": entry["uploader_wallet_address"],
+            "created_at": from_iso(entry["created_at"]),
+        }
+
+    async def insert(self, entry: dict) -> int:
+        """Inserts an NFT in the in-memory entry format (without "id"); returns the new id.
+        Raises ValueError if publication_date is not an ISO date."""
+        return (await self.insert_many([entry]))[0]
+
+    async def insert_many(self, entries: Sequence[dict]) -> List[int]:
+        """
+        Inserts NFTs with one executemany per table; returns the new ids in input order.
+        Raises ValueError if a publication_date is not an ISO date.
+        """
+        rows = [self._row(entry) for entry in entries]
+        result = await self.conn.execute(
+            sa.insert(research_nfts).returning(research_nfts.c.id, sort_by_parameter_order=True), rows
+        )
+        nft_ids = list(result.scalars())
+        author_rows = [{"author_key": a, "nft_id": nft_id}
+                       for entry, nft_id in zip(entries, nft_ids) for a in {a.casefold() for a in entry["authors"]}]
+        keyword_rows = [{"keyword_key": k, "nft_id": nft_id}
+                        for entry, nft_id in zip(entries, nft_ids) for k in {k.casefold() for k in entry["keywords"] or []}]
+        if author_rows:
+            await self.conn.execute(sa.insert(research_nft_authors), author_rows)
+        if keyword_rows:
+            await self.conn.execute(sa.insert(research_nft_keywords), keyword_rows)
+        return nft_ids
+
+    async def get_by_mint(self, mint_address: str) -> Optional[dict]:
+        row = (await self.conn.execute(sa.select(research_nfts).where(research_nfts.c.mint_address == mint_address))).first()
+        return self._entry(row) if row else None
+
+    async def get_many_by_mint(self, mint_addresses: Sequence[str]) -> Dict[str, dict]:
+        """mint address -> entry for the given NFTs that exist (one query per chunk)."""
+        entries = {}
+        for start in range(0, len(mint_addresses), _IN_CHUNK):
+            for row in await self.conn.execute(
+                sa.select(research_nfts).where(research_nfts.c.mint_address.in_(mint_addresses[start : start + _IN_CHUNK]))
+            ):
+                entries[row.mint_address] = self._entry(row)
+        return entries
+
+    async def after_id(self, after_id: int, limit: int) -> List[dict]:
+        """Up to `limit` NFTs with id > `after_id`, in id order (a primary-key range scan)."""
+        rows = await self.conn.execute(
+            sa.select(research_nfts).where(research_nfts.c.id > after_id).order_by(research_nfts.c.id).limit(limit)
+        )
+        return [self._entry(row) for row in rows]
+
+    async def list_page(self, sort: str = "created_at", filters: Optional[Dict[str, str]] = None,
+                        after: Optional[tuple] = None, skip: int = 0, limit: int = 10) -> Tuple[List[dict], Optional[tuple]]:
+        """
+        Same contract as NftListIndex.page, but returns entries. Keyset pagination on
+        (sort column, id) served by the matching composite index; filters are EXISTS
+        probes into the author / keyword lookup tables.
+        """
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        column = research_nfts.c[field]
+        query = sa.select(research_nfts)
+        filters = filters or {}
+        if "author" in filters:
+            query = query.where(sa.exists().where(
+                research_nft_authors.c.nft_id == research_nfts.c.id,
+                research_nft_authors.c.author_key == filters["author"].casefold()))
+        if "keyword" in filters:
+            query = query.where(sa.exists().where(
+                research_nft_keywords.c.nft_id == research_nfts.c.id,
+                research_nft_keywords.c.keyword_key == filters["keyword"].casefold()))
+        if "research_type" in filters:
+            query = query.where(sa.func.lower(research_nfts.c.research_type) == filters["research_type"].lower())
+        if after is not None:
+            value = from_iso(after[0]) if field == "created_at" else date.fromisoformat(after[0])
+            if descending:
+                query = query.where(sa.or_(column < value, sa.and_(column == value, research_nfts.c.id < after[1])))
+            else:
+                query = query.where(sa.or_(column > value, sa.and_(column == value, research_nfts.c.id > after[1])))
+        elif skip:
+            query = query.offset(skip)
+        order = (column.desc(), research_nfts.c.id.desc()) if descending else (column, research_nfts.c.id)
+        rows = (await self.conn.execute(query.order_by(*order).limit(limit + 1))).all()
+        entries = [self._entry(row) for row in rows[:limit]]
+        next_key = None
+        if len(rows) > limit:
+            last = entries[-1]
+            next_key = (last[field], last["id"], last["mint_address"])
+        return entries, next_key
+
+
+class SqlDaoRepository:
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+
+    @staticmethod
+    def _entry(row) -> dict:
+        return {
+            "db_proposal_id": row.id,
+            "on_chain_proposal_id": int(row.on_chain_proposal_id),
+            "proposer_wallet_address": row.proposer_wallet_address,
+            "title": row.title,
+            "description": row.description,
+            "ipfs_hash_details": row.ipfs_details_hash,
+            "requested_amount": row.requested_amount_sol,
+            "currency": row.currency,
+            "target_funding_address": row.target_funding_address,
+            "yes_votes_on_chain": row.yes_votes,
+            "no_votes_on_chain": row.no_votes,
+            "start_slot_on_chain": row.start_slot,
+            "end_slot_on_chain": row.end_slot,
+            "status_on_chain": row.status,
+            "executed_on_chain": row.executed,
+            "created_at": to_iso(row.created_at),
+        }
+
+    async def insert_proposal(self, proposal: dict, proposer_user_id: Optional[int] = None) -> dict:
+        """
+        Inserts a proposal in the in-memory entry format. Until proposals are submitted on-chain,
+        the simulated on-chain id is SIMULATED_PROPOSAL_ID_BASE + the database id, so ids stay
+        unique across workers and never collide with an id indexed from the chain.
+        """
+        proposal_id = (await self.conn.execute(
+            sa.insert(dao_proposals).values(
+                on_chain_proposal_id=f"pending-{uuid.uuid4().hex}",
+                proposer_user_id=proposer_user_id,
+                proposer_wallet_address=proposal["proposer_wallet_address"],
+                title=proposal["title"],
+                description=proposal["description"],
+                ipfs_details_hash=proposal["ipfs_hash_details"],
+                requested_amount_sol=proposal["requested_amount"],
+                currency=proposal["currency"],
+                target_funding_address=proposal["target_funding_address"],
+                status=proposal["status_on_chain"],
+                start_slot=proposal["start_slot_on_chain"],
+                end_slot=proposal["end_slot_on_chain"],
+                created_at=from_iso(proposal["created_at"]),
+            ).returning(dao_proposals.c.id)
+        )).scalar_one()
+        await self.conn.execute(
+            sa.update(dao_proposals).where(dao_proposals.c.id == proposal_id)
+            .values(on_chain_proposal_id=str(SIMULATED_PROPOSAL_ID_BASE + proposal_id))
+        )
+        return {**proposal, "db_proposal_id": proposal_id, "on_chain_proposal_id": SIMULATED_PROPOSAL_ID_BASE + proposal_id}
+
+    async def _resolve(self, proposal_ids: Sequence[int], *columns) -> Dict[int, sa.Row]:
+        """On-chain proposal id -> row (`columns`, default id and on_chain_proposal_id), chunked IN lookups."""
+        columns = columns or (dao_proposals.c.id, dao_proposals.c.on_chain_proposal_id)
+        keys = [str(proposal_id) for proposal_id in proposal_ids]
+        resolved: Dict[int, sa.Row] = {}
+        for start in range(0, len(keys), _IN_CHUNK):
+            for row in await self.conn.execute(
+                sa.select(*columns).where(dao_proposals.c.on_chain_proposal_id.in_(keys[start : start + _IN_CHUNK]))
+            ):
+                resolved[int(row.on_chain_proposal_id)] = row
+        return resolved
+
+    async def get_proposal(self, on_chain_proposal_id: int) -> Optional[dict]:
+        row = (await self._resolve([on_chain_proposal_id], dao_proposals)).get(on_chain_proposal_id)
+        return self._entry(row) if row else None
+
+    async def list_page(self, sort: str = "oldest", status_filter: Optional[str] = None, after: Optional[tuple] = None,
+                        skip: int = 0, limit: int = 10) -> Tuple[List[dict], Optional[tuple]]:
+        """
+        Same contract as ProposalIndex.page, but returns entries. Keyset pagination on
+        (sort column, id), served by the matching (status, column, id) index.
+        """
+        field, descending = SORTS[sort]
+        column = {"db_proposal_id": dao_proposals.c.id, "end_slot_on_chain": dao_proposals.c.end_slot,
+                  "requested_amount": dao_proposals.c.requested_amount_sol}[field]
+        query = sa.select(dao_proposals)
+        if status_filter:
+            status_value = {s.lower(): s for s in PROPOSAL_STATUSES}.get(status_filter.lower(), status_filter)
+            query = query.where(dao_proposals.c.status == status_value)
+        if after is not None:
+            if column is dao_proposals.c.id:
+                query = query.where(column < after[1] if descending else column > after[1])
+            elif descending:
+                query = query.where(sa.or_(column < after[0], sa.and_(column == after[0], dao_proposals.c.id < after[1])))
+            else:
+                query = query.where(sa.or_(column > after[0], sa.and_(column == after[0], dao_proposals.c.id > after[1])))
+        elif skip:
+            query = query.offset(skip)
+        order = (column.desc(), dao_proposals.c.id.desc()) if descending else (column, dao_proposals.c.id)
+        if column is dao_proposals.c.id:
+            order = order[:1]
+        rows = (await self.conn.execute(query.order_by(*order).limit(limit + 1))).all()
+        entries = [self._entry(row) for row in rows[:limit]]
+        next_key = None
+        if len(rows) > limit:
+            last = entries[-1]
+            next_key = (last[field] or 0, last["db_proposal_id"], last["on_chain_proposal_id"])
+        return entries, next_key
+
+    async def record_votes(self, votes: Sequence[Tuple[VoteRecord, Optional[int]]],
+                           chain_only: bool = False) -> List[object]:
+        """
+        Records a batch of (vote, voter_user_id) pairs in the caller's transaction: one select
+        of the proposals and of the votes already cast, one executemany insert, and one tally
+        update per proposal. Per vote, returns the proposal's (yes, no) after the batch, or the
+        DuplicateVoteError / VotingClosedError it was rejected with. A vote inserted
+        concurrently by another worker raises sqlalchemy.exc.IntegrityError for the batch.
+        `chain_only` is set for VoteCast events (whose proposal ids are below
+        SIMULATED_PROPOSAL_ID_BASE): they are recorded whatever the proposal's status, since the
+        contract accepted them.
+        """
+        proposals = await self._resolve(
+            sorted({vote.proposal_id for vote, _ in votes}),
+            dao_proposals.c.id, dao_proposals.c.on_chain_proposal_id, dao_proposals.c.status,
+        )
+        voters = sorted({vote.voter_wallet_address for vote, _ in votes})
+        cast = {(row.proposal_id, row.on_chain_voter_address) for row in await self.conn.execute(
+            sa.select(dao_votes.c.proposal_id, dao_votes.c.on_chain_voter_address)
+            .where(dao_votes.c.proposal_id.in_([row.id for row in proposals.values()]),
+                   dao_votes.c.on_chain_voter_address.in_(voters))
+        )}
+        outcomes: List[object] = []
+        rows = []
+        deltas: Dict[int, List[int]] = {} # db proposal id -> [yes, no]
+        for vote, voter_user_id in votes:
+            proposal = proposals.get(vote.proposal_id)
+            if proposal is None or (not chain_only and proposal.status != "Voting"):
+                outcomes.append(VotingClosedError(f"Proposal {vote.proposal_id} is not open for voting"))
+                continue
+            key = (proposal.id, vote.voter_wallet_address)
+            if key in cast:
+                outcomes.append(DuplicateVoteError(f"{vote.voter_wallet_address} already voted on proposal {vote.proposal_id}"))
+                continue
+            cast.add(key)
+            rows.append({"proposal_id": proposal.id, "voter_user_id": voter_user_id,
+                         "on_chain_voter_address": vote.voter_wallet_address,
+                         "vote_type": vote.vote_option, "voting_power": vote.vote_weight})
+            deltas.setdefault(proposal.id, [0, 0])[0 if vote.vote_option else 1] += vote.vote_weight
+            outcomes.append(proposal.id)
+        if rows:
+            await self.conn.execute(sa.insert(dao_votes), rows)
+        tallies = {}
+        now = utc_now()
+        for proposal_id, (yes, no) in deltas.items():
+            row = (await self.conn.execute(
+                sa.update(dao_proposals).where(dao_proposals.c.id == proposal_id)
+                .values({dao_proposals.c.yes_votes: dao_proposals.c.yes_votes + yes,
+                         dao_proposals.c.no_votes: dao_proposals.c.no_votes + no,
+                         dao_proposals.c.updated_at: now})
+                .returning(dao_proposals.c.yes_votes, dao_proposals.c.no_votes)
+            )).one()
+            tallies[proposal_id] = (row.yes_votes, row.no_votes)
+        return [tallies[outcome] if isinstance(outcome, int) else outcome for outcome in outcomes]
+
+    async def upsert_chain_proposal(self, on_chain_proposal_id: int, proposer_wallet_address: str, title: str,
+                                    start_slot: int, end_slot: int) -> bool:
+        """Records a proposal seen in a ProposalSubmitted event; returns False if it was already known."""
+        known = (await self.conn.execute(
+            sa.update(dao_proposals).where(dao_proposals.c.on_chain_proposal_id == str(on_chain_proposal_id))
+            .values(proposer_wallet_address=proposer_wallet_address, title=title, updated_at=utc_now())
+        )).rowcount
+        if known:
+            return False
+        await self.conn.execute(sa.insert(dao_proposals).values(
+            on_chain_proposal_id=str(on_chain_proposal_id),
+            proposer_wallet_address=proposer_wallet_address,
+            title=title,
+            description="",
+            requested_amount_sol=0,
+            currency="SOL",
+            target_funding_address="",
+            status="Voting",
+            start_slot=start_slot,
+            end_slot=end_slot,
+            created_at=utc_now(),
+        ))
+        return True
+
+    async def set_chain_status(self, on_chain_proposal_id: int, new_status: str, yes_votes: Optional[int] = None,
+                               no_votes: Optional[int] = None, executed: bool = False) -> None:
+        """Applies a ProposalStatusChanged / ProposalExecuted event (absolute values, so replays are harmless)."""
+        values = {"status": new_status, "updated_at": utc_now()}
+        if yes_votes is not None:
+            values.update(yes_votes=yes_votes, no_votes=no_votes)
+        if executed:
+            values["executed"] = True
+        await self.conn.execute(
+            sa.update(dao_proposals).where(dao_proposals.c.on_chain_proposal_id == str(on_chain_proposal_id)).values(**values)
+        )
+
+    async def get_vote(self, on_chain_proposal_id: int, voter_wallet_address: str) -> Optional[VoteRecord]:
+        """Point lookup on the (proposal_id, on_chain_voter_address) unique index."""
+        proposal = (await self._resolve([on_chain_proposal_id])).get(on_chain_proposal_id)
+        if proposal is None:
+            return None
+        row = (await self.conn.execute(
+            sa.select(dao_votes.c.vote_type, dao_votes.c.voting_power, dao_votes.c.voted_at)
+            .where(dao_votes.c.proposal_id == proposal.id, dao_votes.c.on_chain_voter_address == voter_wallet_address)
+        )).first()
+        if row is None:
+            return None
+        return VoteRecord(on_chain_proposal_id, voter_wallet_address, row.vote_type, row.voting_power, to_iso(row.voted_at))
+
+    async def voter_history(self, voter_wallet_address: str, skip: int = 0, limit: int = 50) -> List[VoteRecord]:
+        """The wallet's votes, oldest first (range scan of the (on_chain_voter_address, voted_at) index)."""
+        rows = await self.conn.execute(
+            sa.select(dao_proposals.c.on_chain_proposal_id, dao_votes.c.vote_type, dao_votes.c.voting_power, dao_votes.c.voted_at)
+            .select_from(dao_votes.join(dao_proposals, dao_votes.c.proposal_id == dao_proposals.c.id))
+            .where(dao_votes.c.on_chain_voter_address == voter_wallet_address)
+            .order_by(dao_votes.c.voted_at, dao_votes.c.id).offset(skip).limit(limit)
+        )
+        return [VoteRecord(int(row.on_chain_proposal_id), voter_wallet_address, row.vote_type, row.voting_power,
+                           to_iso(row.voted_at)) for row in rows]
+
+    async def voting_deadlines(self) -> List[Tuple[int, int]]:
+        """(on-chain id, end slot) of every proposal still open for voting, to seed the lifecycle scheduler."""
+        rows = await self.conn.execute(
+            sa.select(dao_proposals.c.on_chain_proposal_id, dao_proposals.c.end_slot)
+            .where(dao_proposals.c.status == "Voting")
+        )
+        return [(int(row.on_chain_proposal_id), row.end_slot) for row in rows]
+
+    async def close_proposals(self, on_chain_proposal_ids: Sequence[int], closed_at_slot: int) -> List[TallyResult]:
+        """
+        Tallies the given proposals and moves them from Voting to Approved/Rejected.
+        Proposals that are no longer in Voting (e.g. closed by another worker) are skipped.
+        """
+        results = []
+        by_status: Dict[str, List[int]] = {} # new status -> db ids
+        resolved = await self._resolve(
+            on_chain_proposal_ids, dao_proposals.c.id, dao_proposals.c.on_chain_proposal_id, dao_proposals.c.status,
+            dao_proposals.c.yes_votes, dao_proposals.c.no_votes, dao_proposals.c.end_slot,
+        )
+        for proposal_id, row in resolved.items():
+            if row.status != "Voting":
+                continue
+            result = TallyResult(proposal_id, tally_outcome(row.yes_votes, row.no_votes),
+                                 row.yes_votes, row.no_votes, row.end_slot, closed_at_slot)
+            results.append(result)
+            by_status.setdefault(result.status, []).append(row.id)
+        now = utc_now()
+        for new_status, db_ids in by_status.items():
+            for start in range(0, len(db_ids), _IN_CHUNK):
+                await self.conn.execute(
+                    sa.update(dao_proposals)
+                    .where(dao_proposals.c.id.in_(db_ids[start : start + _IN_CHUNK]), dao_proposals.c.status == "Voting")
+                    .values(status=new_status, updated_at=now)
+                )
+        return results
@@ -36,28 +36,31 @@ app.include_router(ai_router)
 client = TestClient(app)
 
 # --- Auth API Tests (Simulated) ---
+NEW_USER_WALLET = "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU"
+EXISTING_USER_WALLET = "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM"
+
 def test_connect_wallet_new_user():
     response = client.post(
         "/auth/connect_wallet",
-        json={"wallet_address": "TestWalletAddressNewUser123456789012345"}
+        json={"wallet_address": NEW_USER_WALLET}
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["wallet_address"] == "TestWalletAddressNewUser123456789012345"
+    assert data["wallet_address"] == NEW_USER_WALLET
     assert "New user created" in data["message"]
     assert "id" in data
 
 def test_connect_wallet_existing_user():
     # First, create a user
-    client.post("/auth/connect_wallet", json={"wallet_address": "TestWalletExistingUser1234567890123"})
+    client.post("/auth/connect_wallet", json={"wallet_address": EXISTING_USER_WALLET})
     # Then, connect again
     response = client.post(
         "/auth/connect_wallet",
-        json={"wallet_address": "TestWalletExistingUser1234567890123"}
+        json={"wallet_address": EXISTING_USER_WALLET}
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["wallet_address"] == "TestWalletExistingUser1234567890123"
+    assert data["wallet_address"] == EXISTING_USER_WALLET
     assert "Welcome back" in data["message"]
 
 def test_connect_wallet_invalid_address():
@@ -67,6 +70,136 @@ def test_connect_wallet_invalid_address():
     )
     assert response.status_code == 400 # Based on current basic validation
     assert "Invalid wallet address format" in response.json()["detail"]
+    # Alphanumeric but not base58 ('l' is not in the alphabet): rejected like in the bulk import
+    response = client.post("/auth/connect_wallet", json={"wallet_address": "TestWalletAddressNewUser123456789012345"})
+    assert response.status_code == 400
+
+def test_user_repository_concurrent_connects_create_one_user_per_wallet():
+    from concurrent.futures import ThreadPoolExecutor
+    from baseroot_backend.user_repository import InMemoryUserRepository
+
+    repository = InMemoryUserRepository()
+    wallets = [f"StressWallet{i % 100:03d}" for i in range(10_000)]
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(repository.get_or_create, wallets))
+
+    assert sum(created for _, created in results) == 100
+    assert len(repository) == 100
+    assert sorted(repository.users_by_id) == list(range(1, 101)) # ids are unique and gap-free
+    for wallet, (user, _) in zip(wallets, results):
+        assert user is repository.get_by_wallet(wallet)
+
+def test_connect_wallet_10k_concurrent_same_new_wallet():
+    import asyncio
+    from baseroot_backend.auth_api import connect_wallet, user_repository, WalletConnectRequest
+
+    request = WalletConnectRequest(wallet_address="CuieVDEDtLo7FypA9SbLM9saXFdb1dsshEkyErMqkRQq")
+    users_before = len(user_repository)
+
+    async def connect_all():
+        return await asyncio.gather(*(connect_wallet(request, db=None) for _ in range(10_000)))
+
+    responses = asyncio.run(connect_all())
+    assert len(user_repository) == users_before + 1
+    assert len({r.id for r in responses}) == 1
+    assert sum("New user created" in r.message for r in responses) == 1
+
+def test_wallet_login_issues_session_token_used_by_nft_and_dao_routers():
+    signing = pytest.importorskip("nacl.signing")
+    from baseroot_backend.wallet_addresses import b58encode
+
+    key = signing.SigningKey(bytes(range(32)))
+    wallet = b58encode(bytes(key.verify_key))
+    challenge = client.post("/auth/challenge", json={"wallet_address": wallet}).json()
+    signature = b58encode(key.sign(challenge["message"].encode()).signature)
+
+    bad = client.post("/auth/login", json={"wallet_address": wallet, "nonce": challenge["nonce"], "signature": b58encode(bytes(64))})
+    assert bad.status_code == 401
+    login = client.post("/auth/login", json={"wallet_address": wallet, "nonce": challenge["nonce"], "signature": signature})
+    assert login.status_code == 200
+    token = login.json()["access_token"]
+    replay = client.post("/auth/login", json={"wallet_address": wallet, "nonce": challenge["nonce"], "signature": signature})
+    assert replay.status_code == 401 # Nonces are single-use
+
+    headers = {"Authorization": f"Bearer {token}"}
+    minted = client.post("/nft/mint_research_nft", headers=headers, json={"metadata": {
+        "title": "Session Minted Paper", "abstract_text": "Minted with a session token.", "authors": ["Dr. Token"],
+        "publication_date": "2025-06-01", "content_storage_hash": "bafySessionHash"}})
+    assert minted.status_code == 201
+    details = client.get(f"/nft/get_nft_metadata/{minted.json()['mint_address']}").json()
+    assert details["uploader_wallet_address"] == wallet
+
+    proposal = client.post("/dao/submit_proposal", headers=headers, json={
+        "title": "Session Proposal", "description": "d", "requested_amount": 1, "target_funding_address": wallet})
+    assert proposal.status_code == 201
+    vote = client.post(f"/dao/vote_on_proposal/{proposal.json()['on_chain_proposal_id']}", headers=headers, json={"vote_option": True})
+    assert vote.json()["voter_wallet_address"] == wallet
+
+    assert client.post("/dao/submit_proposal", headers={"Authorization": f"Bearer x{token[1:]}"}, json={
+        "title": "t", "description": "d", "requested_amount": 1, "target_funding_address": wallet}).status_code == 401
+
+def test_session_tokens_expire_and_signature_checks_are_cached():
+    from baseroot_backend.session_tokens import InvalidTokenError, SessionTokenSigner, SignatureVerifier
+    from baseroot_backend.wallet_addresses import b58encode
+
+    now = [1_000_000.0]
+    signer = SessionTokenSigner(b"0123456789abcdef0123456789abcdef", ttl_seconds=60, clock=lambda: now[0])
+    token, _ = signer.issue("SomeWallet", 7)
+    assert signer.verify(token).user_id == 7
+    now[0] += 61
+    with pytest.raises(InvalidTokenError):
+        signer.verify(token)
+
+    calls = []
+    verifier = SignatureVerifier(verify_fn=lambda key, message, signature: calls.append(1) or True)
+    wallet, signature = b58encode(bytes(range(1, 33))), b58encode(bytes(range(64)))
+    assert verifier.verify(wallet, "nonce", "message", signature)
+    assert verifier.verify(wallet, "nonce", "message", signature)
+    assert len(calls) == 1
+
+def test_vectorized_wallet_decoding_matches_scalar_base58():
+    import numpy as np
+    from baseroot_backend.wallet_addresses import b58decode, b58encode, decode_wallet_addresses, is_wallet_address
+
+    rng = np.random.default_rng(0)
+    keys = [rng.integers(0, 256, 32, dtype=np.uint8).tobytes() for _ in range(200)]
+    keys += [bytes(32), b"\x00\x00" + bytes(range(1, 31)), b"\xff" * 32]
+    good = [b58encode(k) for k in keys]
+    bad = [
+        good[0][:-1] + "0", # '0' is not in the base58 alphabet
+        good[1][:-1] + "l", # neither is 'l'
+        b58encode(b"\x01" * 31), # decodes to 31 bytes
+        b58encode(b"\x01" * 33), # too long
+        good[2][:-1] + "é", # non-ASCII
+        "short",
+    ]
+    valid, public_keys = decode_wallet_addresses(good + bad)
+    assert valid.tolist() == [True] * len(good) + [False] * len(bad)
+    assert [is_wallet_address(a) for a in good + bad] == valid.tolist()
+    for i, address in enumerate(good):
+        assert public_keys[i].tobytes() == b58decode(address) == keys[i]
+
+def test_bulk_connect_wallets_dedupes_and_allocates_id_block():
+    import json
+    from baseroot_backend.wallet_addresses import b58encode
+
+    wallets = [b58encode(bytes([7, i]) + bytes(30)) for i in range(50)]
+    existing = client.post("/auth/connect_wallet", json={"wallet_address": wallets[0]}).json()["id"]
+    batch = wallets + [wallets[3], "not-a-wallet", wallets[0]]
+    response = client.post("/auth/bulk_connect_wallets", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["received"], data["created"], data["existing"], data["duplicates"], data["invalid"]) == (53, 49, 1, 2, 1)
+    assert data["statuses"] == "e" + "c" * 49 + "did"
+    new_ids = data["user_ids"][1:50]
+    assert new_ids == list(range(new_ids[0], new_ids[0] + 49)) # One contiguous block
+    assert data["user_ids"][0] == data["user_ids"][52] == existing
+    assert data["user_ids"][50] == data["user_ids"][3] and data["user_ids"][51] is None
+
+    # NDJSON re-import is idempotent
+    ndjson = "\n".join(json.dumps(w) for w in wallets[:10])
+    again = client.post("/auth/bulk_connect_wallets", content=ndjson, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert again["statuses"] == "e" * 10 and again["user_ids"] == data["user_ids"][:10]
 
 # --- NFT API Tests (Simulated) ---
 def test_mint_research_nft_simulated():
@@ -113,6 +246,183 @@ def test_list_nfts_simulated():
     if data: # if any NFTs were created
         assert "mint_address" in data[0]
 
+def test_list_nfts_cursor_pagination_filters_and_sorting():
+    minted = []
+    for i in range(7):
+        response = client.post("/nft/mint_research_nft", json={"metadata": {
+            "title": f"Cursor Paper {i}", "abstract_text": "Paging test.", "authors": ["Dr. Cursor Pager"],
+            "publication_date": f"2024-0{9 - i}-01", "content_storage_hash": f"bafyCursor{i}",
+            "keywords": ["KeysetPaging"] + (["EvenOnly"] if i % 2 == 0 else []),
+            "research_type": "Paging Study"}})
+        minted.append(response.json()["mint_address"])
+
+    def collect(query):
+        pages, cursor = [], None
+        while True:
+            response = client.get(f"/nft/list_nfts?limit=3&{query}" + (f"&cursor={cursor}" if cursor else ""))
+            assert response.status_code == 200
+            pages.append([nft["mint_address"] for nft in response.json()])
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return pages
+
+    pages = collect("author=dr. cursor pager")
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert sum(pages, []) == minted # created_at order
+    assert sum(collect("keyword=keysetpaging&sort=-created_at"), []) == minted[::-1]
+    assert sum(collect("research_type=Paging Study&sort=publication_date"), []) == minted[::-1] # later mints have earlier dates
+    assert sum(collect("keyword=EvenOnly&author=Dr. Cursor Pager"), []) == minted[::2]
+
+    offset = client.get("/nft/list_nfts?author=Dr. Cursor Pager&skip=5&limit=5").json()
+    assert [nft["mint_address"] for nft in offset] == minted[5:]
+    # With several filters a skip is a scan, so deep skips must use the cursor instead
+    offset = client.get("/nft/list_nfts?keyword=EvenOnly&author=Dr. Cursor Pager&skip=1&limit=5").json()
+    assert [nft["mint_address"] for nft in offset] == minted[2::2]
+    assert client.get("/nft/list_nfts?keyword=EvenOnly&author=Dr. Cursor Pager&skip=1001").status_code == 400
+    assert client.get("/nft/list_nfts?author=Dr. Cursor Pager&skip=1001").json() == []
+
+    cursor = client.get("/nft/list_nfts?limit=3&author=Dr. Cursor Pager").headers["X-Next-Cursor"]
+    assert client.get(f"/nft/list_nfts?limit=3&cursor={cursor}").status_code == 400 # filters differ
+    assert client.get("/nft/list_nfts?cursor=garbage").status_code == 400
+
+def test_bulk_mint_research_nfts_per_item_results_and_stream():
+    import json
+
+    items = [{"title": f"Bulk Paper {i}", "abstract_text": "Archive upload.", "authors": ["Dr. Bulk Minter"],
+              "publication_date": "2024-02-30" if i == 3 else f"2024-03-{i + 1:02d}",
+              "content_storage_hash": f"bafyBulk{i}", "keywords": ["ArchiveBatch"]} for i in range(6)]
+    response = client.post("/nft/bulk_mint_research_nfts", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["received"], data["minted"], data["failed"]) == (6, 5, 1)
+    assert [r["index"] for r in data["results"]] == list(range(6))
+    assert data["results"][3]["error"] and data["results"][3]["mint_address"] is None
+    minted = [r["mint_address"] for r in data["results"] if r["error"] is None]
+    assert len(set(minted)) == 5
+    assert client.get(f"/nft/get_nft_metadata/{minted[0]}").json()["title"] == "Bulk Paper 0"
+    listed = client.get("/nft/list_nfts?keyword=archivebatch&limit=100").json()
+    assert [nft["mint_address"] for nft in listed] == minted
+
+    stream = client.post("/nft/bulk_mint_research_nfts/stream", json=items[:2])
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in stream.text.splitlines()]
+    assert events[0] == {"event": "progress", "built": 2, "total": 2}
+    assert [e["index"] for e in events if e["event"] == "result"] == [0, 1]
+    assert events[-1] == {"event": "done", "received": 2, "minted": 2, "failed": 0}
+
+def test_mint_stores_metadata_json_by_cid_and_dedups():
+    metadata = {"title": "Blob Paper", "abstract_text": "Content addressed.", "authors": ["Dr. Blob"],
+                "publication_date": "2024-05-01", "content_storage_hash": "bafyBlobContent", "research_type": "Dataset"}
+    first = client.post("/nft/mint_research_nft", json={"metadata": metadata}).json()
+    second = client.post("/nft/mint_research_nft", json={"metadata": metadata}).json()
+    assert first["mint_address"] != second["mint_address"]
+    assert first["metadata_uri"] == second["metadata_uri"] and first["metadata_uri"].startswith("ipfs://bafkrei")
+
+    detail = client.get(f"/nft/get_nft_metadata/{first['mint_address']}?resolve_metadata=true").json()
+    assert detail["off_chain_metadata"]["name"] == "Blob Paper"
+    assert detail["off_chain_metadata"]["properties"]["files"][0]["uri"] == "bafyBlobContent"
+    assert client.get(f"/nft/get_nft_metadata/{first['mint_address']}").json()["off_chain_metadata"] is None
+
+    cid = first["metadata_uri"][len("ipfs://"):]
+    raw = client.get(f"/nft/metadata/{cid}")
+    assert raw.status_code == 200 and raw.headers["etag"] == f'"{cid}"'
+    assert raw.json() == detail["off_chain_metadata"]
+    assert client.get("/nft/metadata/not-a-cid").status_code == 400
+    assert client.get("/nft/metadata/bafkrei" + "a" * 52).status_code == 404
+
+def test_mint_rejects_invalid_publication_date_before_storing_anything():
+    from baseroot_backend import nft_api
+
+    writes, next_id = nft_api.metadata_blob_store.stats()["writes"], nft_api.next_nft_id
+    response = client.post("/nft/mint_research_nft", json={"metadata": {
+        "title": "Undated Paper", "abstract_text": "a", "authors": ["Dr. Undated"], "publication_date": "2024-13-40",
+        "content_storage_hash": "bafyUndated"}})
+    assert response.status_code == 400 and response.json()["detail"] == "publication_date must be an ISO 8601 date."
+    assert (nft_api.metadata_blob_store.stats()["writes"], nft_api.next_nft_id) == (writes, next_id)
+
+def test_nft_detail_and_list_serve_cached_json_with_etags():
+    from baseroot_backend.nft_api import nft_json_cache
+
+    mint = client.post("/nft/mint_research_nft", json={"metadata": {
+        "title": "ETag Paper", "abstract_text": "Cached bytes.", "authors": ["Dr. Etag Poller"],
+        "publication_date": "2024-06-01", "content_storage_hash": "bafyEtag0"}}).json()["mint_address"]
+    assert nft_json_cache.get(mint) is not None # encoded at mint time
+
+    detail = client.get(f"/nft/get_nft_metadata/{mint}")
+    assert detail.status_code == 200 and detail.json()["title"] == "ETag Paper"
+    etag = detail.headers["etag"]
+    not_modified = client.get(f"/nft/get_nft_metadata/{mint}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b"" and not_modified.headers["etag"] == etag
+    assert client.get(f"/nft/get_nft_metadata/{mint}", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+    listed = client.get("/nft/list_nfts?author=Dr. Etag Poller")
+    assert [nft["mint_address"] for nft in listed.json()] == [mint]
+    assert listed.json()[0] == detail.json()
+    list_etag = listed.headers["etag"]
+    assert client.get("/nft/list_nfts?author=Dr. Etag Poller", headers={"If-None-Match": f"W/{list_etag}"}).status_code == 304
+
+    client.post("/nft/mint_research_nft", json={"metadata": {
+        "title": "ETag Paper 2", "abstract_text": "New page.", "authors": ["Dr. Etag Poller"],
+        "publication_date": "2024-06-02", "content_storage_hash": "bafyEtag1"}})
+    changed = client.get("/nft/list_nfts?author=Dr. Etag Poller", headers={"If-None-Match": list_etag})
+    assert changed.status_code == 200 and len(changed.json()) == 2 and changed.headers["etag"] != list_etag
+
+def test_search_nfts_phrases_prefixes_facets_and_ranking():
+    papers = [
+        ("Quantum Error Correction Codes", "Surface codes for fault tolerant qubits.", ["Dr. Qubit Searcher"], ["SearchQuantum"], "Research Paper"),
+        ("Error Budgets in Qubit Arrays", "Correction of errors in quantum hardware.", ["Dr. Qubit Searcher", "Dr. Array"], ["SearchQuantum", "Hardware"], "Dataset"),
+        ("Coral Reef Acoustics", "Quantum sensors listen to reefs.", ["Dr. Reef Searcher"], ["SearchOcean"], "Research Paper"),
+    ]
+    minted = []
+    for title, abstract, authors, keywords, research_type in papers:
+        minted.append(client.post("/nft/mint_research_nft", json={"metadata": {
+            "title": title, "abstract_text": abstract, "authors": authors, "publication_date": "2024-07-01",
+            "content_storage_hash": f"bafySearch{len(minted)}", "keywords": keywords, "research_type": research_type}}).json()["mint_address"])
+
+    data = client.get("/nft/search_nfts", params={"q": "quantum"}).json()
+    found = [hit["nft"]["mint_address"] for hit in data["hits"]]
+    assert set(minted) <= set(found)
+    assert found.index(minted[0]) < found.index(minted[2]) # title match outranks an abstract-only match
+
+    phrase = client.get("/nft/search_nfts", params={"q": '"error correction"'}).json()
+    assert [hit["nft"]["mint_address"] for hit in phrase["hits"]] == [minted[0]] # not "errors ... correction"
+    prefix = client.get("/nft/search_nfts", params={"q": "acoust* reef"}).json()
+    assert [hit["nft"]["mint_address"] for hit in prefix["hits"]] == [minted[2]]
+    assert client.get("/nft/search_nfts", params={"q": "quantum zzznotaword"}).json()["total"] == 0
+
+    faceted = client.get("/nft/search_nfts", params={"q": "qubit*", "facet_limit": 5}).json()
+    assert faceted["total"] == 2
+    assert {"value": "SearchQuantum", "count": 2} in faceted["facets"]["keyword"]
+    assert {"value": "Dataset", "count": 1} in faceted["facets"]["research_type"]
+    narrowed = client.get("/nft/search_nfts", params={"q": "qubit*", "research_type": "dataset"}).json()
+    assert [hit["nft"]["mint_address"] for hit in narrowed["hits"]] == [minted[1]]
+
+    page = client.get("/nft/search_nfts", params={"q": "searchquantum", "skip": 1, "limit": 1}).json()
+    assert page["total"] == 2 and len(page["hits"]) == 1
+    assert client.get("/nft/search_nfts", params={"q": ""}).status_code == 422
+    assert prefix["truncated_prefixes"] == []
+
+def test_nft_search_index_phrase_matching_and_prefix_truncation():
+    import random
+    from baseroot_backend.nft_search import NftSearchIndex
+
+    rng = random.Random(7)
+    words = ["alpha", "beta", "gamma", "delta"]
+    index = NftSearchIndex(max_prefix_expansions=3)
+    texts = {}
+    for i in range(2000):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(2, 12)))
+        texts[f"mint{i}"] = text
+        index.add({"mint_address": f"mint{i}", "title": text, "authors": [f"Author{i}"], "keywords": []})
+    for phrase in ("alpha beta", "gamma gamma delta", "beta alpha beta"):
+        result = index.search(f'"{phrase}"', limit=2000)
+        expected = {mint for mint, text in texts.items() if f" {phrase} " in f" {text} "}
+        assert result.total == len(expected) and {mint for mint, _ in result.hits} == expected
+
+    result = index.search("author1*", limit=1)
+    assert result.truncated_prefixes == ("author1",) and result.total == 3 # author1, author10, author100 of 1111
+    assert index.search("author1999*").truncated_prefixes == ()
+
 # --- DAO API Tests (Simulated) ---
 def test_submit_dao_proposal_simulated():
     payload = {
@@ -158,6 +468,363 @@ def test_list_dao_proposals_simulated():
     if data:
         assert "on_chain_proposal_id" in data[0]
 
+def test_vote_store_rejects_duplicates_and_keeps_exact_tallies_under_concurrency():
+    from concurrent.futures import ThreadPoolExecutor
+    from baseroot_backend.vote_store import DuplicateVoteError, InMemoryVoteStore, VoteRecord
+
+    store = InMemoryVoteStore()
+    votes = [VoteRecord(1 + (i // 500) % 2, f"Voter{i % 500:04d}", i % 3 == 0, 1 + i % 7, "2025-05-15T12:00:00Z") for i in range(4000)]
+
+    def cast(vote):
+        try:
+            store.cast(vote)
+            return vote
+        except DuplicateVoteError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        accepted = [v for v in pool.map(cast, votes) if v is not None]
+    assert len(accepted) == len(store) == 1000 # one vote per (proposal, voter)
+    for proposal_id in (1, 2):
+        expected_yes = sum(v.vote_weight for v in accepted if v.proposal_id == proposal_id and v.vote_option)
+        expected_no = sum(v.vote_weight for v in accepted if v.proposal_id == proposal_id and not v.vote_option)
+        assert store.tally(proposal_id) == (expected_yes, expected_no)
+    assert store.has_voted(1, "Voter0000") and not store.has_voted(3, "Voter0000")
+    assert sorted(v.proposal_id for v in store.voter_history("Voter0001")) == [1, 2]
+    assert store.tally(99) == (0, 0)
+
+def test_duplicate_vote_rejected_and_voter_history():
+    proposal_id = client.post("/dao/submit_proposal", json={
+        "title": "Duplicate Vote Proposal", "description": "d", "requested_amount": 1,
+        "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    assert client.post(f"/dao/vote_on_proposal/{proposal_id}", json={"vote_option": False}).status_code == 200
+    again = client.post(f"/dao/vote_on_proposal/{proposal_id}", json={"vote_option": True})
+    assert again.status_code == 409
+    details = client.get(f"/dao/get_proposal_details/{proposal_id}").json()
+    assert (details["yes_votes_on_chain"], details["no_votes_on_chain"]) == (0, 100)
+
+    voted = client.get(f"/dao/has_voted/{proposal_id}", params={"voter_wallet_address": "SimulatedVoterWalletAddress"}).json()
+    assert voted["has_voted"] and voted["vote"]["vote_option"] is False
+    assert not client.get(f"/dao/has_voted/{proposal_id}", params={"voter_wallet_address": "SomeoneElse"}).json()["has_voted"]
+    history = client.get("/dao/votes_by_voter/SimulatedVoterWalletAddress?limit=500").json()
+    assert history[-1]["proposal_id"] == proposal_id
+
+def test_proposal_lifecycle_closes_due_proposals_by_end_slot(monkeypatch):
+    from baseroot_backend import dao_api
+    from baseroot_backend.proposal_lifecycle import ProposalScheduler, SimulatedSlotClock, tally_outcome
+
+    scheduler = ProposalScheduler(SimulatedSlotClock(5000))
+    scheduler.schedule_many([(1, 300), (2, 100), (3, 200)])
+    assert scheduler.pop_due(100) == [] # voting ends after the end slot, not at it
+    assert scheduler.pop_due(201) == [(2, 100), (3, 200)]
+    assert len(scheduler) == 1 and scheduler.next_deadline() == 300
+    assert (tally_outcome(60, 40), tally_outcome(50, 50), tally_outcome(99, 0)) == ("Approved", "Rejected", "Rejected")
+
+    clock = SimulatedSlotClock(2000000)
+    monkeypatch.setattr(dao_api, "proposal_scheduler", ProposalScheduler(clock))
+    def submit(title):
+        return client.post("/dao/submit_proposal", json={
+            "title": title, "description": "d", "requested_amount": 1,
+            "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    approved, rejected = submit("Lifecycle Yes"), submit("Lifecycle No")
+    client.post(f"/dao/vote_on_proposal/{approved}", json={"vote_option": True})
+    client.post(f"/dao/vote_on_proposal/{rejected}", json={"vote_option": False})
+    clock.advance(1000)
+    later = submit("Lifecycle Later")
+    assert client.get(f"/dao/tally_result/{approved}").status_code == 409
+
+    clock.advance(dao_api.VOTING_PERIOD_SLOTS) # past the first two end slots only
+    details = client.get(f"/dao/get_proposal_details/{approved}").json()
+    assert details["status_on_chain"] == "Approved"
+    result = client.get(f"/dao/tally_result/{rejected}").json()
+    assert (result["status"], result["no_votes"], result["closed_at_slot"]) == ("Rejected", 100, clock.slot)
+    assert client.get(f"/dao/get_proposal_details/{later}").json()["status_on_chain"] == "Voting"
+    assert client.post(f"/dao/vote_on_proposal/{approved}", json={"vote_option": False}).status_code == 400
+    assert len(dao_api.proposal_scheduler) == 1
+
+def test_list_proposals_per_status_indexes_sorts_and_cursors(monkeypatch):
+    from baseroot_backend import dao_api
+    from baseroot_backend.proposal_index import ProposalIndex
+    from baseroot_backend.proposal_lifecycle import ProposalScheduler, SimulatedSlotClock
+
+    clock = SimulatedSlotClock(3000000)
+    monkeypatch.setattr(dao_api, "fake_dao_proposals_db", {})
+    monkeypatch.setattr(dao_api, "proposal_index", ProposalIndex())
+    monkeypatch.setattr(dao_api, "proposal_scheduler", ProposalScheduler(clock))
+    ids = []
+    for amount in (30, 10, 50, 20, 40):
+        ids.append(client.post("/dao/submit_proposal", json={
+            "title": f"Indexed {amount}", "description": "d", "requested_amount": amount,
+            "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"])
+        clock.advance(10)
+
+    def listing(**params):
+        response = client.get("/dao/list_proposals", params=params)
+        assert response.status_code == 200
+        return [p["on_chain_proposal_id"] for p in response.json()], response.headers.get("X-Next-Cursor")
+
+    assert listing()[0] == ids
+    assert listing(sort="newest", skip=1, limit=2)[0] == [ids[3], ids[2]]
+    assert listing(sort="largest_amount")[0] == [ids[2], ids[4], ids[0], ids[3], ids[1]]
+    page, cursor = listing(sort="closing_soonest", limit=2)
+    collected = list(page)
+    while cursor:
+        page, cursor = listing(sort="closing_soonest", limit=2, cursor=cursor)
+        collected += page
+    assert collected == ids
+    assert client.get("/dao/list_proposals", params={"sort": "newest", "cursor": listing(limit=2)[1]}).status_code == 400
+
+    # Only the first two proposals' voting periods end; they move from the Voting index to Rejected
+    clock.advance(dao_api.VOTING_PERIOD_SLOTS - 30)
+    assert listing(status_filter="Voting", sort="closing_soonest")[0] == ids[2:]
+    assert listing(status_filter="rejected", sort="newest")[0] == [ids[1], ids[0]]
+    assert listing(status_filter="Executed")[0] == []
+
+def test_vote_queue_group_commits_with_backpressure_and_exact_tallies(monkeypatch):
+    import asyncio
+    from baseroot_backend import dao_api
+    from baseroot_backend.vote_queue import VoteIngestionQueue, VoteQueueFullError
+    from baseroot_backend.vote_store import DuplicateVoteError, InMemoryVoteStore, VoteRecord
+
+    async def slow_commit(items):
+        await asyncio.sleep(0.005) # every batch pays one commit
+        return [ValueError(item) if item < 0 else item * 2 for item in items]
+
+    async def spike(queue, items):
+        return await asyncio.gather(*(queue.submit(item) for item in items), return_exceptions=True)
+
+    queue = VoteIngestionQueue(slow_commit, max_pending=1000, max_batch_size=100)
+    outcomes = asyncio.run(spike(queue, list(range(-1, 999))))
+    assert isinstance(outcomes[0], ValueError) and outcomes[1:] == [i * 2 for i in range(999)]
+    assert queue.stats()["batches"] <= 12 and queue.stats()["largest_batch"] == 100 and queue.pending == 0
+
+    small = VoteIngestionQueue(slow_commit, max_pending=10)
+    outcomes = asyncio.run(spike(small, list(range(50))))
+    assert sum(isinstance(o, VoteQueueFullError) for o in outcomes) == 40 and small.stats()["rejected"] == 40
+
+    # End to end through the in-memory writer: exact counts, duplicates and closed proposals rejected per vote
+    monkeypatch.setattr(dao_api, "vote_store", InMemoryVoteStore())
+    monkeypatch.setattr(dao_api, "vote_queue", VoteIngestionQueue(dao_api._apply_vote_batch, max_batch_size=256))
+    proposal_id = client.post("/dao/submit_proposal", json={
+        "title": "Vote Spike", "description": "d", "requested_amount": 1,
+        "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    votes = [(VoteRecord(proposal_id, f"Spike{i % 3000}", i % 3 != 0, 1 + i % 5, "2025-05-15T12:00:00Z"), None) for i in range(3300)]
+    votes.append((VoteRecord(10 ** 9, "Spike0", True, 1, "2025-05-15T12:00:00Z"), None))
+    outcomes = asyncio.run(spike(dao_api.vote_queue, votes))
+    assert sum(isinstance(o, DuplicateVoteError) for o in outcomes) == 300
+    assert isinstance(outcomes[-1], dao_api.VotingClosedError)
+    expected_yes = sum(v.vote_weight for v, _ in votes[:3000] if v.vote_option)
+    expected_no = sum(v.vote_weight for v, _ in votes[:3000] if not v.vote_option)
+    details = client.get(f"/dao/get_proposal_details/{proposal_id}").json()
+    assert (details["yes_votes_on_chain"], details["no_votes_on_chain"]) == (expected_yes, expected_no)
+    assert client.get("/dao/vote_queue_stats").json()["batches"] < 3301 / 100
+
+def test_chain_indexer_applies_contract_events_idempotently_with_checkpoints(monkeypatch, tmp_path):
+    import asyncio
+    from baseroot_backend import dao_api
+    from baseroot_backend.chain_indexer import (
+        ChainEventIndexer, FileCheckpointStore, JsonlEventSource, SimulatedLedger, decode_batch, decode_event, encode_event,
+        write_jsonl,
+    )
+    from baseroot_backend.proposal_index import ProposalIndex
+    from baseroot_backend.vote_store import InMemoryVoteStore
+    from baseroot_backend.wallet_addresses import b58encode
+
+    proposer, voters = b58encode(bytes([7] * 32)), [b58encode(bytes([i % 256, i // 256]) * 16) for i in range(300)]
+    fields = {"proposal_id": 42, "voter": voters[0], "vote_option": False, "vote_weight": 2 ** 40}
+    assert decode_event(encode_event("VoteCast", fields)) == ("VoteCast", fields)
+    assert decode_event(b"\0" * 16) is None
+
+    ledger = SimulatedLedger(slot=100)
+    ledger.emit("ProposalSubmitted", {"proposal_id": 900001, "proposer": proposer, "title": "On-chain", "end_slot": 500})
+    for i, voter in enumerate(voters):
+        ledger.emit("VoteCast", {"proposal_id": 900001, "voter": voter, "vote_option": i % 3 != 0, "vote_weight": 10}, slot=101 + i // 100)
+    ledger.emit("ProposalStatusChanged", {"proposal_id": 900001, "new_status": "SucceededAwaitingExecution",
+                                          "total_yes_votes": 2000, "total_no_votes": 1000}, slot=501)
+    ledger.emit("ProposalExecuted", {"proposal_id": 900001, "funding_amount": 5}, slot=502)
+    events_file, checkpoint_file = str(tmp_path / "events.jsonl"), str(tmp_path / "events.checkpoint")
+    raw = ledger.read(None, len(ledger))[0]
+    write_jsonl(events_file, raw[:200])
+
+    monkeypatch.setattr(dao_api, "fake_dao_proposals_db", {})
+    monkeypatch.setattr(dao_api, "proposal_index", ProposalIndex())
+    monkeypatch.setattr(dao_api, "vote_store", InMemoryVoteStore())
+    def indexer():
+        return ChainEventIndexer(JsonlEventSource(events_file), dao_api.apply_chain_events,
+                                 FileCheckpointStore(checkpoint_file), batch_size=64)
+
+    first = indexer()
+    assert asyncio.run(first.catch_up()) == 200
+    assert (first.stats()["checkpoint_slot"], first.stats()["lag_slots"]) == (102, 0)
+    details = client.get("/dao/get_proposal_details/900001").json()
+    assert (details["title"], details["yes_votes_on_chain"], details["no_votes_on_chain"]) == ("On-chain", 1320, 670)
+
+    # A restart resumes after the checkpoint: only the new events are read, and replaying applied ones changes nothing
+    write_jsonl(events_file, raw[200:])
+    restarted = indexer()
+    assert restarted.stats()["lag_slots"] == 502 - 102
+    assert asyncio.run(restarted.catch_up()) == len(raw) - 200 and restarted.events_applied == len(raw) - 200
+    assert asyncio.run(restarted.run_once()) == 0
+    asyncio.run(dao_api.apply_chain_events(decode_batch(raw)[0])) # full replay
+    details = client.get("/dao/get_proposal_details/900001").json()
+    assert (details["status_on_chain"], details["executed_on_chain"]) == ("Executed", True)
+    assert (details["yes_votes_on_chain"], details["no_votes_on_chain"]) == (2000, 1000)
+    assert len(dao_api.vote_store) == 300
+    assert [p["on_chain_proposal_id"] for p in client.get("/dao/list_proposals?status_filter=executed").json()] == [900001]
+
+    # Malformed records are counted and skipped; a batch whose apply fails is retried by run() after a backoff
+    with open(events_file, "ab") as f:
+        f.write(b"not json\n" + b'{"slot": 600}\n')
+    write_jsonl(events_file, [ledger.emit("ProposalSubmitted", {"proposal_id": 900002, "proposer": proposer,
+                                                                "title": "After errors", "end_slot": 700}, slot=600)])
+    attempts = []
+    async def flaky_apply(events):
+        attempts.append(len(events))
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        await dao_api.apply_chain_events(events)
+    retrying = ChainEventIndexer(JsonlEventSource(events_file), flaky_apply, FileCheckpointStore(checkpoint_file))
+    async def follow():
+        task = asyncio.create_task(retrying.run(poll_seconds=0.005))
+        while not retrying.batches:
+            await asyncio.sleep(0.005)
+        task.cancel()
+    asyncio.run(follow())
+    stats = retrying.stats()
+    assert attempts == [1, 1] and (stats["errors"], stats["consecutive_errors"]) == (1, 0)
+    assert (stats["malformed_records"], stats["last_error"]) == (2, "RuntimeError: database unavailable")
+    assert client.get("/dao/get_proposal_details/900002").json()["title"] == "After errors"
+
+    # Simulated proposals live in a reserved id range: a chain proposal with the same number is a different proposal
+    from baseroot_backend.chain_indexer import SIMULATED_PROPOSAL_ID_BASE
+    simulated_id = client.post("/dao/submit_proposal", json={
+        "title": "Simulated", "description": "d", "requested_amount": 1,
+        "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    number = simulated_id - SIMULATED_PROPOSAL_ID_BASE
+    events, skipped = decode_batch([
+        ledger.emit("ProposalSubmitted", {"proposal_id": number, "proposer": proposer, "title": "Chain twin", "end_slot": 10 ** 12}),
+        ledger.emit("VoteCast", {"proposal_id": number, "voter": voters[1], "vote_option": True, "vote_weight": 3}),
+        ledger.emit("VoteCast", {"proposal_id": simulated_id, "voter": voters[1], "vote_option": True, "vote_weight": 3}),
+    ])
+    assert number >= 1 and (len(events), skipped) == (2, 1)
+    asyncio.run(dao_api.apply_chain_events(events))
+    details = client.get(f"/dao/get_proposal_details/{simulated_id}").json()
+    assert (details["title"], details["yes_votes_on_chain"]) == ("Simulated", 0)
+    details = client.get(f"/dao/get_proposal_details/{number}").json()
+    assert (details["title"], details["yes_votes_on_chain"]) == ("Chain twin", 3)
+
+def test_proposal_updates_coalesce_per_window_and_fan_out_to_all_subscribers(monkeypatch):
+    import asyncio
+    import json
+    from baseroot_backend import dao_api
+    from baseroot_backend.proposal_updates import ProposalUpdateBroadcaster
+    from baseroot_backend.vote_store import VoteRecord
+
+    def parse(message):
+        lines = dict(line.split(": ", 1) for line in message.decode("utf-8").strip().split("\n"))
+        return int(lines["id"]), lines["event"], json.loads(lines["data"])
+
+    async def watch(broadcaster, received, **kwargs):
+        async for message in broadcaster.stream(**kwargs):
+            received.append(parse(message))
+
+    async def spike():
+        broadcaster = ProposalUpdateBroadcaster(window_seconds=0.02, history=2)
+        everyone = [[] for _ in range(1000)]
+        only_two = []
+        tasks = [asyncio.create_task(watch(broadcaster, received)) for received in everyone]
+        tasks.append(asyncio.create_task(watch(broadcaster, only_two, proposal_ids=[2])))
+        await asyncio.sleep(0)
+        for vote in range(1, 3001):
+            broadcaster.publish(1 + vote % 3, yes_votes_on_chain=vote)
+            if vote % 1000 == 0:
+                await asyncio.sleep(0.1) # let a window close
+        await asyncio.sleep(0.1)
+        resumed = []
+        tasks.append(asyncio.create_task(watch(broadcaster, resumed, last_event_id=broadcaster.seq - 1)))
+        stale = []
+        tasks.append(asyncio.create_task(watch(broadcaster, stale, last_event_id=0)))
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return broadcaster, everyone, only_two, resumed, stale
+
+    broadcaster, everyone, only_two, resumed, stale = asyncio.run(spike())
+    assert broadcaster.frames == 3 and broadcaster.coalesced == 3000 - 9 and broadcaster.subscribers == 0
+    for received in everyone:
+        assert [event_id for event_id, _, _ in received] == [1, 2, 3]
+        assert {u["proposal_id"]: u["yes_votes_on_chain"] for u in received[-1][2]} == {1: 3000, 2: 2998, 3: 2999}
+    assert [u["proposal_id"] for _, _, updates in only_two for u in updates] == [2, 2, 2]
+    assert [event_id for event_id, _, _ in resumed] == [3]
+    assert stale[0][1] == "resync" # frame 1 is no longer kept
+
+    # The endpoint streams what the vote writer publishes
+    async def vote_and_watch():
+        monkeypatch.setattr(dao_api, "proposal_updates", ProposalUpdateBroadcaster(window_seconds=0.01))
+        response = await dao_api.proposal_updates_endpoint(proposal_id=[proposal_id], last_event_id=None)
+        stream = response.body_iterator
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await dao_api._apply_vote_batch([(VoteRecord(proposal_id, "LiveWatcher", True, 100, ""), None)])
+        message = await asyncio.wait_for(first, 1)
+        await stream.aclose()
+        return response.media_type, parse(message)
+
+    proposal_id = client.post("/dao/submit_proposal", json={
+        "title": "Live Proposal", "description": "d", "requested_amount": 1,
+        "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    media_type, (_, event, updates) = asyncio.run(vote_and_watch())
+    assert media_type == "text/event-stream" and event == "proposal_updates"
+    assert updates == [{"proposal_id": proposal_id, "yes_votes_on_chain": 100, "no_votes_on_chain": 0,
+                        "status_on_chain": "Voting", "executed_on_chain": False}]
+
+def test_vote_weight_comes_from_start_slot_balance_snapshot(monkeypatch):
+    from baseroot_backend import dao_api
+    from baseroot_backend.proposal_lifecycle import ProposalScheduler, SimulatedSlotClock
+    from baseroot_backend.vote_store import InMemoryVoteStore
+    from baseroot_backend.voting_power import LocalBalanceSource, VotingPowerSnapshots
+
+    source = LocalBalanceSource()
+    for i in range(10000):
+        source.set_balance(f"Holder{i}", 1 + i % 50, slot=10)
+    source.set_balance("Holder0", 0, slot=20) # sold everything
+    source.set_balance("Latecomer", 5000, slot=20)
+    snapshots = VotingPowerSnapshots(source)
+    first = snapshots.snapshot(15)
+    assert snapshots.snapshot(15) is first and snapshots.builds == 1 # shared by proposals opened at slot 15
+    assert (first.balance("Holder0"), first.balance("Latecomer"), first.holders) == (1, 0, 10000)
+    later = snapshots.snapshot(25)
+    assert (later.balance("Holder0"), later.balance("Latecomer"), later.balance("Holder7")) == (0, 5000, 8)
+    assert first.balance("Latecomer") == 0 and later.balances.dtype.itemsize == 8 and snapshots.builds == 2
+    assert VotingPowerSnapshots(source, default_weight=100).weight(15, "Latecomer") == 0
+    assert VotingPowerSnapshots(None, default_weight=100).weight(15, "Latecomer") == 100
+
+    clock = SimulatedSlotClock(4000000)
+    voter = "SimulatedVoterWalletAddress"
+    source = LocalBalanceSource()
+    source.set_balance(voter, 250, slot=clock.slot)
+    monkeypatch.setattr(dao_api, "voting_power", VotingPowerSnapshots(source, default_weight=100)) # ignored: a configured source decides
+    monkeypatch.setattr(dao_api, "proposal_scheduler", ProposalScheduler(clock))
+    monkeypatch.setattr(dao_api, "vote_store", InMemoryVoteStore())
+    def submit(title):
+        return client.post("/dao/submit_proposal", json={
+            "title": title, "description": "d", "requested_amount": 1,
+            "target_funding_address": "FundReceiverWalletAddressXXXXXXXXXXXXX"}).json()["on_chain_proposal_id"]
+    proposal_id, other_id = submit("Snapshot A"), submit("Snapshot B")
+    assert dao_api.voting_power.builds == 1
+    clock.advance(100)
+    source.set_balance(voter, 1000000, slot=clock.slot) # tokens bought after the proposals opened do not count
+    vote = client.post(f"/dao/vote_on_proposal/{proposal_id}", json={"vote_option": True}).json()
+    assert vote["vote_weight"] == 250
+    power = client.get(f"/dao/voting_power/{other_id}", params={"voter_wallet_address": voter}).json()
+    assert (power["vote_weight"], power["snapshot_slot"], power["total_supply"]) == (250, 4000000, 250)
+
+    opened_later = client.post(f"/dao/vote_on_proposal/{submit('Snapshot C')}", json={"vote_option": True})
+    assert opened_later.json()["vote_weight"] == 1000000
+    source.set_balance(voter, 0, slot=clock.advance(1)) # no tokens when Snapshot D opens
+    assert client.post(f"/dao/vote_on_proposal/{submit('Snapshot D')}", json={"vote_option": True}).status_code == 403
+
 # --- AI Discovery API Tests (Simulated) ---
 def test_discover_literature_simulated_keywords():
     payload = {"keywords": ["decentralized", "science"], "top_k": 2}
@@ -180,6 +847,456 @@ def test_discover_literature_no_input():
     assert response.status_code == 400 # As per current validation
     assert "Either keywords or an abstract must be provided" in response.json()["detail"]
 
+def test_discover_literature_ranks_by_embedding_similarity():
+    payload = {"keywords": ["NFTs for Intellectual Property in Science"], "top_k": 3}
+    response = client.post("/ai/discover_literature", json=payload)
+    assert response.status_code == 200
+    papers = response.json()["similar_papers"]
+    assert papers[0]["id"] == "paper_004"
+    scores = [p["similarity_score"] for p in papers]
+    assert scores == sorted(scores, reverse=True)
+
+def test_discover_literature_lexical_is_deterministic_and_only_returns_matches():
+    payload = {"keywords": ["blockchain"], "top_k": 5}
+    first = client.post("/ai/discover_literature", json=payload).json()
+    second = client.post("/ai/discover_literature", json=payload).json()
+    assert first["query_received"]["retrieval_mode"] == "lexical"
+    assert first["similar_papers"] == second["similar_papers"]
+    assert [p["id"] for p in first["similar_papers"]] == ["paper_002"]
+    assert 0.0 < first["similar_papers"][0]["similarity_score"] <= 1.0
+
+def test_discover_literature_cache_hits_normalized_queries():
+    from baseroot_backend import ai_discovery_api
+
+    before = ai_discovery_api.literature_cache.stats()
+    client.post("/ai/discover_literature", json={"keywords": ["Funding", "DAO"], "top_k": 3})
+    response = client.post("/ai/discover_literature", json={"keywords": ["dao", "funding"], "top_k": 3})
+    assert response.json()["query_received"]["keywords"] == ["dao", "funding"]
+    stats = client.get("/ai/cache_stats").json()
+    assert stats["hits"] == before["hits"] + 1
+    assert stats["misses"] == before["misses"] + 1
+
+    # Queries that share a cache key score the same text, so a cached result equals a fresh one
+    query = {"keywords": ["  Funding ", "DAO"], "retrieval_mode": "semantic", "top_k": 3}
+    cached = client.post("/ai/discover_literature", json=query).json()["similar_papers"]
+    ai_discovery_api.literature_cache.clear()
+    fresh = client.post("/ai/discover_literature", json={**query, "keywords": ["dao", "funding"]}).json()["similar_papers"]
+    assert cached == fresh
+
+def test_discover_literature_batch_matches_single_queries():
+    from baseroot_backend import ai_discovery_api
+
+    queries = [
+        {"abstract": "Blockchain for scientific data integrity", "top_k": 2},
+        {"keywords": ["nft"], "top_k": 3},
+        {"abstract": "AI literature review tools for medical research", "top_k": 4},
+    ]
+    response = client.post("/ai/discover_literature_batch", json=queries)
+    assert response.status_code == 200
+    batch = response.json()
+    assert len(batch) == 3
+    ai_discovery_api.literature_cache.clear() # score the single queries from scratch
+    for query, result in zip(queries, batch):
+        single = client.post("/ai/discover_literature", json=query).json()
+        assert result["similar_papers"] == single["similar_papers"]
+
+def test_discover_literature_approximate_search_strategy():
+    payload = {"abstract": "Blockchain for scientific data integrity", "top_k": 3}
+    exact = client.post("/ai/discover_literature", json=payload).json()
+    approximate = client.post("/ai/discover_literature", json={**payload, "search_strategy": "approximate"}).json()
+    assert approximate["query_received"]["search_strategy"] == "approximate"
+    # The demo corpus has fewer lists than the default nprobe, so the probe is exhaustive
+    assert approximate["similar_papers"] == exact["similar_papers"]
+
+def test_discover_literature_stream_ndjson_in_score_order():
+    import json
+
+    payload = {"abstract": "Decentralized science research funding", "top_k": 50}
+    response = client.post("/ai/discover_literature/stream", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    papers = [json.loads(line) for line in response.text.splitlines()]
+    assert len(papers) == 5 # whole demo corpus, even though top_k is larger
+    scores = [p["similarity_score"] for p in papers]
+    assert scores == sorted(scores, reverse=True)
+    single = client.post("/ai/discover_literature", json={**payload, "top_k": 3}).json()
+    assert [p["id"] for p in papers[:3]] == [p["id"] for p in single["similar_papers"]]
+
+def test_discover_literature_batch_rejects_empty_query():
+    response = client.post("/ai/discover_literature_batch", json=[{"keywords": ["dao"]}, {"top_k": 1}])
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Query 1:")
+
+# --- SQL Persistence Tests ---
+def test_sql_persistence_survives_restart_and_serves_routers(tmp_path, monkeypatch):
+    from baseroot_backend import database, nft_api
+    from baseroot_backend.nft_api import fake_nft_db
+    from baseroot_backend.nft_search import NftSearchIndex
+    from baseroot_backend.wallet_addresses import b58encode
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'baseroot.db'}"
+    wallet = b58encode(bytes([9] * 32))
+    try:
+        db = database.configure(url, pool_size=2, max_overflow=0)
+        with TestClient(app) as sql_client:
+            sql_client.portal.call(db.create_all)
+            first = sql_client.post("/auth/connect_wallet", json={"wallet_address": wallet}).json()
+            assert "New user created" in first["message"]
+            bulk = sql_client.post("/auth/bulk_connect_wallets", json=[wallet, b58encode(bytes([8] * 32))]).json()
+            assert bulk["statuses"] == "ec" and bulk["user_ids"][0] == first["id"]
+
+            minted = []
+            for i in range(3):
+                response = sql_client.post("/nft/mint_research_nft", json={"metadata": {
+                    "title": f"SQL Paper {i}", "abstract_text": "Stored in SQL.", "authors": ["Dr. Sql Persist"],
+                    "publication_date": f"2024-01-0{i + 1}", "content_storage_hash": f"bafySql{i}", "keywords": ["Durable"]}})
+                assert response.status_code == 201
+                minted.append(response.json()["mint_address"])
+            page = sql_client.get("/nft/list_nfts?limit=2&keyword=durable&sort=-created_at")
+            rest = sql_client.get(f"/nft/list_nfts?limit=2&keyword=durable&sort=-created_at&cursor={page.headers['X-Next-Cursor']}")
+            assert [n["mint_address"] for n in page.json() + rest.json()] == minted[::-1]
+            assert "X-Next-Cursor" not in rest.headers
+            bulk_mint = sql_client.post("/nft/bulk_mint_research_nfts", json=[
+                {"title": f"SQL Bulk {i}", "abstract_text": "a", "authors": ["Dr. Sql Persist"], "publication_date": date,
+                 "content_storage_hash": f"bafySqlBulk{i}", "keywords": ["BulkDurable"]}
+                for i, date in enumerate(["2024-02-01", "not-a-date", "2024-02-03"])]).json()
+            assert (bulk_mint["minted"], bulk_mint["failed"]) == (2, 1)
+            bulk_minted = [r["mint_address"] for r in bulk_mint["results"] if r["error"] is None]
+            assert [n["mint_address"] for n in sql_client.get("/nft/list_nfts?keyword=bulkdurable").json()] == bulk_minted
+
+            proposal = sql_client.post("/dao/submit_proposal", json={
+                "title": "SQL Proposal", "description": "d", "requested_amount": 5, "target_funding_address": wallet}).json()
+            proposal_id = proposal["on_chain_proposal_id"]
+            assert sql_client.post(f"/dao/vote_on_proposal/{proposal_id}", json={"vote_option": True}).status_code == 200
+            assert sql_client.post(f"/dao/vote_on_proposal/{proposal_id}", json={"vote_option": False}).status_code == 409
+            assert sql_client.get(f"/dao/has_voted/{proposal_id}?voter_wallet_address=SimulatedVoterWalletAddress").json()["has_voted"]
+            assert [v["proposal_id"] for v in sql_client.get("/dao/votes_by_voter/SimulatedVoterWalletAddress").json()] == [proposal_id]
+            assert db.stats()["wait"]["checkouts"] > 0
+            sql_client.portal.call(db.dispose)
+
+        # A fresh engine (as after a restart) sees everything that was acknowledged
+        for mint_address in minted + bulk_minted:
+            fake_nft_db.pop(mint_address, None)
+        monkeypatch.setattr(nft_api, "nft_search_index", NftSearchIndex())
+        monkeypatch.setattr(nft_api, "search_synced_id", 0)
+        db = database.configure(url)
+        with TestClient(app) as sql_client:
+            again = sql_client.post("/auth/connect_wallet", json={"wallet_address": wallet}).json()
+            assert again["id"] == first["id"] and "Welcome back" in again["message"]
+            assert sql_client.get(f"/nft/get_nft_metadata/{minted[0]}").json()["title"] == "SQL Paper 0"
+            assert sql_client.get(f"/nft/get_nft_metadata/{bulk_minted[1]}").json()["title"] == "SQL Bulk 2"
+            # The empty search index catches up from research_nfts; hits come from the database
+            found = sql_client.get("/nft/search_nfts?q=durable").json()
+            assert found["total"] == 3 and {h["nft"]["mint_address"] for h in found["hits"]} == set(minted)
+            assert sql_client.get("/nft/search_nfts?q=sql bulk").json()["total"] == 2
+            details = sql_client.get(f"/dao/get_proposal_details/{proposal_id}").json()
+            assert (details["yes_votes_on_chain"], details["no_votes_on_chain"]) == (100, 0)
+            assert [p["title"] for p in sql_client.get("/dao/list_proposals?status_filter=voting").json()] == ["SQL Proposal"]
+            second = sql_client.post("/dao/submit_proposal", json={
+                "title": "SQL Proposal 2", "description": "d", "requested_amount": 9, "target_funding_address": wallet})
+            page = sql_client.get("/dao/list_proposals?status_filter=voting&sort=largest_amount&limit=1")
+            rest = sql_client.get(f"/dao/list_proposals?status_filter=voting&sort=largest_amount&cursor={page.headers['X-Next-Cursor']}")
+            assert [p["title"] for p in page.json() + rest.json()] == ["SQL Proposal 2", "SQL Proposal"]
+            assert "X-Next-Cursor" not in rest.headers
+
+            # A chain proposal numbered like a simulated one gets its own id; chain events in the simulated range are dropped
+            from baseroot_backend.chain_indexer import SIMULATED_PROPOSAL_ID_BASE, RawEvent, decode_batch, encode_event
+            from baseroot_backend.dao_api import apply_chain_events
+            number = proposal_id - SIMULATED_PROPOSAL_ID_BASE
+            events, skipped = decode_batch([RawEvent(5, i, f"s{i}", encode_event(name, fields)) for i, (name, fields) in enumerate([
+                ("ProposalSubmitted", {"proposal_id": number, "proposer": wallet, "title": "Chain Proposal", "end_slot": 10 ** 12}),
+                ("VoteCast", {"proposal_id": number, "voter": wallet, "vote_option": False, "vote_weight": 7}),
+                ("VoteCast", {"proposal_id": proposal_id, "voter": wallet, "vote_option": False, "vote_weight": 7}),
+            ])])
+            assert number == proposal["db_proposal_id"] and (len(events), skipped) == (2, 1)
+            sql_client.portal.call(apply_chain_events, events)
+            details = sql_client.get(f"/dao/get_proposal_details/{number}").json()
+            assert (details["title"], details["yes_votes_on_chain"], details["no_votes_on_chain"]) == ("Chain Proposal", 0, 7)
+            details = sql_client.get(f"/dao/get_proposal_details/{proposal_id}").json()
+            assert (details["title"], details["yes_votes_on_chain"], details["no_votes_on_chain"]) == ("SQL Proposal", 100, 0)
+            assert not sql_client.get(f"/dao/has_voted/{proposal_id}?voter_wallet_address={wallet}").json()["has_voted"]
+            tallies = {p["title"]: p["no_votes_on_chain"] for p in sql_client.get("/dao/list_proposals?limit=10").json()}
+            assert tallies == {"SQL Proposal": 0, "SQL Proposal 2": 0, "Chain Proposal": 7}
+            sql_client.portal.call(db.dispose)
+    finally:
+        database.configure(None)
+
+# --- Blob Store Tests ---
+def test_blob_store_cids_dedup_and_mapped_reads(tmp_path):
+    from baseroot_backend.blob_store import BlobStore, canonical_json, cid_from_uri, compute_cid
+
+    # CIDv1 (raw, sha2-256) of the empty block, as computed by IPFS
+    assert compute_cid(b"") == "bafkreihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"
+    assert canonical_json({"b": 1, "a": "é"}) == canonical_json({"a": "é", "b": 1}) == '{"a":"é","b":1}'.encode("utf-8")
+
+    store = BlobStore(str(tmp_path / "blobs"), hot_objects=2)
+    cids = store.put_many_json([{"n": 1}, {"n": 2}, {"n": 1}])
+    assert cids[0] == cids[2] != cids[1]
+    assert store.put_json({"n": 2}) == cids[1]
+    assert (store.stats()["writes"], store.stats()["dedup_skips"]) == (2, 2)
+
+    view = store.get(cids[0])
+    assert isinstance(view, memoryview) and view.readonly and bytes(view) == b'{"n":1}'
+    assert store.get_json(cids[0]) == {"n": 1}
+    assert store.stats()["disk_reads"] == 1 # the second read is served from the hot LRU
+    store.put_json({"n": 3})
+    for cid in cids[:2] + [compute_cid(b'{"n":3}')]:
+        store.get(cid)
+    assert store.stats()["hot_evictions"] == 1
+    assert store.get(compute_cid(b"missing")) is None
+    assert BlobStore(store.root).get_json(cids[1]) == {"n": 2} # a new process sees the stored blobs
+    assert cid_from_uri(f"ipfs://{cids[0]}") == cids[0] and cid_from_uri("ipfs://abc_metadata_json") is None
+
+def test_blob_store_reads_do_not_hold_file_descriptors(tmp_path):
+    import os
+    from baseroot_backend.blob_store import MAP_THRESHOLD, BlobStore
+
+    store = BlobStore(str(tmp_path / "blobs"), hot_objects=4096)
+    cids = store.put_many_json([{"n": i} for i in range(1200)])
+    large = store.put(b"x" * MAP_THRESHOLD)
+    open_fds = len(os.listdir("/proc/self/fd"))
+    for cid in cids:
+        assert store.get(cid) is not None
+    for _ in range(50):
+        assert len(store.get(large)) == MAP_THRESHOLD
+    assert len(os.listdir("/proc/self/fd")) <= open_fds + 1
+    stats = store.stats()
+    assert (stats["hot_objects"], stats["mapped_reads"]) == (1200, 50) # large blobs are mapped, not cached
+
+# --- Result Cache Tests ---
+def test_result_cache_lru_ttl_and_version_invalidation():
+    from baseroot_backend.result_cache import ResultCache
+
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1, version=1)
+    cache.put("b", 2, version=1)
+    assert cache.get("a", version=1) == 1 # "a" becomes most recently used
+    cache.put("c", 3, version=1) # evicts "b"
+    assert cache.get("b", version=1) is None
+    assert cache.stats()["evictions"] == 1
+    now[0] = 11.0
+    assert cache.get("a", version=1) is None # expired
+    cache.put("d", 4, version=1)
+    assert cache.get("d", version=2) is None # corpus changed
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["invalidations"] == 2 # "c" and "d"
+    assert stats["hits"] == 1
+    cache.put("e", 5, version=2)
+    assert cache.invalidate("e") and not cache.invalidate("e")
+    assert cache.get("e", version=2) is None
+    # A result computed against an older version is neither served nor stored
+    cache.put("f", 6, version=2)
+    cache.put("slow", 0, version=1)
+    assert cache.get("slow", version=1) is None
+    assert cache.get("f", version=2) == 6
+    assert cache.stats()["stale_puts"] == 1
+
+# --- Literature Index Tests ---
+def test_hashing_embedder_is_deterministic_and_normalized():
+    import numpy as np
+    from baseroot_backend.literature_index import HashingEmbedder
+
+    vectors = HashingEmbedder(dim=64).embed(["decentralized science funding", "decentralized science funding", ""])
+    assert vectors.dtype == np.float32
+    assert np.allclose(vectors[0], vectors[1])
+    assert abs(float(np.linalg.norm(vectors[0])) - 1.0) < 1e-5
+    assert not vectors[2].any()
+
+def test_vector_index_top_k_matches_full_sort():
+    import numpy as np
+    from baseroot_backend.literature_index import VectorIndex
+
+    rng = np.random.default_rng(0)
+    index = VectorIndex(dim=16, initial_capacity=4) # forces the matrix to grow
+    data = rng.standard_normal((500, 16)).astype(np.float32)
+    index.add(data[:250])
+    index.add(data[250:])
+    query = rng.standard_normal(16).astype(np.float32)
+    rows, scores = index.search(query, 10)
+    expected = np.argsort(-(data @ query))[:10]
+    assert list(rows) == list(expected)
+    assert np.allclose(scores, (data @ query)[expected])
+
+def test_vector_index_search_batch_matches_single_search():
+    import numpy as np
+    from baseroot_backend.literature_index import VectorIndex
+
+    rng = np.random.default_rng(1)
+    index = VectorIndex(dim=8)
+    index.add(rng.standard_normal((100, 8)).astype(np.float32))
+    queries = rng.standard_normal((5, 8)).astype(np.float32)
+    rows, scores = index.search_batch(queries, 7)
+    assert rows.shape == (5, 7)
+    for query, row_ids, row_scores in zip(queries, rows, scores):
+        expected_rows, expected_scores = index.search(query, 7)
+        assert list(row_ids) == list(expected_rows)
+        assert np.allclose(row_scores, expected_scores)
+
+# --- ANN Index Tests ---
+def _clustered_unit_vectors(n, dim, seed=0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dim))
+    data = (centers[rng.integers(0, 20, n)] + 0.4 * rng.standard_normal((n, dim))).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+def test_ivf_index_recall_against_brute_force(tmp_path):
+    from baseroot_backend.ann_index import IVFIndex, recall_at_k
+    from baseroot_backend.literature_index import VectorIndex
+
+    data = _clustered_unit_vectors(3000, 32)
+    exact_index = VectorIndex(32)
+    exact_index.add(data)
+    queries = data[:50]
+    exact = [exact_index.search(q, 10)[0] for q in queries]
+
+    ivf = IVFIndex.build(data, nlist=40)
+    assert recall_at_k([ivf.search(q, 10, nprobe=ivf.nlist)[0] for q in queries], exact) == 1.0 # exhaustive probe
+    assert recall_at_k([ivf.search(q, 10, nprobe=8)[0] for q in queries], exact) > 0.9
+
+    pq = IVFIndex.build(data, nlist=40, pq_m=8)
+    assert pq.vectors is None and pq.pq_codes.shape == (3000, 8)
+    refined = [pq.search(q, 10, nprobe=8, refine_vectors=data)[0] for q in queries]
+    assert recall_at_k(refined, exact) > 0.5
+
+    path = str(tmp_path / "ivf.npz")
+    pq.save(path)
+    loaded = IVFIndex.load(path)
+    assert list(loaded.search(queries[0], 10)[0]) == list(pq.search(queries[0], 10)[0])
+
+def test_inverted_index_bm25_ranking_and_incremental_add():
+    from baseroot_backend.literature_index import InvertedIndex
+
+    index = InvertedIndex()
+    index.add(["dao funding for science", "science science data", "unrelated topic"])
+    index.add(["dao governance"]) # incremental update
+    assert len(index) == 4
+    assert index.document_frequency("science") == 2
+    rows, scores, max_possible = index.search("science dao", 10)
+    assert rows[0] == 0 # matches both terms
+    assert sorted(rows) == [0, 1, 3] # row 2 contains no query term and is never scored
+    assert all(0 < s <= max_possible for s in scores)
+    rows, _, _ = index.search("the of and", 10) # stopwords only
+    assert len(rows) == 0
+
+    # Scoring while another thread adds documents (growing the postings and doc lengths)
+    import threading
+    done = threading.Event()
+    def writer():
+        index.add(f"science dao paper {i}" for i in range(5000))
+        done.set()
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while not done.is_set():
+        rows, scores, max_possible = index.score("science dao")
+        assert rows.shape == scores.shape and (scores <= max_possible + 1e-4).all()
+    thread.join()
+    assert len(index) == 5004 and index.document_frequency("science") == 5002
+
+# --- Scoring Pool Tests ---
+def test_scoring_pool_micro_batches_concurrent_submissions():
+    import asyncio
+    from baseroot_backend.scoring_pool import ScoringPool
+
+    calls = []
+    def double_all(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    pool = ScoringPool(double_all, max_workers=1, batch_window_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.submit(i) for i in range(10)))
+
+    assert asyncio.run(scenario()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))] # one scoring pass for all ten queries
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+def test_scoring_pool_keeps_event_loop_free_and_enforces_limits():
+    import asyncio
+    import time
+    from baseroot_backend.scoring_pool import PoolSaturatedError, ScoringPool
+
+    def slow(items):
+        time.sleep(0.3) # stands in for a large CPU-bound scoring pass
+        return items
+
+    pool = ScoringPool(slow, max_workers=1, max_pending=1, timeout_seconds=0.1, batch_window_ms=0)
+
+    async def scenario():
+        job = asyncio.ensure_future(pool.submit("big query"))
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        await asyncio.sleep(0) # other requests keep being served meanwhile
+        assert time.perf_counter() - started < 0.05
+        with pytest.raises(PoolSaturatedError):
+            await pool.submit("overflow")
+        with pytest.raises(asyncio.TimeoutError):
+            await job
+        # The timed-out item is still running, so it keeps its slot until the executor finishes it
+        with pytest.raises(PoolSaturatedError):
+            await pool.submit("overflow")
+        await asyncio.sleep(0.35)
+        assert pool.stats()["pending"] == 0
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["rejected"] == 2 and stats["timed_out"] == 1 and stats["pending"] == 0
+    pool.shutdown()
+
+# --- Corpus Store Tests ---
+def test_corpus_store_append_reopen_and_compact(tmp_path):
+    import numpy as np
+    from baseroot_backend.corpus_store import CorpusStore, EMBEDDINGS_FILE, RECORDS_FILE
+
+    store = CorpusStore.create(str(tmp_path), dim=4)
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+    store.append([{"id": "p1", "title": "One"}, {"id": "p2", "title": "Two"}], vectors[:2])
+    store.append([{"id": "p1", "title": "One (revised)"}], vectors[2:])
+
+    reopened = CorpusStore(str(tmp_path))
+    assert len(reopened) == 3
+    assert reopened[2]["title"] == "One (revised)"
+    assert np.array_equal(np.load(tmp_path / EMBEDDINGS_FILE, mmap_mode="r"), vectors)
+
+    with open(tmp_path / RECORDS_FILE, "ab") as f:
+        f.write(b'{"id": "torn"') # interrupted append: never committed
+    assert len(CorpusStore(str(tmp_path))) == 3
+
+    assert reopened.compact() == 2
+    assert [p["title"] for p in reopened] == ["Two", "One (revised)"]
+    assert np.array_equal(CorpusStore(str(tmp_path)).embeddings, vectors[1:])
+
+# --- Benchmark Harness Tests ---
+def test_synthetic_corpus_is_deterministic_and_bulk_embeddings_match():
+    import numpy as np
+    from baseroot_backend.literature_index import HashingEmbedder
+    from baseroot_backend.synthetic_corpus import SyntheticCorpus
+
+    corpus = SyntheticCorpus(300, seed=7, vocab_size=2000, n_topics=10)
+    again = SyntheticCorpus(300, seed=7, vocab_size=2000, n_topics=10)
+    papers = list(corpus.iter_papers())
+    assert papers == list(again.iter_papers())
+    assert corpus.queries(3) == again.queries(3)
+    embedder = HashingEmbedder(dim=64, use_bigrams=False)
+    expected = embedder.embed([f"{p['title']} {p['abstract']}" for p in papers[:20]])
+    assert np.allclose(corpus.hashed_embeddings(embedder)[:20], expected, atol=1e-6)
+
+def test_benchmark_reports_all_modes_and_flags_regressions():
+    from baseroot_backend.bench_literature_discovery import find_regressions, run_size
+
+    run = run_size(n_papers=2000, n_queries=5, k=5, dim=32, nprobe=4, pq_m=8, lexical_max_papers=2000, seed=0)
+    assert set(run["modes"]) == {"semantic_exact", "semantic_exact_batch", "semantic_ivf", "semantic_ivf_pq", "lexical_bm25"}
+    assert {"p50_ms", "p95_ms", "p99_ms", "throughput_qps", "build_seconds", "memory_bytes"} <= set(run["modes"]["semantic_ivf"])
+    assert 0.0 <= run["modes"]["semantic_ivf"]["recall_at_k"] <= 1.0
+    slower = {"runs": [{"n_papers": 2000, "modes": {"semantic_exact": {"p99_ms": 100.0, "recall_at_k": 1.0}}}]}
+    faster = {"runs": [{"n_papers": 2000, "modes": {"semantic_exact": {"p99_ms": 1.0, "recall_at_k": 1.0}}}]}
+    assert find_regressions(slower, faster, 0.2) and not find_regressions(faster, slower, 0.2)
+
 """
 To run these (once a main.py or equivalent app setup is done for TestClient):
 1. Create a main.py in the baseroot_backend directory that instantiates FastAPI and includes all routers.
@@ -0,0 +1,95 @@
+"""
+User repository for the authentication API.
+
+`UserRepository` is the storage interface the auth router codes against;
+`InMemoryUserRepository` is the simulated implementation. It keeps an
+id -> user map plus a unique hash index on wallet_address, so wallet lookups
+are O(1) instead of a scan over every user. Creation is serialized by a lock
+and re-checks the wallet index inside it, so concurrent connects for the same
+new wallet create exactly one user, and ids are allocated atomically.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+class DBUser:
+    def __init__(self, id, wallet_address, username=None):
+        self.id = id
+        self.wallet_address = wallet_address
+        self.username = username
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    def get_by_id(self, user_id: int) -> Optional[DBUser]:
+        """The user with this id, or None."""
+
+    @abstractmethod
+    def get_by_wallet(self, wallet_address: str) -> Optional[DBUser]:
+        """The user connected with this wallet, or None."""
+
+    @abstractmethod
+    def get_or_create(self, wallet_address: str) -> Tuple[DBUser, bool]:
+        """Returns (user, created); created is True only for the call that made the user."""
+
+    @abstractmethod
+    def bulk_get_or_create(self, wallet_addresses: Sequence[str]) -> List[Tuple[DBUser, bool]]:
+        """
+        (user, created) per wallet address, in input order. Addresses must be distinct;
+        new users get one contiguous block of ids.
+        """
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self):
+        self._users_by_id: Dict[int, DBUser] = {}
+        self._users_by_wallet: Dict[str, DBUser] = {} # unique index on wallet_address
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def users_by_id(self) -> Mapping[int, DBUser]:
+        """Read-only view of the id -> user map."""
+        return MappingProxyType(self._users_by_id)
+
+    def __len__(self) -> int:
+        return len(self._users_by_id)
+
+    def get_by_id(self, user_id: int) -> Optional[DBUser]:
+        return self._users_by_id.get(user_id)
+
+    def get_by_wallet(self, wallet_address: str) -> Optional[DBUser]:
+        return self._users_by_wallet.get(wallet_address)
+
+    def get_or_create(self, wallet_address: str) -> Tuple[DBUser, bool]:
+        # Fast path: returning users never take the lock
+        user = self._users_by_wallet.get(wallet_address)
+        if user is not None:
+            return user, False
+        with self._lock:
+            user = self._users_by_wallet.get(wallet_address) # another request may have won the race
+            if user is not None:
+                return user, False
+            user = DBUser(id=self._next_id, wallet_address=wallet_address)
+            self._next_id += 1
+            self._users_by_id[user.id] = user
+            self._users_by_wallet[wallet_address] = user
+            return user, True
+
+    def bulk_get_or_create(self, wallet_addresses: Sequence[str]) -> List[Tuple[DBUser, bool]]:
+        with self._lock:
+            users = [self._users_by_wallet.get(w) for w in wallet_addresses]
+            new_rows = [i for i, user in enumerate(users) if user is None]
+            # Allocate the whole block of ids at once
+            first_id = self._next_id
+            self._next_id += len(new_rows)
+            results = [(user, False) for user in users]
+            for offset, row in enumerate(new_rows):
+                user = DBUser(id=first_id + offset, wallet_address=wallet_addresses[row])
+                self._users_by_id[user.id] = user
+                self._users_by_wallet[user.wallet_address] = user
+                results[row] = (user, True)
+        return results
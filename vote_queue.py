@@ -0,0 +1,118 @@
+"""
+Write-behind ingestion queue for DAO votes, with group commit.
+
+Vote requests do not write themselves: `submit` appends the vote to a queue
+and waits until the single writer has applied it and the write is durable
+(committed, in SQL mode). The writer drains the queue in batches of up to
+`max_batch_size` votes and hands each batch to `apply_batch`, which applies a
+proposal's tally change once per batch and commits once per batch. Votes that
+arrive while a batch is being committed form the next batch, so under load the
+batch grows with the arrival rate and throughput follows the batch size rather
+than the per-write cost. One writer per event loop also means tallies are
+updated by one task at a time, so counts stay exact under concurrent requests.
+
+Admission is bounded: at most `max_pending` votes may be queued or in flight;
+further submissions fail fast with `VoteQueueFullError` (maps to HTTP 503), so
+a voting spike gets backpressure instead of unbounded memory and latency.
+
+`apply_batch(items) -> outcomes` must return one outcome per item, in order:
+the value to acknowledge the vote with, or an exception instance to raise in
+that vote's request.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple
+
+
+class VoteQueueFullError(Exception):
+    """Raised when the queue already holds `max_pending` votes."""
+
+
+class _Writer:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.items: Deque[Tuple[Any, asyncio.Future]] = deque()
+        self.task: Optional[asyncio.Task] = None
+
+
+class VoteIngestionQueue:
+    def __init__(self, apply_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_pending: int = 10000, max_batch_size: int = 500):
+        self.apply_batch = apply_batch
+        self.max_pending = max_pending
+        self.max_batch_size = max_batch_size
+        self._writer: Optional[_Writer] = None
+        self.pending = 0
+        # Counters
+        self.submitted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one vote and waits until it has been applied; returns its outcome."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise VoteQueueFullError(f"Vote queue is full ({self.max_pending} pending).")
+        self.pending += 1
+        self.submitted += 1
+        loop = asyncio.get_running_loop()
+        writer = self._writer
+        if writer is None or writer.loop is not loop:
+            writer = self._writer = _Writer(loop)
+        future = loop.create_future()
+        writer.items.append((item, future))
+        if writer.task is None:
+            writer.task = loop.create_task(self._drain(writer))
+        # shield: a disconnected caller must not cancel the vote once it is queued
+        return await asyncio.shield(future)
+
+    async def _drain(self, writer: _Writer) -> None:
+        batch: List[Tuple[Any, asyncio.Future]] = []
+        try:
+            while writer.items:
+                batch = [writer.items.popleft() for _ in range(min(self.max_batch_size, len(writer.items)))]
+                self.batches += 1
+                self.batched_items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+                try:
+                    outcomes = await self.apply_batch([item for item, _ in batch])
+                except Exception as exc:
+                    outcomes = [exc] * len(batch)
+                for (_, future), outcome in zip(batch, outcomes):
+                    if future.done():
+                        continue
+                    if isinstance(outcome, BaseException):
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome)
+                self.pending -= len(batch)
+                batch = []
+        finally:
+            writer.task = None
+            # Only non-empty if the writer was cancelled (its event loop is shutting down)
+            unfinished = batch + list(writer.items)
+            writer.items.clear()
+            self.pending -= len(unfinished)
+            for _, future in unfinished:
+                future.cancel()
+
+    async def drain(self) -> None:
+        """Waits until every queued vote has been applied (e.g. on shutdown)."""
+        writer = self._writer
+        while writer is not None and writer.task is not None:
+            await asyncio.shield(writer.task)
+
+    def stats(self) -> dict:
+        return {
+            "max_pending": self.max_pending,
+            "max_batch_size": self.max_batch_size,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
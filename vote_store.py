@@ -0,0 +1,84 @@
+"""
+Vote store for the DAO API.
+
+`InMemoryVoteStore` is the simulated counterpart of the dao_votes table. Votes
+are keyed by (proposal_id, voter wallet) in a hash map, the same key as the
+table's unique constraint, so casting a vote and "has this wallet voted" are
+O(1) however many votes are recorded, and a second vote is rejected with
+DuplicateVoteError. Each proposal keeps a running (yes, no) tally that is
+updated together with the vote under one lock, so concurrent votes never lose
+an update. A per-voter index lists a wallet's votes in the order they were cast.
+`cast_many` records a batch (from the vote ingestion queue) under one lock.
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+class DuplicateVoteError(Exception):
+    """The voter already voted on this proposal."""
+
+
+class VotingClosedError(Exception):
+    """The proposal does not exist or is no longer open for voting."""
+
+
+class VoteRecord(NamedTuple):
+    proposal_id: int
+    voter_wallet_address: str
+    vote_option: bool
+    vote_weight: int
+    voted_at: str
+
+
+class InMemoryVoteStore:
+    def __init__(self):
+        self._votes: Dict[Tuple[int, str], VoteRecord] = {}
+        self._tallies: Dict[int, List[int]] = {} # proposal_id -> [yes, no]
+        self._by_voter: Dict[str, List[VoteRecord]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._votes)
+
+    def _cast(self, vote: VoteRecord) -> Tuple[int, int]:
+        key = (vote.proposal_id, vote.voter_wallet_address)
+        if key in self._votes:
+            raise DuplicateVoteError(f"{vote.voter_wallet_address} already voted on proposal {vote.proposal_id}")
+        self._votes[key] = vote
+        tally = self._tallies.setdefault(vote.proposal_id, [0, 0])
+        tally[0 if vote.vote_option else 1] += vote.vote_weight
+        self._by_voter.setdefault(vote.voter_wallet_address, []).append(vote)
+        return tally[0], tally[1]
+
+    def cast(self, vote: VoteRecord) -> Tuple[int, int]:
+        """Records the vote and returns the proposal's updated (yes, no) tally."""
+        with self._lock:
+            return self._cast(vote)
+
+    def cast_many(self, votes: Sequence[VoteRecord]) -> List[Union[Tuple[int, int], DuplicateVoteError]]:
+        """Records a batch in order; per vote, the tally after it or the DuplicateVoteError it raised."""
+        outcomes: List[Union[Tuple[int, int], DuplicateVoteError]] = []
+        with self._lock:
+            for vote in votes:
+                try:
+                    outcomes.append(self._cast(vote))
+                except DuplicateVoteError as exc:
+                    outcomes.append(exc)
+        return outcomes
+
+    def get_vote(self, proposal_id: int, voter_wallet_address: str) -> Optional[VoteRecord]:
+        return self._votes.get((proposal_id, voter_wallet_address))
+
+    def has_voted(self, proposal_id: int, voter_wallet_address: str) -> bool:
+        return (proposal_id, voter_wallet_address) in self._votes
+
+    def tally(self, proposal_id: int) -> Tuple[int, int]:
+        with self._lock:
+            yes, no = self._tallies.get(proposal_id, (0, 0))
+            return yes, no
+
+    def voter_history(self, voter_wallet_address: str, skip: int = 0, limit: int = 50) -> List[VoteRecord]:
+        """The wallet's votes, oldest first."""
+        with self._lock:
+            return self._by_voter.get(voter_wallet_address, [])[skip : skip + limit]
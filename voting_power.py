@@ -0,0 +1,146 @@
+"""
+Voting-power snapshots: governance-token balances frozen at a proposal's start slot.
+
+A vote's weight is the voter's balance when the proposal opened
+(start_slot_on_chain), not at voting time, so tokens bought or moved during
+the vote add no weight and votes need no live balance lookup.
+
+`VotingPowerSnapshots` builds one `BalanceSnapshot` per start slot from a
+balance source; proposals opened at the same slot share it. Every snapshot
+indexes the same holder registry (wallet -> row, assigned once per wallet),
+so a snapshot is only a NumPy uint64 array of balances by row, 8 bytes per
+holder, and a weight lookup is a dict probe plus an array read. Recently used
+snapshots are kept in an LRU; an evicted one is rebuilt from the source, whose
+history answers "balances at slot".
+
+`LocalBalanceSource` keeps balance histories locally (a JSON file or calls to
+`set_balance`), for offline use and tests; an RPC-backed source reading token
+accounts at a slot would implement the same `balances_at`. Without a source
+(the simulated setup) every wallet weighs `default_weight`; with one, a wallet
+without balance weighs 0.
+"""
+
+import json
+import os
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from baseroot_backend.result_cache import ResultCache
+
+
+class LocalBalanceSource:
+    def __init__(self):
+        self._history: Dict[str, Tuple[List[int], List[int]]] = {} # wallet -> (slots ascending, balances)
+
+    def set_balance(self, wallet_address: str, balance: int, slot: int = 0) -> None:
+        """Records the wallet's balance from `slot` on (slots are recorded in increasing order per wallet)."""
+        slots, balances = self._history.setdefault(wallet_address, ([], []))
+        if slots and slot < slots[-1]:
+            raise ValueError("Balance history must be recorded in slot order")
+        if slots and slots[-1] == slot:
+            balances[-1] = balance
+        else:
+            slots.append(slot)
+            balances.append(balance)
+
+    def balances_at(self, slot: int) -> Iterator[Tuple[str, int]]:
+        """(wallet, balance) of every wallet with a non-zero balance at `slot`."""
+        for wallet_address, (slots, balances) in self._history.items():
+            i = bisect_right(slots, slot)
+            if i and balances[i - 1]:
+                yield wallet_address, balances[i - 1]
+
+    @classmethod
+    def from_json_file(cls, path: str) -> "LocalBalanceSource":
+        """Reads {"wallet": balance} or {"wallet": [[slot, balance], ...]}."""
+        source = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            for wallet_address, value in json.load(f).items():
+                for slot, balance in ([[0, value]] if isinstance(value, int) else value):
+                    source.set_balance(wallet_address, balance, slot)
+        return source
+
+
+class BalanceSnapshot:
+    def __init__(self, slot: int, rows: Dict[str, int], balances: np.ndarray):
+        self.slot = slot
+        self._rows = rows # shared holder registry; rows added later lie beyond this snapshot's array
+        self.balances = balances
+        self.holders = int(np.count_nonzero(balances))
+        self.total_supply = int(balances.sum())
+
+    def balance(self, wallet_address: str) -> int:
+        row = self._rows.get(wallet_address)
+        return int(self.balances[row]) if row is not None and row < len(self.balances) else 0
+
+
+class VotingPowerSnapshots:
+    def __init__(self, source=None, default_weight: int = 0, max_snapshots: int = 64):
+        self.source = source # None: no balances configured, every wallet weighs default_weight
+        self.default_weight = default_weight
+        self._rows: Dict[str, int] = {}
+        self._snapshots = ResultCache(max_entries=max_snapshots, ttl_seconds=float("inf"))
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def _build(self, slot: int) -> BalanceSnapshot:
+        wallets, amounts = [], []
+        for wallet_address, balance in (self.source.balances_at(slot) if self.source is not None else ()):
+            wallets.append(wallet_address)
+            amounts.append(balance)
+        rows = np.fromiter((self._rows.setdefault(w, len(self._rows)) for w in wallets), dtype=np.int64, count=len(wallets))
+        balances = np.zeros(len(self._rows), dtype=np.uint64)
+        balances[rows] = np.asarray(amounts, dtype=np.uint64)
+        self.builds += 1
+        return BalanceSnapshot(slot, self._rows, balances)
+
+    def snapshot(self, slot: int) -> BalanceSnapshot:
+        """The balances at `slot`, built on first use and shared by every proposal opened at that slot."""
+        snapshot = self._snapshots.get(slot)
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshots.get(slot)
+                if snapshot is None:
+                    snapshot = self._build(slot)
+                    self._snapshots.put(slot, snapshot)
+        return snapshot
+
+    def cached(self, slot: int) -> Optional[BalanceSnapshot]:
+        """The snapshot for `slot` if it is already built (never blocks on a build)."""
+        return self._snapshots.get(slot)
+
+    def weight_in(self, snapshot: BalanceSnapshot, wallet_address: str) -> int:
+        """The wallet's vote weight under `snapshot`; 0 (vote rejected) for a wallet without balance."""
+        if self.source is None:
+            return self.default_weight
+        return snapshot.balance(wallet_address)
+
+    def weight(self, slot: int, wallet_address: str) -> int:
+        return self.weight_in(self.snapshot(slot), wallet_address)
+
+    def stats(self) -> dict:
+        cache = self._snapshots.stats()
+        return {
+            "registered_holders": len(self._rows),
+            "snapshots": cache["entries"],
+            "builds": self.builds,
+            "hits": cache["hits"],
+            "misses": cache["misses"],
+        }
+
+
+def snapshots_from_env() -> VotingPowerSnapshots:
+    """
+    Snapshots over the balances in BASEROOT_GOVERNANCE_BALANCES_FILE. Only when it is
+    unset does every wallet weigh BASEROOT_GOVERNANCE_DEFAULT_WEIGHT (default 100, the
+    weight every simulated vote used to get); with a balances file only holders can vote.
+    """
+    path = os.getenv("BASEROOT_GOVERNANCE_BALANCES_FILE")
+    return VotingPowerSnapshots(
+        LocalBalanceSource.from_json_file(path) if path else None,
+        default_weight=int(os.getenv("BASEROOT_GOVERNANCE_DEFAULT_WEIGHT", "100")),
+        max_snapshots=int(os.getenv("BASEROOT_VOTING_POWER_SNAPSHOTS", "64")),
+    )